@@ -1,68 +1,156 @@
-import sys
-import heapq  # For priority queue implementation
-import math
-from collections import defaultdict
-from heuristicFunction import heuristic  # Custom heuristic function for distance estimation
-
-def astar(node, graph, origin, destinations):
-    """
-    A* Search Algorithm implementation to find the optimal path from origin to any destination.
-    
-    Args:
-        node (dict): Dictionary of node coordinates {node_id: (x, y)}
-        graph (dict): Adjacency list representation of the graph {node_id: [(neighbor_id, cost)]}
-        origin (str): Starting node ID
-        destinations (list): List of goal node IDs
-    
-    Returns:
-        tuple: (reached_destination, path, nodes_expanded)
-            - reached_destination: ID of the destination reached (or None if no path exists)
-            - path: List of nodes in the optimal path
-            - nodes_expanded: Number of nodes explored during search
-    """
-    # Initialize priority queue with start node (f_value, g_value, node_id, path)
-    frontier = []
-    heapq.heappush(frontier, (0, 0, origin, [origin]))  # f=0, g=0 initially
-
-    # Dictionary to keep track of minimum cost to reach each node
-    cost_so_far = {origin: 0}
-    
-    # Set to track visited nodes to avoid cycles
-    visited = set()
-    
-    # Counter for number of nodes expanded
-    count = 0
-
-    while frontier:
-        # Get node with lowest f-value from priority queue
-        # f = g + h where g = cost so far, h = heuristic estimate
-        f, g, current, path = heapq.heappop(frontier)
-        
-        # Skip if node already visited (better path was found)
-        if current in visited:
-            continue
-        visited.add(current)
-        
-        count += 1  # Increment nodes expanded counter
-        
-        # Check if current node is a destination
-        if current in destinations:
-            return current, path, count
-
-        # Explore all neighbors of current node
-        for neighbor, edge_cost in sorted(graph[current], key=lambda x: x[0]):
-            # Calculate actual cost to reach neighbor through current path
-            new_cost = g + edge_cost
-            
-            # If new path is better than any previous path to this neighbor
-            if neighbor not in cost_so_far or new_cost < cost_so_far[neighbor]:
-                cost_so_far[neighbor] = new_cost
-                # Calculate heuristic value (minimum distance to any goal)
-                min_h = min(heuristic(node[neighbor], node[goal]) for goal in destinations)
-                # f_value = g_value (actual cost) + h_value (heuristic estimate)
-                f_val = new_cost + min_h
-                # Add neighbor to frontier with updated values
-                heapq.heappush(frontier, (f_val, new_cost, neighbor, path + [neighbor]))
-
-    # No path found to any destination
-    return None, [], count
+import heapq  # For priority queue implementation
+from heuristicFunction import GoalDistance  # Cached distance-to-closest-goal heuristic
+from compact_graph import CompactGraph
+from frontier import LazyHeapFrontier
+from limits import first_check
+from path_utils import reconstruct_path
+
+def astar(node, graph, origin, destinations, heuristic_fn=None, workspace=None, frontier=None, probe=None,
+          limits=None):
+    """
+    A* Search Algorithm implementation to find the optimal path from origin to any destination.
+    
+    Args:
+        node (dict): Dictionary of node coordinates {node_id: (x, y)} (ignored for a CompactGraph,
+            which carries its own coordinates)
+        graph (dict or CompactGraph): Adjacency list representation of the graph {node_id: [(neighbor_id, cost)]}
+        origin (str): Starting node ID
+        destinations (list): List of goal node IDs
+        heuristic_fn (callable): Optional heuristic provider mapping a node to its estimated
+            distance to the closest destination (node IDs, or dense indices for a CompactGraph).
+            Defaults to a fresh GoalDistance table; pass an IndexedGoalDistance when there are
+            many destinations, or a table from a HeuristicCache to reuse it across queries.
+        workspace (SearchWorkspace): Optional reusable search state for a CompactGraph,
+            so the query allocates no per-node bookkeeping (its own heap replaces frontier)
+        frontier (callable): Frontier class for the open set (frontier.LazyHeapFrontier by
+            default; frontier.IndexedHeapFrontier keeps one entry per open node)
+        probe (SearchProbe): Optional instrumentation collecting counters for this run (the
+            workspace is not used then)
+        limits (SearchLimits): Optional deadline, expansion budget and cancellation token
+    
+    Returns:
+        tuple: (reached_destination, path, nodes_expanded)
+            - reached_destination: ID of the destination reached (or None if no path exists)
+            - path: List of nodes in the optimal path
+            - nodes_expanded: Number of nodes explored during search
+
+    Raises:
+        SearchExhausted: If the limits stop the search before it finds a destination
+    """
+    # Compact graphs are searched over dense node indices and translated back to IDs
+    if isinstance(graph, CompactGraph):
+        source, goals = graph.to_indices(origin, destinations)
+        if workspace is not None and probe is None:
+            return graph.to_result(*_astar_workspace(workspace, graph.coords, graph, source, goals, heuristic_fn,
+                                                     limits))
+        return graph.to_result(*_astar(graph.coords, graph, source, goals, heuristic_fn, frontier, probe, limits))
+    return _astar(node, graph, origin, destinations, heuristic_fn, frontier, probe, limits)
+
+
+def _astar(node, graph, origin, destinations, heuristic_fn, frontier, probe, limits):
+    # Heuristic table: each node's distance to the closest goal is computed once
+    h = GoalDistance(node, destinations) if heuristic_fn is None else heuristic_fn
+    destinations = set(destinations)
+    frontier = frontier or LazyHeapFrontier
+    if probe is not None:
+        graph, frontier, h = probe.graph(graph), probe.frontier(frontier), probe.heuristic(h)
+
+    # Initialize priority queue with start node (f_value, g_value, node_id)
+    frontier = frontier()
+    frontier.push((0, 0, origin))  # f=0, g=0 initially
+
+    # Dictionary to keep track of minimum cost to reach each node
+    cost_so_far = {origin: 0}
+
+    # Parent pointers for path reconstruction once a destination is reached
+    parent = {origin: None}
+    
+    # Set to track visited nodes to avoid cycles
+    visited = set()
+    
+    # Counter for number of nodes expanded
+    count = 0
+    check_at = first_check(limits)  # Expansion count at which the limits are polled next
+
+    while frontier:
+        # Get node with lowest f-value from priority queue
+        # f = g + h where g = cost so far, h = heuristic estimate
+        f, g, current = frontier.pop()
+        
+        # Skip if node already visited (better path was found)
+        if current in visited:
+            continue
+        visited.add(current)
+        
+        count += 1  # Increment nodes expanded counter
+        if count >= check_at:
+            check_at = limits.poll(count)  # Raises SearchExhausted once a limit is reached
+        
+        # Check if current node is a destination
+        if current in destinations:
+            return current, reconstruct_path(parent, current), count
+
+        # Explore all neighbors of current node
+        for neighbor, edge_cost in graph[current]:
+            # Expanded nodes keep the path they were expanded with, since their
+            # descendants' parent pointers depend on it
+            if neighbor in visited:
+                continue
+
+            # Calculate actual cost to reach neighbor through current path
+            new_cost = g + edge_cost
+            
+            # If new path is better than any previous path to this neighbor
+            if neighbor not in cost_so_far or new_cost < cost_so_far[neighbor]:
+                cost_so_far[neighbor] = new_cost
+                parent[neighbor] = current
+                # Calculate heuristic value (minimum distance to any goal)
+                min_h = h(neighbor)
+                # f_value = g_value (actual cost) + h_value (heuristic estimate)
+                f_val = new_cost + min_h
+                # Add neighbor to frontier with updated values
+                frontier.push((f_val, new_cost, neighbor))
+
+    # No path found to any destination
+    return None, [], count
+
+
+def _astar_workspace(workspace, node, graph, origin, destinations, heuristic_fn, limits):
+    # Same search as _astar, with cost_so_far, parent and visited kept in the workspace
+    # arrays and validated by the current generation stamp
+    h = GoalDistance(node, destinations) if heuristic_fn is None else heuristic_fn
+    destinations = set(destinations)
+
+    generation = workspace.begin(graph)
+    cost_so_far, parent, reached, visited = workspace.cost, workspace.parent, workspace.reached, workspace.closed
+    frontier = workspace.frontier
+    frontier.append((0, 0, origin))
+    cost_so_far[origin] = 0
+    parent[origin] = -1
+    reached[origin] = generation
+    count = 0
+    check_at = first_check(limits)  # Expansion count at which the limits are polled next
+
+    while frontier:
+        f, g, current = heapq.heappop(frontier)
+        if visited[current] == generation:
+            continue
+        visited[current] = generation
+        count += 1
+        if count >= check_at:
+            check_at = limits.poll(count)  # Raises SearchExhausted once a limit is reached
+
+        if current in destinations:
+            return current, workspace.path(current), count
+
+        for neighbor, edge_cost in graph[current]:
+            if visited[neighbor] == generation:
+                continue
+            new_cost = g + edge_cost
+            if reached[neighbor] != generation or new_cost < cost_so_far[neighbor]:
+                cost_so_far[neighbor] = new_cost
+                parent[neighbor] = current
+                reached[neighbor] = generation
+                heapq.heappush(frontier, (new_cost + h(neighbor), new_cost, neighbor))
+
+    return None, [], count
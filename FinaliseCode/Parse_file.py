@@ -1,91 +1,152 @@
-import sys
-from collections import deque
-import heapq
-import numpy as np
-
-def parse_file(filename):
-    """
-    Parses a graph description file containing nodes, edges, origin, and destinations.
-    
-    Args:
-        filename (str): Path to the input file containing graph description
-        
-    Returns:
-        tuple: (graph, node, origin, destinations) where:
-            - graph: Dict mapping node IDs to lists of (neighbor, cost) tuples
-            - node: Dict mapping node IDs to (x,y) coordinate tuples
-            - origin: Starting node ID
-            - destinations: List of goal node IDs
-    """
-    # Initialize data structures
-    graph = {}          # Adjacency list representation of the graph
-    node = {}           # Dictionary to store node coordinates
-    origin = None       # Starting node
-    destinations = []   # List of goal nodes
-
-    # Read all lines from file and strip whitespace
-    with open(filename, 'r') as f:
-        lines = f.read().strip().splitlines()
-
-    # Track current section being parsed
-    section = None
-
-    for line in lines:
-        line = line.strip()
-        if not line:
-            continue  # Skip empty lines
-
-        # Determine which section we're parsing
-        if line.startswith("Nodes:"):
-            section = "nodes"
-            continue
-        elif line.startswith("Edges:"):
-            section = "edges"
-            continue
-        elif line.startswith("Origin:"):
-            section = "origin"
-            continue
-        elif line.startswith("Destinations:"):
-            section = "destinations"
-            continue
-
-        if section == "nodes":
-            # Parse node format: "node_id: (x,y)"
-            node_part, coord_part = line.split(':')
-            node_id = node_part.strip()
-            # Clean and parse coordinates
-            coord_part = coord_part.strip()  # Remove surrounding whitespace
-            coords = tuple(map(float, coord_part.strip('() ').split(',')))  # Convert to tuple of floats
-            graph[node_id] = []              # Initialize empty adjacency list
-            node[node_id] = coords           # Store node coordinates
-
-        elif section == "edges":
-            # Parse edge format: "(start,end): cost"
-            edge_part, cost_part = line.split(':')
-            edge_part = edge_part.strip()
-            cost = cost_part.strip()
-
-            # Extract start and end nodes
-            edge_part = edge_part.replace('(', '').replace(')', '')
-            start_node, end_node = edge_part.split(',')
-            start_node = start_node.strip()
-            end_node = end_node.strip()
-
-            # Add directed edge to graph
-            if start_node not in graph:
-                graph[start_node] = []
-            graph[start_node].append((end_node, float(cost)))
-
-        elif section == "origin":
-            # Parse origin node
-            origin = line.strip()
-
-        elif section == "destinations":
-            # Parse semicolon-separated destination nodes
-            parts = line.split(';')
-            for p in parts:
-                dest = p.strip()
-                if dest:
-                    destinations.append(dest)
-
-    return graph, node, origin, destinations
+import os
+import re
+import time
+from compact_graph import CompactGraphBuilder, id_order
+from graph_cache import fresh_cache, load_graph
+
+# One compiled pattern per section, each matching a whole (stripped) line
+NODE_PATTERN = re.compile(r'([^:\s]+)\s*:\s*\(\s*([^,\s]+)\s*,\s*([^)\s]+)\s*\)')   # node_id: (x,y)
+EDGE_PATTERN = re.compile(r'\(\s*([^,\s]+)\s*,\s*([^)\s]+)\s*\)\s*:\s*(\S+)')       # (start,end): cost
+
+# Section headers and the section each one starts
+SECTIONS = {"Nodes:": "nodes", "Edges:": "edges", "Origin:": "origin", "Destinations:": "destinations"}
+SECTION_HEADERS = tuple(SECTIONS)
+
+def sort_adjacency(graph):
+    """
+    Puts the neighbour lists of a dict adjacency list into the canonical neighbour order
+    (see compact_graph.id_order), in place, so searches can iterate them directly.
+
+    Args:
+        graph (dict): Adjacency list {node: [(neighbor, cost)]}
+
+    Returns:
+        dict: The same graph
+    """
+    keys = {}  # Each ID's sort key, computed once however many edges lead to it
+
+    def edge_key(edge):
+        key = keys.get(edge[0])
+        if key is None:
+            key = keys[edge[0]] = id_order(edge[0])
+        return key
+
+    for adjacency in graph.values():
+        if len(adjacency) > 1:
+            adjacency.sort(key=edge_key)
+    return graph
+
+
+def parse_file(filename, compact=False, stats=None, use_cache=True):
+    """
+    Parses a graph description file containing nodes, edges, origin, and destinations.
+
+    The file is streamed line by line and the adjacency is built as edges are read, so
+    peak memory is the graph itself rather than several copies of the file's text.
+
+    With compact set, a compiled graph (see graph_cache.py) is memory-mapped instead of
+    parsing: either filename itself, or its cache if that is at least as new as the file.
+
+    Args:
+        filename (str): Path to the input file containing graph description
+        compact (bool): Build an integer-indexed CompactGraph instead of dicts
+        stats (dict): Optional dict that receives parse statistics: bytes, lines, nodes,
+            edges, seconds and throughput (MB/s)
+        use_cache (bool): Allow loading a compiled graph when compact is set
+
+    Returns:
+        tuple: (graph, node, origin, destinations) where:
+            - graph: Dict mapping node IDs to lists of (neighbor, cost) tuples, each in
+              the canonical neighbour order of compact_graph.id_order (a CompactGraph,
+              whose rows are in the same order, if compact is set)
+            - node: Dict mapping node IDs to (x,y) coordinate tuples
+              (the graph's Coordinates view, indexed by dense node index, if compact is set)
+            - origin: Starting node ID
+            - destinations: List of goal node IDs
+
+    Raises:
+        ValueError: If a node or edge line is malformed
+    """
+    if compact and use_cache:
+        cached = fresh_cache(filename)
+        if cached is not None:
+            return load_graph(cached, stats)
+
+    start_time = time.perf_counter()
+
+    # Initialize data structures
+    graph = {}          # Adjacency list representation of the graph
+    node = {}           # Dictionary to store node coordinates
+    origin = None       # Starting node
+    destinations = []   # List of goal nodes
+    builder = CompactGraphBuilder() if compact else None
+    line_count = edge_count = 0
+
+    # Track current section being parsed
+    section = None
+
+    with open(filename, 'r') as f:
+        for line_count, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue  # Skip empty lines
+
+            # Determine which section we're parsing
+            if line.startswith(SECTION_HEADERS):
+                section = SECTIONS[line[:line.index(':') + 1]]
+                continue
+
+            if section == "nodes":
+                # Parse node format: "node_id: (x,y)"
+                match = NODE_PATTERN.fullmatch(line)
+                if match is None:
+                    raise ValueError(f"{filename}:{line_count}: malformed node line {line!r}")
+                node_id, x, y = match.groups()
+                coords = (float(x), float(y))
+                if builder is not None:
+                    builder.add_node(node_id, *coords)
+                else:
+                    graph[node_id] = []          # Initialize empty adjacency list
+                    node[node_id] = coords       # Store node coordinates
+
+            elif section == "edges":
+                # Parse edge format: "(start,end): cost"
+                match = EDGE_PATTERN.fullmatch(line)
+                if match is None:
+                    raise ValueError(f"{filename}:{line_count}: malformed edge line {line!r}")
+                start_node, end_node, cost = match.groups()
+                edge_count += 1
+
+                # Add directed edge to graph
+                if builder is not None:
+                    builder.add_edge(start_node, end_node, float(cost))
+                else:
+                    adjacency = graph.get(start_node)
+                    if adjacency is None:
+                        adjacency = graph[start_node] = []
+                    adjacency.append((end_node, float(cost)))
+
+            elif section == "origin":
+                # Parse origin node
+                origin = line
+
+            elif section == "destinations":
+                # Parse semicolon-separated destination nodes
+                for p in line.split(';'):
+                    dest = p.strip()
+                    if dest:
+                        destinations.append(dest)
+
+    if builder is not None:
+        graph = builder.build()
+        node = graph.coords
+    else:
+        sort_adjacency(graph)
+
+    if stats is not None:
+        seconds = time.perf_counter() - start_time
+        byte_count = os.path.getsize(filename)
+        stats.update(bytes=byte_count, lines=line_count, nodes=len(graph), edges=edge_count,
+                     seconds=seconds, throughput=byte_count / 1e6 / seconds if seconds else float('inf'))
+
+    return graph, node, origin, destinations
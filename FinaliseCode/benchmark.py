@@ -0,0 +1,902 @@
+"""
+Benchmarks for the search algorithms in this folder.
+
+Usage:
+    python benchmark.py paths [--depths 500 1000 2000] [--width 3] [--compact]
+    python benchmark.py heuristics [--counts 1 10 100 1000 10000] [--nodes 2000]
+    python benchmark.py parse [--width 100] [--depth 1000]
+    python benchmark.py bidirectional [--sizes 50 100 200] [--queries 20]
+    python benchmark.py ch [--sizes 50 100] [--queries 100]
+    python benchmark.py alt [--sizes 100 200] [--landmarks 8] [--queries 50]
+    python benchmark.py matrix [--size 100] [--origins 50] [--targets 50] [--workers 4]
+    python benchmark.py workspace [--size 100] [--queries 200]
+    python benchmark.py frontier [--sizes 100] [--dense-nodes 500] [--queries 20]
+    python benchmark.py dynamic [--sizes 50 100] [--changes 1 10 100] [--rounds 20]
+    python benchmark.py levels [--kinds grid geometric scalefree road] [--edges 100000 1000000]
+                               [--queries 20]
+    python benchmark.py memory [--sizes 10 16] [--fractions 1.0 0.75 0.5] [--linear]
+    python benchmark.py anytime [--sizes 100 200] [--deadlines 1 5 20 100 0]
+    python benchmark.py limits [--sizes 100 200] [--rounds 5]
+    python benchmark.py startup [--methods DFS BFS ...] [--runs 10] [--baseline REV]
+    python benchmark.py suite [--kinds grid geometric scalefree road] [--edges 1000 10000 100000]
+                              [--methods DFS BFS ...] [--queries 20] [--json results.json]
+"""
+import argparse
+import gc
+import io
+import json
+import math
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+import tracemalloc
+from functools import partial
+
+from Astar import astar
+from bfs import bfs_search
+from bidirectional import bidirectional_astar, bidirectional_ucs, reverse_graph
+from compact_graph import CompactGraph
+from contraction import build_hierarchy, ch_search
+from cus2 import ara_star, cus2
+from dfs import dfs_search
+from distance_matrix import distance_matrix
+from dynamic import DynamicGraph, IncrementalSearch
+from frontier import CountingFrontier, FRONTIERS
+from gbfs import gbfs
+from graph_generator import KINDS, generate
+from heuristicFunction import GoalDistance, IndexedGoalDistance
+from landmarks import Landmarks
+from limits import CancelToken, SearchExhausted, SearchLimits
+from memory_bounded import ida_star, sma_star
+from Parse_file import parse_file, sort_adjacency
+from ucs import ucs_search
+from workspace import SearchWorkspace
+
+# Search methods by their search.py name, all called as (node, graph, origin, destinations)
+METHODS = {
+    "DFS": lambda node, graph, origin, destinations: dfs_search(graph, origin, destinations),
+    "BFS": lambda node, graph, origin, destinations: bfs_search(graph, origin, destinations),
+    "GBFS": gbfs,
+    "ASTAR": astar,
+    "CUS1": lambda node, graph, origin, destinations: ucs_search(graph, origin, destinations),
+    "CUS2": cus2,
+}
+
+
+def grid_graph(width, depth, seed=0):
+    """
+    Builds a deep grid graph: `depth` rows of `width` nodes, with edges in both directions
+    between horizontal and vertical neighbours. Edge costs are drawn uniformly from [1, 2),
+    so exact cost ties are as rare as on real road networks.
+
+    Returns:
+        tuple: (graph, node, origin, destinations) in the same form (and neighbour order) as
+        parse_file, with the origin in the first row and the single destination in the last row
+    """
+    rng = random.Random(seed)
+    graph = {}
+    node = {}
+    for row in range(depth):
+        for col in range(width):
+            node_id = str(row * width + col + 1)
+            node[node_id] = (float(col), float(row))
+            graph[node_id] = []
+    for row in range(depth):
+        for col in range(width):
+            node_id = str(row * width + col + 1)
+            if col + 1 < width:
+                right = str(row * width + col + 2)
+                cost = rng.uniform(1.0, 2.0)
+                graph[node_id].append((right, cost))
+                graph[right].append((node_id, cost))
+            if row + 1 < depth:
+                below = str((row + 1) * width + col + 1)
+                cost = rng.uniform(1.0, 2.0)
+                graph[node_id].append((below, cost))
+                graph[below].append((node_id, cost))
+    return sort_adjacency(graph), node, "1", [str(depth * width)]
+
+
+def path_cost(graph, path):
+    """Total cost of a path, taking the cheapest edge between consecutive nodes."""
+    return sum(min(cost for neighbor, cost in graph[a] if neighbor == b) for a, b in zip(path, path[1:]))
+
+
+def write_graph(filename, graph, node, origin, destinations):
+    """Writes a graph in the Nodes:/Edges:/Origin:/Destinations: text format read by parse_file."""
+    with open(filename, 'w') as f:
+        f.write("Nodes:\n")
+        for node_id, (x, y) in node.items():
+            f.write(f"{node_id}: ({x:g},{y:g})\n")
+        f.write("Edges:\n")
+        for start, edges in graph.items():
+            for end, cost in edges:
+                f.write(f"({start},{end}): {cost:.4g}\n")
+        f.write(f"Origin:\n{origin}\nDestinations:\n{'; '.join(destinations)}\n")
+
+
+def measure(search, *args):
+    """
+    Runs one search under tracemalloc.
+
+    Returns:
+        tuple: (result, seconds, peak_bytes) where peak_bytes is the peak traced allocation
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = search(*args)
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, seconds, peak
+
+
+def bench_paths(args):
+    """Reports peak search memory and time on increasingly deep graphs."""
+    print(f"{'method':<7}{'depth':>8}{'path':>8}{'expanded':>10}{'peak KiB':>12}{'ms':>10}")
+    for depth in args.depths:
+        graph, node, origin, destinations = grid_graph(args.width, depth)
+        if args.compact:
+            graph = CompactGraph.from_dicts(graph, node)
+            node = graph.coords
+        for method, search in METHODS.items():
+            (goal, path, expanded), seconds, peak = measure(search, node, graph, origin, destinations)
+            print(f"{method:<7}{depth:>8}{len(path):>8}{expanded:>10}{peak / 1024:>12.1f}{seconds * 1000:>10.1f}")
+
+
+def bench_heuristics(args):
+    """
+    Times the closest-destination heuristic for every node of a random point set, scanning
+    all destinations (GoalDistance) versus a k-d tree over them (IndexedGoalDistance).
+    """
+    rng = random.Random(args.seed)
+    node = {str(i + 1): (rng.uniform(0, 1000), rng.uniform(0, 1000)) for i in range(args.nodes)}
+    goal_pool = {f"g{i}": (rng.uniform(0, 1000), rng.uniform(0, 1000)) for i in range(max(args.counts))}
+    node.update(goal_pool)
+    queries = [str(i + 1) for i in range(args.nodes)]
+
+    print(f"{'destinations':>12}{'scan ms':>12}{'k-d tree ms':>14}{'speedup':>10}")
+    for count in args.counts:
+        destinations = list(goal_pool)[:count]
+        timings = []
+        tables = []
+        for table_class in (GoalDistance, IndexedGoalDistance):
+            start = time.perf_counter()
+            table = table_class(node, destinations)  # Build cost is part of the measurement
+            for n in queries:
+                table(n)
+            timings.append(time.perf_counter() - start)
+            tables.append(table)
+        assert all(tables[0](n) == tables[1](n) for n in queries)
+        scan, indexed = timings
+        print(f"{count:>12}{scan * 1000:>12.1f}{indexed * 1000:>14.1f}{scan / indexed:>10.1f}")
+
+
+def bench_parse(args):
+    """Reports parse time, throughput and peak memory for a generated grid graph file."""
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, "grid.txt")
+        write_graph(filename, *grid_graph(args.width, args.depth))
+        print(f"{'mode':<9}{'MB':>8}{'edges':>10}{'seconds':>10}{'MB/s':>8}{'peak MB':>10}")
+        for compact in (False, True):
+            stats = {}
+            _, _, peak = measure(parse_file, filename, compact, stats)
+            print(f"{'compact' if compact else 'dict':<9}{stats['bytes'] / 1e6:>8.1f}{stats['edges']:>10}"
+                  f"{stats['seconds']:>10.2f}{stats['throughput']:>8.1f}{peak / 1e6:>10.1f}")
+
+
+def bench_bidirectional(args):
+    """
+    Compares nodes expanded and query time of CUS1/BIUCS and ASTAR/BIASTAR on
+    TestCase/largeGraph.txt and on square grids of increasing size, checking that each
+    bidirectional search finds a path of the same cost.
+    """
+    graphs = [("largeGraph", parse_file("TestCase/largeGraph.txt"))]
+    for size in args.sizes:
+        graphs.append((f"grid{size}x{size}", grid_graph(size, size)))
+
+    pairs = [
+        ("CUS1", lambda node, graph, reverse, o, d: ucs_search(graph, o, d),
+         "BIUCS", lambda node, graph, reverse, o, d: bidirectional_ucs(graph, o, d, reverse)),
+        ("ASTAR", lambda node, graph, reverse, o, d: astar(node, graph, o, d),
+         "BIASTAR", lambda node, graph, reverse, o, d: bidirectional_astar(node, graph, o, d, reverse)),
+    ]
+    rng = random.Random(args.seed)
+    print(f"{'graph':<14}{'method':<9}{'expanded':>10}{'ms':>10}{'method':>10}{'expanded':>10}{'ms':>10}{'reduction':>11}")
+    for name, (graph, node, origin, destinations) in graphs:
+        reverse = reverse_graph(graph)
+        ids = list(node)
+        queries = [(origin, destinations)] + [(rng.choice(ids), [rng.choice(ids)]) for _ in range(args.queries - 1)]
+        for uni_name, uni, bi_name, bi in pairs:
+            totals = [0, 0.0, 0, 0.0]
+            for o, d in queries:
+                start = time.perf_counter()
+                goal, path, expanded = uni(node, graph, reverse, o, d)
+                totals[1] += time.perf_counter() - start
+                totals[0] += expanded
+                start = time.perf_counter()
+                bi_goal, bi_path, bi_expanded = bi(node, graph, reverse, o, d)
+                totals[3] += time.perf_counter() - start
+                totals[2] += bi_expanded
+                assert (goal is None) == (bi_goal is None)
+                if goal is not None:
+                    assert abs(path_cost(graph, path) - path_cost(graph, bi_path)) < 1e-9
+            print(f"{name:<14}{uni_name:<9}{totals[0]:>10}{totals[1] * 1000:>10.1f}{bi_name:>10}{totals[2]:>10}"
+                  f"{totals[3] * 1000:>10.1f}{1 - totals[2] / max(totals[0], 1):>11.0%}")
+
+
+def bench_ch(args):
+    """
+    Reports Contraction Hierarchy preprocessing time and shortcut count, then compares
+    nodes settled and query latency of CH against CUS1 on random queries, checking that
+    both find paths of the same cost.
+    """
+    graphs = [("largeGraph", parse_file("TestCase/largeGraph.txt"))]
+    for size in args.sizes:
+        graphs.append((f"grid{size}x{size}", grid_graph(size, size)))
+
+    rng = random.Random(args.seed)
+    print(f"{'graph':<14}{'edges':>8}{'shortcuts':>11}{'prep s':>9}"
+          f"{'CUS1 settled':>14}{'CUS1 ms':>10}{'CH settled':>12}{'CH ms':>9}{'speedup':>9}")
+    for name, (graph, node, origin, destinations) in graphs:
+        start = time.perf_counter()
+        hierarchy = build_hierarchy(graph)
+        preprocessing = time.perf_counter() - start
+
+        ids = list(node)
+        queries = [(origin, destinations)] + [(rng.choice(ids), [rng.choice(ids)]) for _ in range(args.queries - 1)]
+        totals = [0, 0.0, 0, 0.0]
+        for o, d in queries:
+            start = time.perf_counter()
+            goal, path, expanded = ucs_search(graph, o, d)
+            totals[1] += time.perf_counter() - start
+            totals[0] += expanded
+            start = time.perf_counter()
+            ch_goal, ch_path, settled = ch_search(graph, o, d, hierarchy)
+            totals[3] += time.perf_counter() - start
+            totals[2] += settled
+            assert (goal is None) == (ch_goal is None)
+            if goal is not None:
+                assert abs(path_cost(graph, path) - path_cost(graph, ch_path)) < 1e-9
+
+        count = len(queries)
+        edges = sum(len(edges) for edges in graph.values())
+        print(f"{name:<14}{edges:>8}{hierarchy.num_shortcuts:>11}{preprocessing:>9.2f}"
+              f"{totals[0] / count:>14.1f}{totals[1] / count * 1000:>10.3f}"
+              f"{totals[2] / count:>12.1f}{totals[3] / count * 1000:>9.3f}{totals[1] / totals[3]:>9.1f}")
+
+
+def bench_alt(args):
+    """
+    Compares nodes expanded and query time of ASTAR and CUS2 guided by straight-line
+    distance (GoalDistance) and by ALT landmark bounds, on the same random queries over
+    TestCase/largeGraph.txt and square grids, checking that ASTAR stays optimal.
+    """
+    graphs = [("largeGraph", parse_file("TestCase/largeGraph.txt"))]
+    for size in args.sizes:
+        graphs.append((f"grid{size}x{size}", grid_graph(size, size)))
+
+    rng = random.Random(args.seed)
+    print(f"{'graph':<14}{'prep s':>8}{'method':>8}{'euclid exp':>12}{'euclid ms':>11}"
+          f"{'ALT exp':>10}{'ALT ms':>9}{'reduction':>11}")
+    for name, (graph, node, origin, destinations) in graphs:
+        start = time.perf_counter()
+        landmarks = Landmarks.build(graph, args.landmarks, args.seed)
+        preprocessing = time.perf_counter() - start
+
+        ids = list(node)
+        queries = [(origin, destinations)] + [(rng.choice(ids), [rng.choice(ids)]) for _ in range(args.queries - 1)]
+        for method in ("ASTAR", "CUS2"):
+            search = METHODS[method]
+            totals = [0, 0.0, 0, 0.0]
+            for o, d in queries:
+                # Heuristic tables are built inside the timed region for both kinds
+                start = time.perf_counter()
+                goal, path, expanded = search(node, graph, o, d)
+                totals[1] += time.perf_counter() - start
+                totals[0] += expanded
+                start = time.perf_counter()
+                alt_goal, alt_path, alt_expanded = search(node, graph, o, d, heuristic_fn=landmarks.heuristic(d))
+                totals[3] += time.perf_counter() - start
+                totals[2] += alt_expanded
+                assert (goal is None) == (alt_goal is None)
+                if goal is not None and method == "ASTAR":
+                    assert abs(path_cost(graph, path) - path_cost(graph, alt_path)) < 1e-9
+            print(f"{name:<14}{preprocessing:>8.2f}{method:>8}{totals[0]:>12}{totals[1] * 1000:>11.1f}"
+                  f"{totals[2]:>10}{totals[3] * 1000:>9.1f}{1 - totals[2] / max(totals[0], 1):>11.0%}")
+
+
+def bench_matrix(args):
+    """
+    Times an origins x targets cost matrix on a square grid: one ucs_search per pair,
+    then distance_matrix in one process and on a worker pool, checking that all agree.
+    """
+    graph, node, _, _ = grid_graph(args.size, args.size)
+    rng = random.Random(args.seed)
+    ids = list(node)
+    origins = [rng.choice(ids) for _ in range(args.origins)]
+    targets = [rng.choice(ids) for _ in range(args.targets)]
+
+    start = time.perf_counter()
+    pairwise = [[path_cost(graph, ucs_search(graph, o, [t])[1]) for t in targets] for o in origins]
+    runs = [("ucs per pair", time.perf_counter() - start)]
+
+    for workers in (1, args.workers):
+        start = time.perf_counter()
+        matrix = distance_matrix(graph, origins, targets, workers)
+        runs.append((f"matrix x{workers}", time.perf_counter() - start))
+        assert all(abs(matrix[i][j] - pairwise[i][j]) < 1e-9
+                   for i in range(len(origins)) for j in range(len(targets)))
+
+    print(f"{len(origins)} x {len(targets)} on grid{args.size}x{args.size}")
+    print(f"{'mode':<14}{'seconds':>10}{'speedup':>10}")
+    for mode, seconds in runs:
+        print(f"{mode:<14}{seconds:>10.2f}{runs[0][1] / seconds:>10.1f}")
+
+
+def bench_workspace(args):
+    """
+    Runs the same random queries on a compact grid with fresh per-query bookkeeping and
+    with one reused SearchWorkspace, reporting time, the mean peak of traced allocations
+    per query and the number of garbage collections triggered.
+    """
+    graph, node, _, _ = grid_graph(args.size, args.size)
+    graph = CompactGraph.from_dicts(graph, node)
+    rng = random.Random(args.seed)
+    queries = [(graph.ids[rng.randrange(len(graph))], [graph.ids[rng.randrange(len(graph))]])
+               for _ in range(args.queries)]
+    workspace = SearchWorkspace(graph)
+    searches = {
+        "BFS": lambda o, d, ws: bfs_search(graph, o, d, ws),
+        "ASTAR": lambda o, d, ws: astar(graph.coords, graph, o, d, workspace=ws),
+        "CUS1": lambda o, d, ws: ucs_search(graph, o, d, ws),
+    }
+
+    def collections():
+        return sum(generation["collections"] for generation in gc.get_stats())
+
+    print(f"{'method':<7}{'mode':<11}{'ms/query':>10}{'peak KiB':>10}{'GCs':>6}")
+    for method, search in searches.items():
+        results = []
+        for mode, ws in (("fresh", None), ("workspace", workspace)):
+            # Timing and GC counts without tracing, then the traced peak per query
+            gc.collect()
+            before = collections()
+            start = time.perf_counter()
+            results.append([search(o, d, ws) for o, d in queries])
+            seconds = time.perf_counter() - start
+            collected = collections() - before
+            peaks = [measure(search, o, d, ws)[2] for o, d in queries[:20]]
+            print(f"{method:<7}{mode:<11}{seconds / len(queries) * 1000:>10.2f}"
+                  f"{sum(peaks) / len(peaks) / 1024:>10.1f}{collected:>6}")
+        assert results[0] == results[1]
+
+
+def dense_graph(nodes, degree, seed=0):
+    """
+    Builds a dense random graph: every node has `degree` outgoing edges to random nodes,
+    costing the straight-line distance times a random factor in [1, 3).
+
+    Returns:
+        tuple: (graph, node, origin, destinations) in the same form (and neighbour order) as parse_file
+    """
+    rng = random.Random(seed)
+    node = {str(i + 1): (rng.uniform(0, 100), rng.uniform(0, 100)) for i in range(nodes)}
+    ids = list(node)
+    graph = {}
+    for a in ids:
+        graph[a] = []
+        for b in rng.sample(ids, degree):
+            (ax, ay), (bx, by) = node[a], node[b]
+            graph[a].append((b, ((ax - bx) ** 2 + (ay - by) ** 2) ** 0.5 * rng.uniform(1.0, 3.0)))
+    return sort_adjacency(graph), node, ids[0], [ids[-1]]
+
+
+def bench_frontier(args):
+    """
+    Compares the lazy-deletion heapq frontier with the indexed decrease-key heap in
+    CUS1, ASTAR and CUS2: pushes, pops and peak frontier size (counted), and query time
+    (measured without the counting wrapper).
+    """
+    graphs = [("DenseGraph", parse_file("TestCase/DenseGraph.txt")),
+              (f"dense{args.dense_nodes}", dense_graph(args.dense_nodes, args.dense_nodes // 5, args.seed))]
+    for size in args.sizes:
+        graphs.append((f"grid{size}x{size}", grid_graph(size, size)))
+    searches = {
+        "CUS1": lambda node, graph, o, d, frontier: ucs_search(graph, o, d, frontier=frontier),
+        "ASTAR": lambda node, graph, o, d, frontier: astar(node, graph, o, d, frontier=frontier),
+        "CUS2": lambda node, graph, o, d, frontier: cus2(node, graph, o, d, frontier=frontier),
+    }
+
+    rng = random.Random(args.seed)
+    print(f"{'graph':<14}{'method':<7}{'frontier':<9}{'pushes':>9}{'pops':>9}{'peak':>8}{'ms':>9}")
+    for name, (graph, node, origin, destinations) in graphs:
+        ids = list(node)
+        queries = [(origin, destinations)] + [(rng.choice(ids), [rng.choice(ids)]) for _ in range(args.queries - 1)]
+        for method, search in searches.items():
+            results = []
+            for frontier_name, frontier_class in FRONTIERS.items():
+                counter = CountingFrontier(frontier_class)
+                peak = 0
+                for o, d in queries:
+                    search(node, graph, o, d, counter)
+                    peak = max(peak, counter.peak)
+                    counter.peak = 0
+                start = time.perf_counter()
+                results.append([search(node, graph, o, d, frontier_class) for o, d in queries])
+                seconds = time.perf_counter() - start
+                print(f"{name:<14}{method:<7}{frontier_name:<9}{counter.pushes:>9}{counter.pops:>9}{peak:>8}"
+                      f"{seconds * 1000:>9.1f}")
+            assert results[0] == results[1]
+
+
+def bench_dynamic(args):
+    """
+    Simulates a traffic feed on grids: each round changes the costs of random two-way roads
+    (by a factor between 0.5 and 2, both directions), then gets the new lowest cost path
+    from one corner to the other both by LPA* re-planning and by a fresh CUS1 search,
+    checking that the results are the same.
+    """
+    rng = random.Random(args.seed)
+    print(f"{'graph':<14}{'changes':>8}{'CUS1 expanded':>15}{'CUS1 ms':>9}"
+          f"{'LPA* expanded':>15}{'LPA* ms':>9}{'speedup':>9}")
+    for size in args.sizes:
+        graph, node, origin, destinations = grid_graph(size, size, args.seed)
+        for changes in args.changes:
+            dynamic = DynamicGraph(graph)
+            search = IncrementalSearch(dynamic, origin, destinations)
+            search.search()
+            edges = [(start, end) for start in dynamic for end in dynamic.successors[start]]
+            totals = [0, 0.0, 0, 0.0]
+            for _ in range(args.rounds):
+                for _ in range(changes):
+                    start, end = rng.choice(edges)
+                    cost = dynamic.cost(start, end) * rng.uniform(0.5, 2.0)
+                    dynamic.set_cost(start, end, cost)
+                    dynamic.set_cost(end, start, cost)
+                begin = time.perf_counter()
+                goal, path, expanded = ucs_search(dynamic, origin, destinations)
+                totals[1] += time.perf_counter() - begin
+                totals[0] += expanded
+                begin = time.perf_counter()
+                result = search.search()
+                totals[3] += time.perf_counter() - begin
+                totals[2] += result[2]
+                assert result[:2] == (goal, path)
+
+            rounds = args.rounds
+            print(f"{f'grid{size}x{size}':<14}{changes:>8}{totals[0] / rounds:>15.1f}{totals[1] / rounds * 1000:>9.2f}"
+                  f"{totals[2] / rounds:>15.1f}{totals[3] / rounds * 1000:>9.2f}{totals[1] / totals[3]:>9.1f}")
+
+
+def bench_levels(args):
+    """
+    Times BFS on generated graphs (loaded as CompactGraphs): bfs_search, then level_bfs
+    expanding only top-down and with direction switching, checking that all three give
+    the same goals, paths and expansion counts.
+    """
+    from bfs_levels import level_bfs, level_graph  # Need numpy, which the other benchmarks do not
+
+    searches = {
+        "bfs_search": lambda graph, o, d: bfs_search(graph, o, d),
+        "top-down": lambda graph, o, d: level_bfs(graph, o, d, alpha=0),
+        "direction-opt": level_bfs,
+    }
+    print(f"{'graph':<18}{'mode':<15}{'expanded':>10}{'ms/query':>10}{'speedup':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for kind in args.kinds:
+            for edges in args.edges:
+                filename = os.path.join(tmp, f"{kind}{edges}.txt")
+                summary = generate(filename, kind, edges, args.seed)
+                graph, _, _, _ = parse_file(filename, compact=True)
+                rng = random.Random(args.seed)
+                queries = [(graph.ids[rng.randrange(len(graph))], [graph.ids[rng.randrange(len(graph))]])
+                           for _ in range(args.queries)]
+                level_graph(graph).in_arrays()  # Builds the array views outside the timings
+
+                name = f"{kind}-{summary['edges']}"
+                baseline = None
+                for mode, search in searches.items():
+                    start = time.perf_counter()
+                    results = [search(graph, o, d) for o, d in queries]
+                    seconds = (time.perf_counter() - start) / len(queries)
+                    if baseline is None:
+                        baseline, expected = seconds, results
+                    assert results == expected, mode
+                    expanded = sum(result[2] for result in results) / len(results)
+                    print(f"{name:<18}{mode:<15}{expanded:>10.0f}{seconds * 1000:>10.2f}{baseline / seconds:>9.1f}")
+                del graph
+
+
+def bench_memory(args):
+    """
+    Compares ASTAR with the memory-bounded IDASTAR and SMASTAR from corner to corner of
+    square grids: nodes expanded, peak traced memory and time, checking that every path
+    found has the lowest cost. The budgets (SMASTAR's max_nodes, IDASTAR's transposition
+    table size) are fractions of the number of nodes ASTAR expands.
+    """
+    print(f"{'graph':<14}{'method':<9}{'budget':>8}{'expanded':>10}{'peak KiB':>10}{'ms':>10}")
+    for size in args.sizes:
+        graph, node, origin, destinations = grid_graph(size, size, args.seed)
+        name = f"grid{size}x{size}"
+        searches = [("ASTAR", "-", partial(astar, node, graph, origin, destinations))]
+        expanded = astar(node, graph, origin, destinations)[2]
+        if args.linear:
+            searches.append(("IDASTAR", 0, partial(ida_star, node, graph, origin, destinations)))
+        for fraction in args.fractions:
+            budget = max(2, int(expanded * fraction))
+            searches.append(("IDASTAR", budget, partial(ida_star, node, graph, origin, destinations,
+                                                        table_size=budget)))
+            searches.append(("SMASTAR", budget, partial(sma_star, node, graph, origin, destinations,
+                                                        max_nodes=budget)))
+
+        lowest = None
+        for method, budget, search in searches:
+            start = time.perf_counter()
+            goal, path, count = search()
+            seconds = time.perf_counter() - start
+            _, _, peak = measure(search)
+            cost = path_cost(graph, path) if goal is not None else math.inf
+            lowest = cost if lowest is None else lowest
+            assert abs(cost - lowest) < 1e-9, (method, budget, cost, lowest)
+            print(f"{name:<14}{method:<9}{budget:>8}{count:>10}{peak / 1024:>10.1f}{seconds * 1000:>10.1f}")
+
+
+def bench_anytime(args):
+    """
+    ARASTAR with deadlines against CUS2 and ASTAR, from corner to corner of square grids:
+    nodes expanded, the suboptimality bound reported, the actual ratio of the path's cost
+    to the lowest cost, and time. A deadline of 0 runs ARASTAR until its path is optimal.
+    """
+    print(f"{'graph':<14}{'method':<9}{'deadline':>9}{'expanded':>10}{'bound':>8}{'ratio':>8}{'ms':>10}")
+    for size in args.sizes:
+        graph, node, origin, destinations = grid_graph(size, size, args.seed)
+        name = f"grid{size}x{size}"
+        lowest = path_cost(graph, ucs_search(graph, origin, destinations)[1])
+
+        def row(method, deadline, search):
+            start = time.perf_counter()
+            try:
+                goal, path, count, *bound = search()
+            except SearchExhausted as e:
+                # The deadline passed before the first path was found
+                seconds = time.perf_counter() - start
+                print(f"{name:<14}{method:<9}{deadline:>9}{e.nodes_expanded:>10}{'-':>8}{'-':>8}{seconds * 1000:>10.1f}")
+                return
+            seconds = time.perf_counter() - start
+            ratio = path_cost(graph, path) / lowest if goal is not None else math.inf
+            bound = f"{bound[0]:.3f}" if bound else "-"
+            print(f"{name:<14}{method:<9}{deadline:>9}{count:>10}{bound:>8}{ratio:>8.3f}{seconds * 1000:>10.1f}")
+
+        row("ASTAR", "-", partial(astar, node, graph, origin, destinations))
+        row("CUS2", "-", partial(cus2, node, graph, origin, destinations))
+        for deadline in args.deadlines:
+            # The deadline is set when the search is called, not when the row is built
+            row("ARASTAR", deadline or "none", lambda: ara_star(
+                node, graph, origin, destinations, time.monotonic() + deadline / 1000 if deadline else None))
+
+
+def bench_limits(args):
+    """
+    Cost of checking limits in the search loops: every method from corner to corner of
+    square grids without limits, and with a distant deadline, an unreachable expansion
+    budget and a cancellation token, all polled but never reached. Reports the fastest of
+    the rounds of each, and the relative overhead.
+    """
+    searches = {
+        "DFS": lambda node, graph, o, d, limits: dfs_search(graph, o, d, limits=limits),
+        "BFS": lambda node, graph, o, d, limits: bfs_search(graph, o, d, limits=limits),
+        "GBFS": lambda node, graph, o, d, limits: gbfs(node, graph, o, d, limits=limits),
+        "ASTAR": lambda node, graph, o, d, limits: astar(node, graph, o, d, limits=limits),
+        "CUS1": lambda node, graph, o, d, limits: ucs_search(graph, o, d, limits=limits),
+        "CUS2": lambda node, graph, o, d, limits: cus2(node, graph, o, d, limits=limits),
+    }
+    print(f"{'graph':<14}{'method':<7}{'expanded':>10}{'none ms':>10}{'limits ms':>11}{'overhead':>10}")
+    for size in args.sizes:
+        graph, node, origin, destinations = grid_graph(size, size, args.seed)
+        name = f"grid{size}x{size}"
+        for method, search in searches.items():
+            fastest = {}
+            # Rounds alternate between the two modes, so drifts in machine load affect both
+            for _ in range(args.rounds):
+                for mode in ("none", "limits"):
+                    limits = None
+                    if mode == "limits":
+                        limits = SearchLimits.within(3600, sys.maxsize, CancelToken())
+                    start = time.perf_counter()
+                    result = search(node, graph, origin, destinations, limits)
+                    seconds = time.perf_counter() - start
+                    fastest[mode] = min(fastest.get(mode, math.inf), seconds)
+            overhead = fastest["limits"] / fastest["none"] - 1
+            print(f"{name:<14}{method:<7}{result[2]:>10}{fastest['none'] * 1000:>10.1f}"
+                  f"{fastest['limits'] * 1000:>11.1f}{overhead:>10.1%}")
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a non-empty list of values."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))]
+
+
+def code_version():
+    """Commit hash of the working tree (with a -dirty suffix if modified), or None outside git."""
+    try:
+        here = os.path.dirname(os.path.abspath(__file__))
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=here,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=here,
+                               capture_output=True, text=True, check=True).stdout.strip()
+        return commit + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def import_time(directory, module="search"):
+    """Cumulative import time of a module in a fresh interpreter, in seconds (python -X importtime)."""
+    stderr = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=directory,
+                            capture_output=True, text=True, check=True).stderr
+    for line in stderr.splitlines():
+        # "import time: <self us> | <cumulative us> | <indented module name>"
+        fields = line.split("|")
+        if len(fields) == 3 and fields[2].strip() == module:
+            return int(fields[1]) / 1e6
+    raise ValueError(f"no import time reported for {module}")
+
+
+def checkout(revision, directory):
+    """Extracts this folder as of a git revision into directory, returning the folder's path there."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    run = partial(subprocess.run, cwd=here, capture_output=True, check=True)
+    top = run(["git", "rev-parse", "--show-toplevel"], text=True).stdout.strip()
+    prefix = run(["git", "rev-parse", "--show-prefix"], text=True).stdout.strip()
+    archive = subprocess.run(["git", "archive", f"{revision}:{prefix}"], cwd=top,
+                             capture_output=True, check=True).stdout
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        tar.extractall(directory)
+    return directory
+
+
+def bench_startup(args):
+    """
+    Cold-start latency of the CLI: median import time of search.py and median wall time
+    of one-query runs per method (interpreter start, imports, parsing and search), each
+    in a fresh process. With a baseline revision the same is measured for that version.
+    """
+    filename = os.path.abspath(args.graph)
+    with tempfile.TemporaryDirectory() as temp:
+        trees = [("working tree", os.path.dirname(os.path.abspath(__file__)))]
+        if args.baseline:
+            trees.insert(0, (args.baseline, checkout(args.baseline, temp)))
+
+        print(f"{'version':<14}{'import ms':>10}" + "".join(f"{method:>8}" for method in args.methods)
+              + "   (ms per one-query run)")
+        for name, directory in trees:
+            imports = statistics.median(import_time(directory) for _ in range(args.runs))
+            runs = []
+            for method in args.methods:
+                seconds = []
+                for _ in range(args.runs):
+                    start = time.perf_counter()
+                    subprocess.run([sys.executable, "search.py", filename, method], cwd=directory,
+                                   capture_output=True, check=True)
+                    seconds.append(time.perf_counter() - start)
+                runs.append(statistics.median(seconds))
+            print(f"{name:<14}{imports * 1000:>10.1f}" + "".join(f"{s * 1000:>8.1f}" for s in runs))
+
+
+def bench_suite(args):
+    """
+    Generates synthetic graphs of every kind and size, parses each one and runs every
+    method on the same random queries, reporting parse time and memory, query latency
+    percentiles, nodes expanded, peak frontier size and peak query memory.
+
+    Latencies come from an untraced pass over all queries; peak frontier size (for the
+    heap based methods) and peak traced memory come from a second, instrumented pass over
+    the first --traced queries. With --json, every row is also written, with the run's
+    code version and platform, as one JSON document for comparing runs.
+    """
+    frontier_methods = {
+        "GBFS": lambda node, graph, o, d, frontier: gbfs(node, graph, o, d, frontier=frontier),
+        "ASTAR": lambda node, graph, o, d, frontier: astar(node, graph, o, d, frontier=frontier),
+        "CUS1": lambda node, graph, o, d, frontier: ucs_search(graph, o, d, frontier=frontier),
+        "CUS2": lambda node, graph, o, d, frontier: cus2(node, graph, o, d, frontier=frontier),
+    }
+    results = []
+    print(f"{'graph':<18}{'method':<7}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}{'expanded':>10}"
+          f"{'frontier':>10}{'peak KiB':>10}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for kind in args.kinds:
+            for edges in args.edges:
+                filename = os.path.join(tmp, f"{kind}{edges}.txt")
+                summary = generate(filename, kind, edges, args.seed)
+
+                stats = {}
+                graph, node, _, _ = parse_file(filename, stats=stats)
+                _, _, parse_peak = measure(parse_file, filename)
+                name = f"{kind}-{summary['edges']}"
+                print(f"{name:<18}parsed {stats['bytes'] / 1e6:.1f} MB in {stats['seconds']:.2f}s "
+                      f"({stats['throughput']:.1f} MB/s), peak {parse_peak / 1e6:.1f} MB")
+
+                rng = random.Random(args.seed)
+                ids = list(node)
+                queries = [(rng.choice(ids), [rng.choice(ids)]) for _ in range(args.queries)]
+                for method in args.methods:
+                    search = METHODS[method]
+                    latencies = []
+                    expanded = []
+                    found = 0
+                    for o, d in queries:
+                        start = time.perf_counter()
+                        goal, path, count = search(node, graph, o, d)
+                        latencies.append((time.perf_counter() - start) * 1000)
+                        expanded.append(count)
+                        found += goal is not None
+
+                    peak_frontier = None
+                    peak_memory = 0
+                    for o, d in queries[:args.traced]:
+                        if method in frontier_methods:
+                            counter = CountingFrontier(FRONTIERS["lazy"])
+                            _, _, peak = measure(frontier_methods[method], node, graph, o, d, counter)
+                            peak_frontier = max(peak_frontier or 0, counter.peak)
+                        else:
+                            _, _, peak = measure(search, node, graph, o, d)
+                        peak_memory = max(peak_memory, peak)
+
+                    row = {
+                        "kind": kind, "nodes": summary["nodes"], "edges": summary["edges"],
+                        "parse_seconds": stats["seconds"], "parse_mb_per_s": stats["throughput"],
+                        "parse_peak_bytes": parse_peak, "method": method, "queries": len(queries),
+                        "found": found,
+                        "latency_ms": {"mean": sum(latencies) / len(latencies),
+                                       "p50": percentile(latencies, 0.5), "p90": percentile(latencies, 0.9),
+                                       "p99": percentile(latencies, 0.99), "max": max(latencies)},
+                        "expanded_mean": sum(expanded) / len(expanded),
+                        "peak_frontier": peak_frontier, "peak_memory_bytes": peak_memory,
+                    }
+                    results.append(row)
+                    latency = row["latency_ms"]
+                    print(f"{name:<18}{method:<7}{latency['p50']:>9.2f}{latency['p90']:>9.2f}{latency['p99']:>9.2f}"
+                          f"{row['expanded_mean']:>10.0f}{'-' if peak_frontier is None else peak_frontier:>10}"
+                          f"{peak_memory / 1024:>10.1f}")
+                del graph, node
+
+    if args.json:
+        document = {
+            "version": code_version(), "python": platform.python_version(), "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"), "seed": args.seed, "results": results,
+        }
+        with open(args.json, "w") as f:
+            json.dump(document, f, indent=1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks for the search algorithms")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    paths = commands.add_parser("paths", help="peak memory of path bookkeeping on deep graphs")
+    paths.add_argument("--depths", type=int, nargs="+", default=[500, 1000, 2000])
+    paths.add_argument("--width", type=int, default=3)
+    paths.add_argument("--compact", action="store_true", help="search the CompactGraph form")
+    paths.set_defaults(run=bench_paths)
+
+    heuristics = commands.add_parser("heuristics", help="closest-destination lookups: scan vs k-d tree")
+    heuristics.add_argument("--counts", type=int, nargs="+", default=[1, 10, 100, 1000, 10000])
+    heuristics.add_argument("--nodes", type=int, default=2000, help="nodes to evaluate per count")
+    heuristics.add_argument("--seed", type=int, default=0)
+    heuristics.set_defaults(run=bench_heuristics)
+
+    parse = commands.add_parser("parse", help="parse throughput and memory on a generated file")
+    parse.add_argument("--width", type=int, default=100)
+    parse.add_argument("--depth", type=int, default=1000)
+    parse.set_defaults(run=bench_parse)
+
+    bidirectional = commands.add_parser("bidirectional", help="nodes expanded: one- vs two-directional search")
+    bidirectional.add_argument("--sizes", type=int, nargs="+", default=[50, 100, 200])
+    bidirectional.add_argument("--queries", type=int, default=20)
+    bidirectional.add_argument("--seed", type=int, default=0)
+    bidirectional.set_defaults(run=bench_bidirectional)
+
+    ch = commands.add_parser("ch", help="Contraction Hierarchies: preprocessing cost and query speed vs CUS1")
+    ch.add_argument("--sizes", type=int, nargs="+", default=[50, 100])
+    ch.add_argument("--queries", type=int, default=100)
+    ch.add_argument("--seed", type=int, default=0)
+    ch.set_defaults(run=bench_ch)
+
+    alt = commands.add_parser("alt", help="ASTAR and CUS2: straight-line vs ALT landmark heuristic")
+    alt.add_argument("--sizes", type=int, nargs="+", default=[100, 200])
+    alt.add_argument("--landmarks", type=int, default=8)
+    alt.add_argument("--queries", type=int, default=50)
+    alt.add_argument("--seed", type=int, default=0)
+    alt.set_defaults(run=bench_alt)
+
+    matrix = commands.add_parser("matrix", help="cost matrix: search per pair vs one Dijkstra per origin")
+    matrix.add_argument("--size", type=int, default=100)
+    matrix.add_argument("--origins", type=int, default=50)
+    matrix.add_argument("--targets", type=int, default=50)
+    matrix.add_argument("--workers", type=int, default=4)
+    matrix.add_argument("--seed", type=int, default=0)
+    matrix.set_defaults(run=bench_matrix)
+
+    workspace = commands.add_parser("workspace", help="per-query allocation: fresh state vs reused workspace")
+    workspace.add_argument("--size", type=int, default=100)
+    workspace.add_argument("--queries", type=int, default=200)
+    workspace.add_argument("--seed", type=int, default=0)
+    workspace.set_defaults(run=bench_workspace)
+
+    frontier = commands.add_parser("frontier", help="open set: lazy-deletion heapq vs indexed decrease-key heap")
+    frontier.add_argument("--sizes", type=int, nargs="+", default=[100])
+    frontier.add_argument("--dense-nodes", type=int, default=500)
+    frontier.add_argument("--queries", type=int, default=20)
+    frontier.add_argument("--seed", type=int, default=0)
+    frontier.set_defaults(run=bench_frontier)
+
+    dynamic = commands.add_parser("dynamic", help="re-planning after edge cost changes: LPA* vs fresh CUS1")
+    dynamic.add_argument("--sizes", type=int, nargs="+", default=[50, 100])
+    dynamic.add_argument("--changes", type=int, nargs="+", default=[1, 10, 100],
+                         help="roads changed between re-plans")
+    dynamic.add_argument("--rounds", type=int, default=20)
+    dynamic.add_argument("--seed", type=int, default=0)
+    dynamic.set_defaults(run=bench_dynamic)
+
+    levels = commands.add_parser("levels", help="BFS: one node at a time vs level-synchronous NumPy levels")
+    levels.add_argument("--kinds", nargs="+", choices=KINDS, default=list(KINDS))
+    levels.add_argument("--edges", type=int, nargs="+", default=[100000, 1000000],
+                        help="approximate edge counts (up to 10M)")
+    levels.add_argument("--queries", type=int, default=20)
+    levels.add_argument("--seed", type=int, default=0)
+    levels.set_defaults(run=bench_levels)
+
+    memory = commands.add_parser("memory", help="peak memory and expansions: ASTAR vs IDASTAR and SMASTAR")
+    memory.add_argument("--sizes", type=int, nargs="+", default=[10, 16])
+    memory.add_argument("--fractions", type=float, nargs="+", default=[1.0, 0.75, 0.5],
+                        help="budgets as fractions of the nodes ASTAR expands")
+    memory.add_argument("--linear", action="store_true",
+                        help="also run IDASTAR without a transposition table (exponential on grids)")
+    memory.add_argument("--seed", type=int, default=0)
+    memory.set_defaults(run=bench_memory)
+
+    anytime = commands.add_parser("anytime", help="ARASTAR bounds within deadlines vs CUS2 and ASTAR")
+    anytime.add_argument("--sizes", type=int, nargs="+", default=[100, 200])
+    anytime.add_argument("--deadlines", type=float, nargs="+", default=[1, 5, 20, 100, 0],
+                         help="milliseconds (0: no deadline)")
+    anytime.add_argument("--seed", type=int, default=0)
+    anytime.set_defaults(run=bench_anytime)
+
+    limits = commands.add_parser("limits", help="search loop overhead of deadline, budget and cancellation checks")
+    limits.add_argument("--sizes", type=int, nargs="+", default=[100, 200])
+    limits.add_argument("--rounds", type=int, default=5)
+    limits.add_argument("--seed", type=int, default=0)
+    limits.set_defaults(run=bench_limits)
+
+    startup = commands.add_parser("startup", help="CLI cold start: import time and one-query run time")
+    startup.add_argument("--graph", default="TestCase/DenseGraph.txt")
+    startup.add_argument("--methods", nargs="+", default=["DFS", "BFS", "GBFS", "ASTAR", "CUS1", "CUS2"])
+    startup.add_argument("--runs", type=int, default=10)
+    startup.add_argument("--baseline", metavar="REV", help="also measure this git revision (e.g. HEAD~1)")
+    startup.set_defaults(run=bench_startup)
+
+    suite = commands.add_parser("suite", help="every method on generated graphs, machine-readable results")
+    suite.add_argument("--kinds", nargs="+", choices=KINDS, default=list(KINDS))
+    suite.add_argument("--edges", type=int, nargs="+", default=[1000, 10000, 100000],
+                       help="approximate edge counts (up to 10M)")
+    suite.add_argument("--methods", nargs="+", choices=list(METHODS), default=list(METHODS))
+    suite.add_argument("--queries", type=int, default=20)
+    suite.add_argument("--traced", type=int, default=3, help="queries repeated under instrumentation")
+    suite.add_argument("--seed", type=int, default=0)
+    suite.add_argument("--json", metavar="FILE", help="also write the results as JSON")
+    suite.set_defaults(run=bench_suite)
+
+    args = parser.parse_args()
+    args.run(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,49 +1,102 @@
-from collections import deque
-
-def bfs_search(graph, origin, destinations):
-    """
-    Performs Breadth-First Search to find the shortest unweighted path from origin to any destination.
-    
-    Args:
-        graph (dict): Adjacency list representation where each key maps to list of (neighbor, cost) tuples
-        origin (str): Starting node ID
-        destinations (list): List of goal node IDs
-    
-    Returns:
-        tuple: (destination_reached, path, nodes_expanded) where:
-            - destination_reached: First destination found or None if no path exists
-            - path: List of nodes in order from origin to destination
-            - nodes_expanded: Number of nodes explored during search
-    """
-    # Initialize data structures for BFS
-    visited = set([origin])      # Track visited nodes to avoid cycles
-    queue = deque([origin])      # FIFO queue for BFS node expansion
-    parent = {origin: None}      # Store parent pointers for path reconstruction
-    nodes_created = 0            # Counter for performance tracking
-
-    while queue:
-        # Get next node from front of queue (FIFO order ensures shortest path)
-        current = queue.popleft()
-        nodes_created += 1
-
-        # Check if we've reached any destination
-        if current in destinations:
-            # Reconstruct path by following parent pointers backwards
-            path = []
-            temp = current
-            while temp is not None:
-                path.append(temp)
-                temp = parent[temp]
-            path.reverse()  # Convert from destination->origin to origin->destination
-            return current, path, nodes_created
-
-        # Process all unvisited neighbors
-        # Sort neighbors by ID for consistent tie-breaking
-        for neighbor, _ in sorted(graph.get(current, []), key=lambda x: int(x[0])):
-            if neighbor not in visited:
-                visited.add(neighbor)          # Mark as visited
-                parent[neighbor] = current     # Record how we reached this node
-                queue.append(neighbor)         # Add to queue for later expansion
-
-    # No path found to any destination
-    return None, [], nodes_created
\ No newline at end of file
+from compact_graph import CompactGraph
+from frontier import FifoFrontier
+from limits import first_check
+from path_utils import reconstruct_path
+
+def bfs_search(graph, origin, destinations, workspace=None, probe=None, limits=None):
+    """
+    Performs Breadth-First Search to find the shortest unweighted path from origin to any destination.
+    
+    Args:
+        graph (dict or CompactGraph): Adjacency list representation where each key maps to list of (neighbor, cost) tuples
+        origin (str): Starting node ID
+        destinations (list): List of goal node IDs
+        workspace (SearchWorkspace): Optional reusable search state for a CompactGraph,
+            so the query allocates no per-node bookkeeping
+        probe (SearchProbe): Optional instrumentation collecting counters for this run (the
+            workspace is not used then)
+        limits (SearchLimits): Optional deadline, expansion budget and cancellation token
+    
+    Returns:
+        tuple: (destination_reached, path, nodes_expanded) where:
+            - destination_reached: First destination found or None if no path exists
+            - path: List of nodes in order from origin to destination
+            - nodes_expanded: Number of nodes explored during search
+
+    Raises:
+        SearchExhausted: If the limits stop the search before it finds a destination
+    """
+    # Compact graphs are searched over dense node indices and translated back to IDs
+    if isinstance(graph, CompactGraph):
+        source, goals = graph.to_indices(origin, destinations)
+        if workspace is not None and probe is None:
+            return graph.to_result(*_bfs_workspace(workspace, graph, source, goals, limits))
+        return graph.to_result(*_bfs_search(graph, source, goals, probe, limits))
+    return _bfs_search(graph, origin, destinations, probe, limits)
+
+
+def _bfs_search(graph, origin, destinations, probe, limits):
+    frontier = FifoFrontier
+    if probe is not None:
+        graph, frontier = probe.graph(graph), probe.frontier(frontier)
+
+    # Initialize data structures for BFS
+    visited = set([origin])      # Track visited nodes to avoid cycles
+    queue = frontier()           # FIFO queue for BFS node expansion
+    queue.push(origin)
+    parent = {origin: None}      # Store parent pointers for path reconstruction
+    nodes_created = 0            # Counter for performance tracking
+    check_at = first_check(limits)  # Expansion count at which the limits are polled next
+
+    while queue:
+        # Get next node from front of queue (FIFO order ensures shortest path)
+        current = queue.pop()
+        nodes_created += 1
+        if nodes_created >= check_at:
+            check_at = limits.poll(nodes_created)  # Raises SearchExhausted once a limit is reached
+
+        # Check if we've reached any destination
+        if current in destinations:
+            # Reconstruct path by following parent pointers backwards
+            return current, reconstruct_path(parent, current), nodes_created
+
+        # Process all unvisited neighbors
+        for neighbor, _ in graph.get(current, []):
+            if neighbor not in visited:
+                visited.add(neighbor)          # Mark as visited
+                parent[neighbor] = current     # Record how we reached this node
+                queue.push(neighbor)           # Add to queue for later expansion
+
+    # No path found to any destination
+    return None, [], nodes_created
+
+def _bfs_workspace(workspace, graph, origin, destinations, limits):
+    # Same search as _bfs_search, with the FIFO queue laid out in the workspace's queue
+    # buffer (every node is enqueued at most once) and visited marks as generation stamps
+    generation = workspace.begin(graph)
+    parent, visited, queue = workspace.parent, workspace.reached, workspace.queue
+    visited[origin] = generation
+    parent[origin] = -1
+    queue[0] = origin
+    head, tail = 0, 1
+    nodes_created = 0
+    check_at = first_check(limits)  # Expansion count at which the limits are polled next
+
+    while head < tail:
+        current = queue[head]
+        head += 1
+        nodes_created += 1
+        if nodes_created >= check_at:
+            check_at = limits.poll(nodes_created)  # Raises SearchExhausted once a limit is reached
+
+        if current in destinations:
+            return current, workspace.path(current), nodes_created
+
+        for neighbor, _ in graph.get(current, []):
+            if visited[neighbor] != generation:
+                visited[neighbor] = generation
+                parent[neighbor] = current
+                queue[tail] = neighbor
+                tail += 1
+
+    return None, [], nodes_created
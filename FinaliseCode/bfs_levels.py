@@ -0,0 +1,234 @@
+"""
+Level-synchronous breadth-first search over the CSR arrays of a CompactGraph (needs numpy).
+
+bfs_search pops one node at a time and checks each neighbour against a visited set.
+level_bfs instead expands a whole BFS level at once with array operations, choosing
+for every level between two directions (Beamer's direction-optimizing BFS):
+
+- top-down: gather the out-edges of every frontier node and keep the unvisited targets;
+  its work is the number of edges leaving the frontier.
+- bottom-up: look at the in-edges of every unvisited node for a parent in the frontier;
+  its work is the number of edges entering unvisited nodes, which is the smaller one
+  once the frontier has grown to cover a large part of the graph.
+
+Both directions order each new level exactly as bfs_search's FIFO queue would: by the
+queue position of the node's first discoverer, then by that node's edge order. So the
+goal (the first destination in queue order), the path (through first discoverers) and
+nodes_expanded (nodes popped up to and including the goal) are all identical to
+bfs_search on the same graph.
+"""
+import weakref
+import numpy as np
+from compact_graph import CompactGraph
+from limits import first_check
+
+# Bottom-up steps are taken when alpha * (edges leaving the frontier) exceeds the edges
+# entering unvisited nodes. Without the early exit of a scalar bottom-up step (stop at
+# the first parent found) the two directions cost about the same per edge, so the
+# switch is made close to the point where bottom-up reads fewer edges.
+ALPHA = 2.0
+
+# Array views of the graphs searched so far, built on first use
+_levels = weakref.WeakKeyDictionary()
+
+# CompactGraph copy of the last dict graph searched, as (graph, edit version, copy): dicts
+# cannot be weak keys, so one copy is kept, which is all a batch on one graph needs
+_converted = None
+
+
+def _row_edges(offsets, rows):
+    """
+    Returns the edge indices of the given CSR rows, concatenated in row order, and the
+    number of edges of each row.
+    """
+    starts = offsets[rows]
+    counts = offsets[rows + 1] - starts
+    # Every edge is its row's start plus its position in the concatenation, less the
+    # number of edges of the rows before its own
+    shift = np.repeat(starts - (np.cumsum(counts) - counts), counts)
+    return shift + np.arange(len(shift)), counts
+
+
+class LevelGraph:
+    """
+    NumPy views of a CompactGraph's CSR arrays, with the in-edge arrays used by the
+    bottom-up steps (built on the first such step).
+
+    The views share memory with the graph's arrays, including those of a memory-mapped
+    compiled graph.
+
+    Args:
+        graph (CompactGraph): Graph to search
+
+    Attributes:
+        offsets, targets (numpy.ndarray): The graph's row offsets and edge targets
+        out_degree, in_degree (numpy.ndarray): Edges leaving and entering each node
+    """
+
+    def __init__(self, graph):
+        self.offsets = np.frombuffer(graph.offsets, dtype=np.int64)
+        self.targets = np.frombuffer(graph.targets, dtype=np.int32)
+        self.n = len(self.offsets) - 1
+        self.m = len(self.targets)
+        self.out_degree = np.diff(self.offsets)
+        self.in_degree = np.bincount(self.targets, minlength=self.n)
+        self._in_arrays = None
+
+    def in_arrays(self):
+        """
+        Returns the in-edges as CSR arrays (in_offsets, in_sources, in_edges): the in-edges
+        of node v are in_offsets[v]:in_offsets[v + 1], each with its source node and the
+        index of the same edge in the forward arrays, in increasing forward index order.
+        """
+        if self._in_arrays is None:
+            # A stable sort by target keeps the in-edges of each node in forward edge order
+            in_edges = np.argsort(self.targets, kind="stable")
+            sources = np.repeat(np.arange(self.n, dtype=np.int32), self.out_degree)
+            in_offsets = np.zeros(self.n + 1, dtype=np.int64)
+            np.cumsum(self.in_degree, out=in_offsets[1:])
+            self._in_arrays = in_offsets, sources[in_edges], in_edges
+        return self._in_arrays
+
+    def search(self, origin, destinations, alpha=ALPHA, limits=None):
+        """
+        Runs a level-synchronous BFS from origin to the first destination in BFS order.
+
+        Args:
+            origin (int): Starting node index
+            destinations (list): Goal node indices
+            alpha (float): Direction switching factor (see ALPHA); 0 only goes top-down
+            limits (SearchLimits): Optional deadline, expansion budget and cancellation
+                token, polled once per level
+
+        Returns:
+            tuple: (goal, path, nodes_expanded) over node indices, as returned by bfs_search
+
+        Raises:
+            SearchExhausted: If the limits stop the search before it finds a destination
+        """
+        is_goal = np.zeros(self.n, dtype=bool)
+        is_goal[np.asarray(destinations, dtype=np.int64)] = True
+        visited = np.zeros(self.n, dtype=bool)
+        visited[origin] = True
+        parent = np.full(self.n, -1, dtype=np.int64)
+        frontier = np.array([origin], dtype=np.int64)
+        # In-edges of unvisited nodes: the work of a bottom-up step
+        unvisited_edges = self.m - int(self.in_degree[origin])
+        nodes_created = 0
+        check_at = first_check(limits)
+
+        while frontier.size:
+            # The level is popped in queue order: stop at its first destination
+            hits = np.flatnonzero(is_goal[frontier])
+            popped = nodes_created + (int(hits[0]) + 1 if hits.size else frontier.size)
+            if popped >= check_at:
+                check_at = limits.poll(popped)  # Raises SearchExhausted once a limit is reached
+            if hits.size:
+                goal = int(frontier[hits[0]])
+                return goal, self._path(parent, goal), popped
+            nodes_created = popped
+
+            if alpha * int(self.out_degree[frontier].sum()) > unvisited_edges:
+                frontier = self._bottom_up(frontier, visited, parent)
+            else:
+                frontier = self._top_down(frontier, visited, parent)
+            visited[frontier] = True
+            unvisited_edges -= int(self.in_degree[frontier].sum())
+
+        return None, [], nodes_created
+
+    def _top_down(self, frontier, visited, parent):
+        # Out-edges of the frontier in queue order, then edge order: the order in which
+        # bfs_search would look at them
+        edges, counts = _row_edges(self.offsets, frontier)
+        children = self.targets[edges]
+        fresh = ~visited[children]
+        children = children[fresh]
+        parents = np.repeat(frontier, counts)[fresh]
+        # A node reached more than once belongs to its first discoverer, and the next
+        # level lists the nodes in the order they were first reached
+        _, first = np.unique(children, return_index=True)
+        first.sort()
+        children = children[first].astype(np.int64)
+        parent[children] = parents[first]
+        return children
+
+    def _bottom_up(self, frontier, visited, parent):
+        in_offsets, in_sources, in_edges = self.in_arrays()
+        candidates = np.flatnonzero(~visited)
+        candidates = candidates[self.in_degree[candidates] > 0]
+        if not candidates.size:
+            return candidates
+
+        # Rank every in-edge whose source is in the frontier by (queue position of the
+        # source, forward edge index), the order in which top-down would find it; the
+        # smallest rank of each candidate picks the parent bfs_search would have chosen
+        position = np.full(self.n, -1, dtype=np.int64)
+        position[frontier] = np.arange(frontier.size)
+        edges, counts = _row_edges(in_offsets, candidates)
+        source_position = position[in_sources[edges]]
+        unranked = frontier.size * self.m
+        ranks = np.where(source_position >= 0, source_position * self.m + in_edges[edges], unranked)
+        best = np.minimum.reduceat(ranks, np.cumsum(counts) - counts)
+
+        found = best < unranked
+        children, best = candidates[found], best[found]
+        order = np.argsort(best)
+        children = children[order]
+        parent[children] = frontier[best[order] // self.m]
+        return children
+
+    @staticmethod
+    def _path(parent, goal):
+        path = [goal]
+        while parent[path[-1]] >= 0:
+            path.append(int(parent[path[-1]]))
+        path.reverse()
+        return path
+
+
+def level_graph(graph):
+    """Returns the LevelGraph of a CompactGraph, building it on first use."""
+    levels = _levels.get(graph)
+    if levels is None:
+        levels = _levels[graph] = LevelGraph(graph)
+    return levels
+
+
+def _compact(graph):
+    """Returns the CompactGraph copy of a dict graph (or DynamicGraph), reusing the last one."""
+    global _converted
+    version = getattr(graph, "version", 0)  # DynamicGraph edits, see result_cache.graph_version
+    converted = _converted
+    if converted is None or converted[0] is not graph or converted[1] != version:
+        converted = _converted = (graph, version, CompactGraph.from_dicts(graph, {}))
+    return converted[2]
+
+
+def level_bfs(graph, origin, destinations, alpha=ALPHA, limits=None):
+    """
+    Level-synchronous, direction-optimizing Breadth-First Search.
+
+    Finds the same destination and hop-optimal path as bfs_search, with the same
+    nodes_expanded, processing each BFS level as NumPy arrays.
+
+    Args:
+        graph (dict or CompactGraph): Adjacency list representation; a dict graph is
+            converted to a CompactGraph on its first search, which costs more than the
+            search itself, and the copy is reused while the same graph is searched
+        origin (str): Starting node ID
+        destinations (list): List of goal node IDs
+        alpha (float): Direction switching factor (see ALPHA); 0 disables bottom-up steps
+        limits (SearchLimits): Optional deadline, expansion budget and cancellation token,
+            polled once per level
+
+    Returns:
+        tuple: (destination_reached, path, nodes_expanded) as returned by bfs_search
+
+    Raises:
+        SearchExhausted: If the limits stop the search before it finds a destination
+    """
+    if not isinstance(graph, CompactGraph):
+        graph = _compact(graph)
+    source, goals = graph.to_indices(origin, destinations)
+    return graph.to_result(*level_graph(graph).search(source, goals, alpha, limits))
@@ -0,0 +1,175 @@
+import heapq
+import math
+from compact_graph import CompactGraph
+from heuristicFunction import GoalDistance, heuristic
+from limits import first_check
+from path_utils import reconstruct_path
+
+
+def reverse_graph(graph):
+    """
+    Builds the reverse adjacency of a graph: an edge (u, v, cost) becomes (v, u, cost).
+
+    Args:
+        graph (dict or CompactGraph): Adjacency list representation {node: [(neighbor, cost)]}
+
+    Returns:
+        dict or CompactGraph: Reverse graph (cached on a CompactGraph)
+    """
+    if isinstance(graph, CompactGraph):
+        return graph.reverse()
+    reverse = {node_id: [] for node_id in graph}
+    for start, edges in graph.items():
+        for end, cost in edges:
+            reverse.setdefault(end, []).append((start, cost))
+    return reverse
+
+
+def bidirectional_ucs(graph, origin, destinations, reverse=None, limits=None):
+    """
+    Bidirectional Dijkstra: searches forward from the origin and backward from all
+    destinations at once, stopping when the two searches prove the best meeting point.
+
+    Returns the same optimal cost as ucs_search (CUS1) while settling roughly two small
+    balls instead of one large one. Ties between equal-cost paths may resolve differently.
+
+    Args:
+        graph (dict or CompactGraph): Adjacency list representation {node: [(neighbor, cost)]}
+        origin (str): Starting node ID
+        destinations (list): List of possible goal node IDs
+        reverse (dict or CompactGraph): Optional prebuilt reverse_graph(graph), to reuse
+            it across queries
+        limits (SearchLimits): Optional deadline, expansion budget and cancellation token
+
+    Returns:
+        tuple: (goal_node, path, nodes_expanded) where:
+            - goal_node: Cheapest destination reached (or None if no path exists)
+            - path: List of nodes in the lowest cost path
+            - nodes_expanded: Nodes settled by the forward and backward searches together
+
+    Raises:
+        SearchExhausted: If the limits stop the search before it finds a lowest cost path
+    """
+    if isinstance(graph, CompactGraph):
+        source, goals = graph.to_indices(origin, destinations)
+        return graph.to_result(*_bidirectional(graph, graph.reverse(), source, goals, None, limits))
+    if reverse is None:
+        reverse = reverse_graph(graph)
+    return _bidirectional(graph, reverse, origin, destinations, None, limits)
+
+
+def bidirectional_astar(node, graph, origin, destinations, reverse=None, limits=None):
+    """
+    Bidirectional A*: bidirectional Dijkstra guided by the straight-line distance heuristic.
+
+    Both searches use the average potential p(v) = (h_goal(v) - h_origin(v)) / 2, where
+    h_goal is the distance to the closest destination and h_origin the distance to the
+    origin; the forward search orders nodes by g + p and the backward one by g - p. With
+    this symmetric potential the usual bidirectional stopping rule stays exact, so the
+    path is optimal whenever the heuristic is consistent (as ASTAR assumes).
+
+    Args:
+        node (dict): Dictionary mapping node IDs to (x,y) coordinates (ignored for a CompactGraph,
+            which carries its own coordinates)
+        graph (dict or CompactGraph): Adjacency list representation {node: [(neighbor, cost)]}
+        origin (str): Starting node ID
+        destinations (list): List of possible goal node IDs
+        reverse (dict or CompactGraph): Optional prebuilt reverse_graph(graph), to reuse
+            it across queries
+        limits (SearchLimits): Optional deadline, expansion budget and cancellation token
+
+    Returns:
+        tuple: (goal_node, path, nodes_expanded) as for bidirectional_ucs
+
+    Raises:
+        SearchExhausted: If the limits stop the search before it finds a lowest cost path
+    """
+    if isinstance(graph, CompactGraph):
+        source, goals = graph.to_indices(origin, destinations)
+        potential = _average_potential(graph.coords, source, goals)
+        return graph.to_result(*_bidirectional(graph, graph.reverse(), source, goals, potential, limits))
+    if reverse is None:
+        reverse = reverse_graph(graph)
+    potential = _average_potential(node, origin, destinations)
+    return _bidirectional(graph, reverse, origin, destinations, potential, limits)
+
+
+def _average_potential(node, origin, destinations):
+    """Returns p(v) = (distance to closest destination - distance to origin) / 2, cached per node."""
+    to_goal = GoalDistance(node, destinations)
+    origin_coord = node[origin]
+    table = {}
+
+    def potential(v):
+        p = table.get(v)
+        if p is None:
+            p = table[v] = (to_goal(v) - heuristic(node[v], origin_coord)) / 2
+        return p
+
+    return potential
+
+
+def _bidirectional(graph, reverse, origin, destinations, potential, limits):
+    # Distances and parent pointers of each search. Backward parents point towards the
+    # destinations, so following them from the meeting node leads to the goal reached.
+    dist_f = {origin: 0}
+    dist_b = {d: 0 for d in destinations}
+    parent_f = {origin: None}
+    parent_b = {d: None for d in destinations}
+    closed_f = set()
+    closed_b = set()
+
+    # Priority queues of (key, distance, node); keys add the potential for the forward
+    # search and subtract it for the backward one (plain Dijkstra when there is none)
+    p = potential or (lambda v: 0)
+    queue_f = [(p(origin), 0, origin)]
+    queue_b = [(-p(d), 0, d) for d in dist_b]
+    heapq.heapify(queue_b)
+
+    # Best origin -> destination cost seen so far and the node where the searches met
+    best = 0 if origin in dist_b else math.inf
+    meet = origin if origin in dist_b else None
+    nodes_expanded = 0
+    check_at = first_check(limits)  # Expansion count at which the limits are polled next
+
+    while queue_f and queue_b:
+        # No unexplored path can beat `best` once the two queue tops add up to it
+        if queue_f[0][0] + queue_b[0][0] >= best:
+            break
+
+        # Advance the side whose next node is closer
+        if queue_f[0][0] <= queue_b[0][0]:
+            queue, adjacency, dist, parent, closed, other_dist, sign = queue_f, graph, dist_f, parent_f, closed_f, dist_b, 1
+        else:
+            queue, adjacency, dist, parent, closed, other_dist, sign = queue_b, reverse, dist_b, parent_b, closed_b, dist_f, -1
+
+        key, d, current = heapq.heappop(queue)
+        if current in closed:
+            continue
+        closed.add(current)
+        nodes_expanded += 1
+        if nodes_expanded >= check_at:
+            check_at = limits.poll(nodes_expanded)  # Raises SearchExhausted once a limit is reached
+
+        for neighbor, cost in adjacency.get(current, []):
+            new_dist = d + cost
+            if new_dist < dist.get(neighbor, math.inf) and neighbor not in closed:
+                dist[neighbor] = new_dist
+                parent[neighbor] = current
+                heapq.heappush(queue, (new_dist + sign * p(neighbor), new_dist, neighbor))
+            # A neighbor already reached by the other search closes an origin -> goal path
+            other = other_dist.get(neighbor)
+            if other is not None and new_dist + other < best and dist[neighbor] == new_dist:
+                best = new_dist + other
+                meet = neighbor
+
+    if meet is None:
+        return None, [], nodes_expanded
+
+    # Join origin -> meet (forward parents) with meet -> goal (backward parents)
+    path = reconstruct_path(parent_f, meet)
+    step = parent_b[meet]
+    while step is not None:
+        path.append(step)
+        step = parent_b[step]
+    return path[-1], path, nodes_expanded
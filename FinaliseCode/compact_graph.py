@@ -0,0 +1,266 @@
+from array import array
+
+# Array typecodes used by the compact representation
+OFFSET_TYPE = 'q'   # 64-bit edge offsets, so edge counts above 2**31 still fit
+TARGET_TYPE = 'i'   # 32-bit dense node indices
+FLOAT_TYPE = 'd'    # 64-bit floats for edge costs and coordinates
+
+
+def _zeros(typecode, size):
+    """Returns a zero-filled array of the given typecode and length."""
+    return array(typecode, bytes(array(typecode).itemsize * size))
+
+
+class Coordinates:
+    """
+    Read-only view over node coordinates stored in one contiguous float array.
+
+    The array holds x and y interleaved ([x0, y0, x1, y1, ...]) so that indexing
+    with a dense node index returns an (x, y) tuple, exactly like the `node`
+    dictionary returned by the dict based parser.
+    """
+    __slots__ = ('xy',)
+
+    def __init__(self, xy):
+        self.xy = xy
+
+    def __len__(self):
+        return len(self.xy) // 2
+
+    def __getitem__(self, index):
+        i = index * 2
+        return self.xy[i], self.xy[i + 1]
+
+
+def id_order(node_id):
+    """
+    Sort key of the canonical neighbour order: numeric node IDs in ascending numeric order,
+    followed by any non-numeric IDs in string order.
+
+    Loaders lay out every node's neighbours in this order once (edges to the same neighbour
+    keep their order in the file), so searches iterate neighbour lists directly and break
+    ties between equally good neighbours by visiting the smallest ID first.
+    """
+    try:
+        return 0, int(node_id), ""
+    except ValueError:
+        return 1, 0, node_id
+
+
+class CompactGraph:
+    """
+    Integer-indexed graph with adjacency stored as CSR (compressed sparse row) arrays.
+
+    Node IDs are interned to dense integers in sorted string order, so comparing two
+    indices gives the same result as comparing the original ID strings. This keeps the
+    tie-breaking of the heap based searches identical to the dict representation.
+
+    Attributes:
+        ids (list): Node ID strings, indexed by dense node index
+        index (dict): Mapping from node ID string to dense node index (any read-only
+            mapping, such as the binary search index of a memory-mapped graph)
+        offsets (array): Row offsets; the edges of node i are offsets[i]:offsets[i + 1]
+        targets (array): Target node index of each edge
+        weights (array): Cost of each edge
+        coords (Coordinates): (x, y) view over the contiguous coordinate array
+    """
+
+    def __init__(self, ids, offsets, targets, weights, xy, index=None):
+        self.ids = ids
+        self.index = {node_id: i for i, node_id in enumerate(ids)} if index is None else index
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        self.coords = Coordinates(xy)
+        self._reverse = None
+
+    @classmethod
+    def from_dicts(cls, graph, node):
+        """
+        Builds a compact graph from the dict representation returned by parse_file.
+
+        Args:
+            graph (dict): Adjacency list {node_id: [(neighbor_id, cost)]}
+            node (dict): Node coordinates {node_id: (x, y)}
+
+        Returns:
+            CompactGraph: Equivalent compact graph
+        """
+        builder = CompactGraphBuilder()
+        for node_id, (x, y) in node.items():
+            builder.add_node(node_id, x, y)
+        for start, edges in graph.items():
+            builder.add_node(start)
+            for end, cost in edges:
+                builder.add_edge(start, end, cost)
+        return builder.build()
+
+    @property
+    def num_edges(self):
+        return len(self.targets)
+
+    def reverse(self):
+        """
+        Returns the graph with every edge reversed, sharing this graph's IDs and coordinates.
+
+        The reverse graph is built once and cached, since backward searches reuse it for
+        every query.
+        """
+        if self._reverse is None:
+            n = len(self.ids)
+            # Count the in-degree of every node and turn the counts into row offsets
+            offsets = _zeros(OFFSET_TYPE, n + 1)
+            for target in self.targets:
+                offsets[target + 1] += 1
+            for i in range(n):
+                offsets[i + 1] += offsets[i]
+
+            targets = _zeros(TARGET_TYPE, len(self.targets))
+            weights = _zeros(FLOAT_TYPE, len(self.weights))
+            fill = offsets[:-1]
+            for source in range(n):
+                for i in range(self.offsets[source], self.offsets[source + 1]):
+                    target = self.targets[i]
+                    slot = fill[target]
+                    fill[target] = slot + 1
+                    targets[slot] = source
+                    weights[slot] = self.weights[i]
+
+            reverse = CompactGraph(self.ids, offsets, targets, weights, self.coords.xy, index=self.index)
+            reverse._reverse = self
+            self._reverse = reverse
+        return self._reverse
+
+    # The methods below give the compact graph the same read-only mapping interface as
+    # the dict adjacency list, so the search functions can iterate either one.
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __iter__(self):
+        return iter(range(len(self.ids)))
+
+    def __contains__(self, index):
+        return 0 <= index < len(self.ids)
+
+    def __getitem__(self, index):
+        start, end = self.offsets[index], self.offsets[index + 1]
+        return zip(self.targets[start:end], self.weights[start:end])
+
+    def get(self, index, default=None):
+        if 0 <= index < len(self.ids):
+            return self[index]
+        return default
+
+    def to_indices(self, origin, destinations):
+        """
+        Translates an origin ID and destination IDs into dense node indices.
+
+        Destinations that do not occur in the graph can never be reached and are dropped.
+        """
+        index = self.index
+        return index[origin], [index[d] for d in destinations if d in index]
+
+    def to_result(self, goal, path, nodes_expanded):
+        """Translates an index based (goal, path, nodes_expanded) search result back to node IDs."""
+        ids = self.ids
+        if goal is None:
+            return None, [], nodes_expanded
+        return ids[goal], [ids[i] for i in path], nodes_expanded
+
+
+class CompactGraphBuilder:
+    """
+    Incrementally collects nodes and edges and packs them into a CompactGraph.
+
+    Nodes receive provisional indices in the order they are first seen; build()
+    renumbers them into sorted ID order and lays the edges out in CSR form. Each row
+    lists its edges in the canonical neighbour order (see id_order), matching the dict
+    adjacency lists returned by parse_file.
+    """
+
+    def __init__(self):
+        self.index = {}                     # Node ID -> provisional index
+        self.ids = []                       # Provisional index -> node ID
+        self.xy = array(FLOAT_TYPE)         # Interleaved coordinates by provisional index
+        self.sources = array(TARGET_TYPE)   # Edge list, by provisional index
+        self.targets = array(TARGET_TYPE)
+        self.weights = array(FLOAT_TYPE)
+
+    def add_node(self, node_id, x=float('nan'), y=float('nan')):
+        """Interns a node ID, recording its coordinates if given, and returns its provisional index."""
+        i = self.index.get(node_id)
+        if i is None:
+            i = self.index[node_id] = len(self.ids)
+            self.ids.append(node_id)
+            self.xy.append(x)
+            self.xy.append(y)
+        elif x == x:  # Coordinates given (not NaN) for a node first seen in an edge
+            self.xy[2 * i] = x
+            self.xy[2 * i + 1] = y
+        return i
+
+    def add_edge(self, start, end, cost):
+        """Adds a directed edge between two node IDs."""
+        index = self.index
+        source = index.get(start)
+        if source is None:
+            source = self.add_node(start)
+        target = index.get(end)
+        if target is None:
+            target = self.add_node(end)
+        self.sources.append(source)
+        self.targets.append(target)
+        self.weights.append(cost)
+
+    def build(self):
+        """
+        Packs the collected nodes and edges into a CompactGraph.
+
+        Returns:
+            CompactGraph: Graph with nodes numbered in sorted ID order
+        """
+        n = len(self.ids)
+        # Renumber nodes so that index order equals ID string order
+        order = sorted(range(n), key=self.ids.__getitem__)
+        rank = _zeros(TARGET_TYPE, n)
+        for new, old in enumerate(order):
+            rank[old] = new
+
+        ids = [self.ids[old] for old in order]
+        xy = _zeros(FLOAT_TYPE, 2 * n)
+        for new, old in enumerate(order):
+            xy[2 * new] = self.xy[2 * old]
+            xy[2 * new + 1] = self.xy[2 * old + 1]
+
+        # Count the out-degree of every node and turn the counts into row offsets
+        offsets = _zeros(OFFSET_TYPE, n + 1)
+        for source in self.sources:
+            offsets[rank[source] + 1] += 1
+        for i in range(n):
+            offsets[i + 1] += offsets[i]
+
+        # Order the edges by target in the canonical neighbour order (a stable sort, so edges
+        # to the same target keep their insertion order)
+        canonical = _zeros(TARGET_TYPE, n)
+        for position, old in enumerate(sorted(range(n), key=lambda old: id_order(self.ids[old]))):
+            canonical[old] = position
+        edge_keys = [canonical[target] for target in self.targets]
+        edge_order = sorted(range(len(edge_keys)), key=edge_keys.__getitem__)
+        del edge_keys
+
+        # Place every edge in its row (a stable counting sort by source, keeping that order)
+        m = len(self.targets)
+        targets = _zeros(TARGET_TYPE, m)
+        weights = _zeros(FLOAT_TYPE, m)
+        fill = offsets[:-1]
+        sources, old_targets, old_weights = self.sources, self.targets, self.weights
+        for e in edge_order:
+            source, target, cost = sources[e], old_targets[e], old_weights[e]
+            row = rank[source]
+            slot = fill[row]
+            fill[row] = slot + 1
+            targets[slot] = rank[target]
+            weights[slot] = cost
+
+        return CompactGraph(ids, offsets, targets, weights, xy)
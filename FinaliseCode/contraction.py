@@ -0,0 +1,468 @@
+import hashlib
+import heapq
+import math
+import os
+import struct
+import sys
+from array import array
+from compact_graph import CompactGraph
+from limits import first_check
+from path_utils import reconstruct_path
+
+# Hierarchy file format: a header, then 8-byte aligned sections holding the node keys in
+# rank order and the upward, downward and shortcut edges as arrays of rank positions.
+# Loading only decodes numbers and UTF-8 IDs, so a file cannot run code, and the graph
+# fingerprint in the header tells whether it was built for the graph being searched.
+MAGIC = b'CHRC'
+VERSION = 1
+
+# magic, version, byte order (0 little, 1 big), indexed, graph node count, graph edge
+# count, graph digest, hierarchy node count, upward edges, downward edges, shortcuts,
+# node key blob size
+HEADER = struct.Struct('=4sHHQQQ16sQQQQQ')
+BYTE_ORDER = 0 if sys.byteorder == 'little' else 1
+
+
+def graph_fingerprint(graph):
+    """
+    Identifies the graph a hierarchy is built for.
+
+    Returns:
+        tuple: (node_count, edge_count, digest) where digest is a 16-byte hash of the
+        node IDs, edges and costs
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    if isinstance(graph, CompactGraph):
+        for node_id in graph.ids:
+            digest.update(node_id.encode('utf-8') + b'\0')
+        for section in (graph.offsets, graph.targets, graph.weights):
+            digest.update(memoryview(section).cast('B'))
+        edges = graph.num_edges
+    else:
+        edges = 0
+        for u, neighbors in graph.items():
+            digest.update(repr((u, neighbors)).encode('utf-8'))
+            edges += len(neighbors)
+    return len(graph), edges, digest.digest()
+
+
+def _padding(size):
+    return -size % 8  # Keep every section 8-byte aligned, as in graph_cache.py
+
+
+def _read_header(filename):
+    """
+    Reads the header of a hierarchy file.
+
+    Returns:
+        tuple: The unpacked HEADER fields, or None if the file was written by another
+        version of this format or on a platform with the other byte order
+
+    Raises:
+        ValueError: If the file is not a hierarchy file at all
+    """
+    with open(filename, 'rb') as f:
+        header = f.read(HEADER.size)
+    if len(header) < HEADER.size or header[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"{filename} is not a contraction hierarchy file")
+    fields = HEADER.unpack(header)
+    if fields[1] != VERSION or fields[2] != BYTE_ORDER:
+        return None
+    return fields
+
+
+def _simple_path(path, destinations):
+    """
+    Erases the loops of a lowest cost path and cuts it at its first destination.
+
+    With zero cost edges the unpacked route can pass a node twice, or pass a destination
+    and come back to the one it ends at. Those detours cost nothing (the route already has
+    the lowest cost), so dropping them keeps the cost and leaves a simple path.
+
+    Returns:
+        tuple: (goal_node, path)
+    """
+    destinations = set(destinations)
+    simple = []
+    position = {}  # Node -> its index in simple
+    for v in path:
+        if v in position:
+            # Back at an earlier node: forget the loop since then
+            for dropped in simple[position[v] + 1:]:
+                del position[dropped]
+            del simple[position[v] + 1:]
+        else:
+            position[v] = len(simple)
+            simple.append(v)
+    for i, v in enumerate(simple):
+        if v in destinations:
+            return v, simple[:i + 1]
+    return simple[-1], simple
+
+
+class ContractionHierarchy:
+    """
+    Preprocessed graph for Contraction Hierarchy (CH) queries.
+
+    Every node has a rank (its contraction order). Original edges and shortcuts are split
+    into upward edges, searched forward from the origin, and downward edges, stored
+    reversed so they are searched backward from the destinations. A shortcut u -> w
+    replaces the path u -> middle -> w and is unpacked through its middle node.
+
+    Attributes:
+        rank (dict): Node -> contraction order
+        up (dict): Node -> [(higher-ranked neighbor, cost)] for edges node -> neighbor
+        down (dict): Node -> [(higher-ranked neighbor, cost)] for edges neighbor -> node
+        middle (dict): (u, w) -> middle node of the shortcut u -> w
+        indexed (bool): Whether nodes are CompactGraph indices rather than node IDs
+        fingerprint (tuple): graph_fingerprint of the graph the hierarchy was built for
+    """
+
+    def __init__(self, rank, up, down, middle, indexed=False, fingerprint=None):
+        self.rank = rank
+        self.up = up
+        self.down = down
+        self.middle = middle
+        self.indexed = indexed
+        self.fingerprint = fingerprint
+
+    @property
+    def num_shortcuts(self):
+        return len(self.middle)
+
+    def save(self, filename):
+        """Writes the hierarchy and the fingerprint of its graph to disk."""
+        order = list(self.rank)  # Node keys in rank order; edges refer to their positions
+        position = self.rank
+
+        def edges(adjacency):
+            offsets, targets, weights = array('q', [0]), array('q'), array('d')
+            for v in order:
+                for w, cost in adjacency[v]:
+                    targets.append(position[w])
+                    weights.append(cost)
+                offsets.append(len(targets))
+            return [offsets, targets, weights]
+
+        if self.indexed:
+            keys = [array('q', order).tobytes()]
+        else:
+            encoded = [v.encode('utf-8') for v in order]
+            key_offsets = array('q', [0])
+            for key in encoded:
+                key_offsets.append(key_offsets[-1] + len(key))
+            keys = [key_offsets.tobytes(), b''.join(encoded)]
+        shortcuts = [array('q', (position[u] for u, _ in self.middle)),
+                     array('q', (position[w] for _, w in self.middle)),
+                     array('q', (position[v] for v in self.middle.values()))]
+        sections = keys + [section.tobytes() for section in edges(self.up) + edges(self.down) + shortcuts]
+
+        nodes, graph_edges, digest = self.fingerprint
+        with open(filename, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, BYTE_ORDER, self.indexed, nodes, graph_edges, digest, len(order),
+                                sum(map(len, self.up.values())), sum(map(len, self.down.values())),
+                                len(self.middle), len(keys[-1])))
+            f.write(bytes(_padding(HEADER.size)))
+            for section in sections:
+                f.write(section)
+                f.write(bytes(_padding(len(section))))
+
+    @classmethod
+    def load(cls, filename):
+        """
+        Reads a hierarchy written by save().
+
+        Raises:
+            ValueError: If the file is not a hierarchy in this version's format for this
+                platform, or is truncated
+        """
+        fields = _read_header(filename)
+        if fields is None:
+            raise ValueError(f"{filename} was written by another version or platform")
+        _, _, _, indexed, nodes, graph_edges, digest, n, up_count, down_count, shortcut_count, key_bytes = fields
+        with open(filename, 'rb') as f:
+            view = memoryview(f.read())
+        position = HEADER.size + _padding(HEADER.size)
+
+        def section(size, typecode):
+            nonlocal position
+            if position + size > len(view):
+                raise ValueError(f"{filename} is truncated")
+            part = view[position:position + size]
+            position += size + _padding(size)
+            return part.cast(typecode) if typecode else part
+
+        if indexed:
+            order = section(key_bytes, 'q').tolist()
+        else:
+            key_offsets = section(8 * (n + 1), 'q')
+            blob = section(key_bytes, None)
+            order = [str(blob[key_offsets[i]:key_offsets[i + 1]], 'utf-8') for i in range(n)]
+
+        def edges(count):
+            offsets, targets, weights = section(8 * (n + 1), 'q'), section(8 * count, 'q'), section(8 * count, 'd')
+            return {v: [(order[targets[e]], weights[e]) for e in range(offsets[i], offsets[i + 1])]
+                    for i, v in enumerate(order)}
+
+        up = edges(up_count)
+        down = edges(down_count)
+        u, w, v = (section(8 * shortcut_count, 'q') for _ in range(3))
+        middle = {(order[u[i]], order[w[i]]): order[v[i]] for i in range(shortcut_count)}
+        rank = {v: i for i, v in enumerate(order)}
+        return cls(rank, up, down, middle, bool(indexed), (nodes, graph_edges, bytes(digest)))
+
+    def query(self, origin, destinations, limits=None):
+        """
+        Finds the cheapest path from origin to any destination.
+
+        Runs Dijkstra upward from the origin and upward (over reversed downward edges)
+        from all destinations, each side until its queue top can no longer improve the
+        best meeting cost, then unpacks the shortcuts on the path found.
+
+        Args:
+            origin, destinations: Query, in the graph's node keys
+            limits (SearchLimits): Optional deadline, expansion budget and cancellation token
+
+        Returns:
+            tuple: (goal_node, path, nodes_settled) in the graph's node keys
+
+        Raises:
+            SearchExhausted: If the limits stop the query before it finds a lowest cost path
+        """
+        dist = ({origin: 0}, {d: 0 for d in destinations})
+        parent = ({origin: None}, {d: None for d in destinations})
+        closed = (set(), set())
+        queues = ([(0, origin)], [(0, d) for d in destinations])
+        heapq.heapify(queues[1])
+        adjacency = (self.up, self.down)
+
+        best = math.inf
+        meet = None
+        settled = 0
+        check_at = first_check(limits)  # Settle count at which the limits are polled next
+
+        while True:
+            # Advance the side with the smaller queue top, while it can still beat `best`
+            tops = [q[0][0] if q and q[0][0] < best else math.inf for q in queues]
+            if tops[0] == tops[1] == math.inf:
+                break
+            side = 0 if tops[0] <= tops[1] else 1
+
+            d, current = heapq.heappop(queues[side])
+            if current in closed[side]:
+                continue
+            closed[side].add(current)
+            settled += 1
+            if settled >= check_at:
+                check_at = limits.poll(settled)  # Raises SearchExhausted once a limit is reached
+
+            # A node reached by both searches closes an origin -> destination path
+            other = dist[1 - side].get(current)
+            if other is not None and d + other < best:
+                best = d + other
+                meet = current
+
+            for neighbor, cost in adjacency[side].get(current, ()):
+                new_dist = d + cost
+                if new_dist < dist[side].get(neighbor, math.inf):
+                    dist[side][neighbor] = new_dist
+                    parent[side][neighbor] = current
+                    heapq.heappush(queues[side], (new_dist, neighbor))
+
+        if meet is None:
+            return None, [], settled
+
+        # Hierarchy path: origin -> meet over upward edges, then meet -> goal over downward ones
+        route = reconstruct_path(parent[0], meet)
+        step = parent[1][meet]
+        while step is not None:
+            route.append(step)
+            step = parent[1][step]
+
+        path = [route[0]]
+        for u, w in zip(route, route[1:]):
+            self._unpack(u, w, path)
+        goal, path = _simple_path(path, destinations)
+        return goal, path, settled
+
+    def _unpack(self, u, w, path):
+        """Appends the original nodes of edge u -> w (after u) to path, expanding shortcuts."""
+        stack = [(u, w)]
+        while stack:
+            a, b = stack.pop()
+            mid = self.middle.get((a, b))
+            if mid is None:
+                path.append(b)
+            else:
+                # Expand a -> mid before mid -> b
+                stack.append((mid, b))
+                stack.append((a, mid))
+
+
+def build_hierarchy(graph, settle_limit=500):
+    """
+    Contracts every node of a graph, in order of increasing importance, into a
+    ContractionHierarchy.
+
+    Importance is twice the edge difference (shortcuts added minus edges removed) plus
+    the number of already contracted neighbours, kept up to date lazily; weighting the
+    edge difference keeps the hierarchy sparse, which makes preprocessing faster. Before adding a
+    shortcut u -> w around v, a witness search from u (avoiding v) looks for a path
+    that is no longer; it gives up after settle_limit nodes, which can only add
+    unnecessary shortcuts, never lose a shortest path.
+
+    Args:
+        graph (dict or CompactGraph): Adjacency list representation {node: [(neighbor, cost)]}
+        settle_limit (int): Maximum nodes settled by one witness search
+
+    Returns:
+        ContractionHierarchy: Hierarchy keyed like the graph (dense indices for a CompactGraph)
+    """
+    # Remaining (uncontracted) graph, keeping the cheapest of any parallel edges
+    out = {u: {} for u in graph}
+    inn = {u: {} for u in graph}
+    for u in graph:
+        for v, cost in graph.get(u, []):
+            if u != v and cost < out[u].get(v, math.inf):
+                out[u][v] = cost
+                inn.setdefault(v, {})[u] = cost
+                out.setdefault(v, {})
+
+    rank = {}
+    up = {}
+    down = {}
+    middle = {}
+    contracted_neighbors = dict.fromkeys(out, 0)
+
+    def witness_distances(source, skip, limit, targets):
+        # Dijkstra from source in the remaining graph without `skip`, bounded by `limit`
+        dist = {source: 0}
+        queue = [(0, source)]
+        settled = 0
+        remaining = len(targets)
+        while queue and settled < settle_limit and remaining:
+            d, current = heapq.heappop(queue)
+            if d > dist[current]:
+                continue
+            if d > limit:
+                break
+            settled += 1
+            if current in targets:
+                remaining -= 1
+            for neighbor, cost in out[current].items():
+                new_dist = d + cost
+                if neighbor != skip and new_dist < dist.get(neighbor, math.inf):
+                    dist[neighbor] = new_dist
+                    heapq.heappush(queue, (new_dist, neighbor))
+        return dist
+
+    def shortcuts_for(v):
+        # Shortcuts (u, w, cost) needed to keep shortest paths through v once it is removed
+        shortcuts = []
+        outgoing = out[v]
+        if not outgoing:
+            return shortcuts
+        longest_out = max(outgoing.values())
+        for u, cost_in in inn[v].items():
+            dist = witness_distances(u, v, cost_in + longest_out, outgoing)
+            for w, cost_out in outgoing.items():
+                if w != u and dist.get(w, math.inf) > cost_in + cost_out:
+                    shortcuts.append((u, w, cost_in + cost_out))
+        return shortcuts
+
+    def priority(v, shortcuts):
+        return 2 * (len(shortcuts) - len(inn[v]) - len(out[v])) + contracted_neighbors[v]
+
+    queue = []
+    for v in out:
+        queue.append((priority(v, shortcuts_for(v)), v))
+    heapq.heapify(queue)
+
+    while queue:
+        _, v = heapq.heappop(queue)
+        # Lazy update: re-evaluate v and put it back if it is no longer the least important
+        shortcuts = shortcuts_for(v)
+        current = priority(v, shortcuts)
+        if queue and current > queue[0][0]:
+            heapq.heappush(queue, (current, v))
+            continue
+
+        # All remaining neighbours of v are contracted later, so they rank higher
+        rank[v] = len(rank)
+        up[v] = list(out[v].items())
+        down[v] = list(inn[v].items())
+
+        for u, w, cost in shortcuts:
+            if cost < out[u].get(w, math.inf):
+                out[u][w] = cost
+                inn[w][u] = cost
+                middle[(u, w)] = v
+
+        for w in out[v]:
+            del inn[w][v]
+            contracted_neighbors[w] += 1
+        for u in inn[v]:
+            del out[u][v]
+            contracted_neighbors[u] += 1
+        del out[v], inn[v]
+
+    return ContractionHierarchy(rank, up, down, middle, indexed=isinstance(graph, CompactGraph),
+                                fingerprint=graph_fingerprint(graph))
+
+
+def load_hierarchy(graph, filename):
+    """
+    Loads the contraction hierarchy stored in filename, or builds one for the graph and
+    saves it there if the file does not exist yet, was built for another graph (such as
+    an earlier version of the graph file, or the other representation of this graph, which
+    search.py switches to once the graph file is compiled) or by another version of this
+    format.
+
+    Returns:
+        ContractionHierarchy: Hierarchy for the graph
+
+    Raises:
+        ValueError: If filename is not a hierarchy file
+    """
+    fingerprint = graph_fingerprint(graph)
+    if os.path.exists(filename):
+        fields = _read_header(filename)
+        if fields is not None and fields[3] == isinstance(graph, CompactGraph) and fields[4:7] == fingerprint:
+            return ContractionHierarchy.load(filename)
+    hierarchy = build_hierarchy(graph)
+    hierarchy.save(filename)
+    return hierarchy
+
+
+def ch_search(graph, origin, destinations, hierarchy=None, limits=None):
+    """
+    Contraction Hierarchy query: the same optimal cost as ucs_search (CUS1), after a
+    one-off preprocessing of the graph.
+
+    Args:
+        graph (dict or CompactGraph): Adjacency list representation {node: [(neighbor, cost)]}
+        origin (str): Starting node ID
+        destinations (list): List of possible goal node IDs
+        hierarchy (ContractionHierarchy): Prebuilt hierarchy for this graph; built on the
+            spot if omitted, which costs far more than the query itself
+        limits (SearchLimits): Optional deadline, expansion budget and cancellation token
+            for the query (building the hierarchy is not limited)
+
+    Returns:
+        tuple: (goal_node, path, nodes_expanded) where:
+            - goal_node: Cheapest destination reached (or None if no path exists)
+            - path: List of nodes in the lowest cost path, shortcuts unpacked
+            - nodes_expanded: Nodes settled by the upward searches
+
+    Raises:
+        ValueError: If the hierarchy was built for the other graph representation
+        SearchExhausted: If the limits stop the query before it finds a lowest cost path
+    """
+    if hierarchy is None:
+        hierarchy = build_hierarchy(graph)
+    if hierarchy.indexed != isinstance(graph, CompactGraph):
+        raise ValueError("contraction hierarchy was built for a different graph representation")
+    if isinstance(graph, CompactGraph):
+        source, goals = graph.to_indices(origin, destinations)
+        return graph.to_result(*hierarchy.query(source, goals, limits))
+    return hierarchy.query(origin, destinations, limits)
@@ -1,60 +1,257 @@
-import heapq
-from heuristicFunction import heuristic
-
-def cus2(node, graph, origin, destinations, weight=1.5):
-    """
-    Custom search algorithm combining aspects of A* with weighted heuristics.
-    Similar to Weighted A* but with modified heuristic influence.
-    
-    Args:
-        node (dict): Dictionary mapping node IDs to (x,y) coordinates
-        graph (dict): Adjacency list representation of the graph {node: [(neighbor, cost)]}
-        origin (str): Starting node ID
-        destinations (list): List of possible goal node IDs
-        weight (float): Heuristic weight factor (default=1.5) to control search greediness
-    
-    Returns:
-        tuple: (goal_node, path, nodes_expanded) where:
-            - goal_node: First destination reached (or None if no path exists)
-            - path: List of nodes in the solution path
-            - nodes_expanded: Number of nodes visited during search
-    """
-    # Initialize closed set for visited nodes
-    visited = set()
-    
-    # Priority queue for open set: (f_value, g_value, node_id, path)
-    queue = []
-
-    # Calculate initial heuristic value (minimum distance to any goal)
-    initial_h = min(heuristic(node[origin], node[d]) for d in destinations)
-    # Push start node with weighted heuristic value
-    heapq.heappush(queue, (initial_h * weight, 0, origin, [origin]))
-
-    while queue:
-        # Get node with lowest f-value (f = g + weight*h)
-        f, g, current, path = heapq.heappop(queue)
-
-        # Skip if already visited (better path was found)
-        if current in visited:
-            continue
-        visited.add(current)
-
-        # Check if we've reached any destination
-        if current in destinations:
-            return current, path, len(visited)
-
-        # Process neighbors in sorted order for consistent tie-breaking
-        neighbors = sorted(graph.get(current, []), key=lambda x: x[0])
-        for neighbor, cost in neighbors:
-            if neighbor not in visited:
-                # Calculate new path cost to neighbor
-                g_new = g + cost
-                # Calculate heuristic estimate to closest goal
-                h_new = min(heuristic(node[neighbor], node[d]) for d in destinations)
-                # Calculate f-value with weighted heuristic
-                f_new = g_new + weight * h_new
-                # Add neighbor to queue with updated values
-                heapq.heappush(queue, (f_new, g_new, neighbor, path + [neighbor]))
-
-    # No path found to any destination
-    return None, [], len(visited)
+import heapq
+import math
+from heuristicFunction import GoalDistance
+from compact_graph import CompactGraph
+from frontier import LazyHeapFrontier
+from limits import SearchExhausted, SearchLimits, first_check
+from path_utils import reconstruct_path, path_precedes
+
+def cus2(node, graph, origin, destinations, weight=1.5, heuristic_fn=None, frontier=None, probe=None, limits=None):
+    """
+    Custom search algorithm combining aspects of A* with weighted heuristics.
+    Similar to Weighted A* but with modified heuristic influence.
+    
+    Args:
+        node (dict): Dictionary mapping node IDs to (x,y) coordinates (ignored for a CompactGraph,
+            which carries its own coordinates)
+        graph (dict or CompactGraph): Adjacency list representation of the graph {node: [(neighbor, cost)]}
+        origin (str): Starting node ID
+        destinations (list): List of possible goal node IDs
+        weight (float): Heuristic weight factor (default=1.5) to control search greediness
+        heuristic_fn (callable): Optional heuristic provider mapping a node to its estimated
+            distance to the closest destination (node IDs, or dense indices for a CompactGraph).
+            Defaults to a fresh GoalDistance table; pass an IndexedGoalDistance when there are
+            many destinations, or a table from a HeuristicCache to reuse it across queries.
+        frontier (callable): Frontier class for the open set (frontier.LazyHeapFrontier by
+            default; frontier.IndexedHeapFrontier keeps one entry per open node)
+        probe (SearchProbe): Optional instrumentation collecting counters for this run
+        limits (SearchLimits): Optional deadline, expansion budget and cancellation token
+    
+    Returns:
+        tuple: (goal_node, path, nodes_expanded) where:
+            - goal_node: First destination reached (or None if no path exists)
+            - path: List of nodes in the solution path
+            - nodes_expanded: Number of nodes visited during search
+
+    Raises:
+        SearchExhausted: If the limits stop the search before it finds a destination
+    """
+    # Compact graphs are searched over dense node indices and translated back to IDs
+    if isinstance(graph, CompactGraph):
+        source, goals = graph.to_indices(origin, destinations)
+        return graph.to_result(*_cus2(graph.coords, graph, source, goals, weight, heuristic_fn, frontier, probe,
+                                      limits))
+    return _cus2(node, graph, origin, destinations, weight, heuristic_fn, frontier, probe, limits)
+
+
+def _cus2(node, graph, origin, destinations, weight, heuristic_fn, frontier, probe, limits):
+    # Heuristic table: each node's distance to the closest goal is computed once
+    h = GoalDistance(node, destinations) if heuristic_fn is None else heuristic_fn
+    destinations = set(destinations)
+    frontier = frontier or LazyHeapFrontier
+    if probe is not None:
+        graph, frontier, h = probe.graph(graph), probe.frontier(frontier), probe.heuristic(h)
+
+    # Initialize closed set for visited nodes
+    visited = set()
+    check_at = first_check(limits)  # Expansion count at which the limits are polled next
+    
+    # Priority queue for open set: (f_value, g_value, node_id)
+    queue = frontier()
+
+    # Cheapest known cost and parent pointer for every reached node
+    best_g = {origin: 0}
+    parent = {origin: None}
+
+    # Calculate initial heuristic value (minimum distance to any goal)
+    initial_h = h(origin)
+    # Push start node with weighted heuristic value
+    queue.push((initial_h * weight, 0, origin))
+
+    while queue:
+        # Get node with lowest f-value (f = g + weight*h)
+        f, g, current = queue.pop()
+
+        # Skip if already visited (better path was found)
+        if current in visited:
+            continue
+        visited.add(current)
+        if len(visited) >= check_at:
+            check_at = limits.poll(len(visited))  # Raises SearchExhausted once a limit is reached
+
+        # Check if we've reached any destination
+        if current in destinations:
+            return current, reconstruct_path(parent, current), len(visited)
+
+        # Neighbors come in the canonical order of the loaded graph; the order does not
+        # affect the result, since queue entries and parent ties are ordered explicitly
+        neighbors = graph.get(current, [])
+        for neighbor, cost in neighbors:
+            if neighbor not in visited:
+                # Calculate new path cost to neighbor
+                g_new = g + cost
+                old_g = best_g.get(neighbor)
+                if old_g is None or g_new < old_g:
+                    best_g[neighbor] = g_new
+                    parent[neighbor] = current
+                    # Calculate heuristic estimate to closest goal
+                    h_new = h(neighbor)
+                    # Calculate f-value with weighted heuristic
+                    f_new = g_new + weight * h_new
+                    # Add neighbor to queue with updated values
+                    queue.push((f_new, g_new, neighbor))
+                elif g_new == old_g and path_precedes(parent, current, parent[neighbor], neighbor):
+                    # Equal cost: keep the lexicographically smaller path, as comparing
+                    # path lists in the queue entries used to
+                    parent[neighbor] = current
+
+    # No path found to any destination
+    return None, [], len(visited)
+
+
+def ara_star(node, graph, origin, destinations, deadline=None, weight=2.5, weight_step=0.5, heuristic_fn=None,
+             limits=None):
+    """
+    Anytime Repairing A* (ARA*): weighted A* as in cus2, improved while time allows.
+
+    A first path is found quickly with a high heuristic weight. The weight is then lowered
+    by weight_step, down to 1, and each search reuses the previous one instead of
+    starting over: it only re-expands the nodes whose cost improved since they were
+    expanded. With an admissible heuristic, the path found by every search costs at most
+    bound times the lowest cost, and the search at weight 1 makes it optimal (bound 1).
+
+    Args:
+        node (dict): Dictionary mapping node IDs to (x,y) coordinates (ignored for a CompactGraph,
+            which carries its own coordinates)
+        graph (dict or CompactGraph): Adjacency list representation of the graph {node: [(neighbor, cost)]}
+        origin (str): Starting node ID
+        destinations (list): List of possible goal node IDs
+        deadline (float): Optional time.monotonic() value at which to stop and return the
+            best path found so far
+        weight (float): Heuristic weight of the first search
+        weight_step (float): Amount the weight is lowered by between searches
+        heuristic_fn (callable): Optional admissible heuristic provider, as for cus2
+        limits (SearchLimits): Optional deadline, expansion budget and cancellation token;
+            like the deadline, they stop the search with the best path found so far
+
+    Returns:
+        tuple: (goal_node, path, nodes_expanded, bound) where nodes_expanded counts the
+            expansions of all the searches, and the path's cost is at most bound times
+            the lowest cost. If no destination is reachable, goal_node is None and bound is 1.
+
+    Raises:
+        SearchExhausted: If the deadline or limits stop the first search before it finds a path
+    """
+    for result in ara_star_iter(node, graph, origin, destinations, deadline, weight, weight_step, heuristic_fn,
+                                limits):
+        pass
+    return result
+
+
+def ara_star_iter(node, graph, origin, destinations, deadline=None, weight=2.5, weight_step=0.5, heuristic_fn=None,
+                  limits=None):
+    """
+    Runs ARA* (see ara_star), yielding its improving results as they are found.
+
+    Yields:
+        tuple: (goal_node, path, nodes_expanded, bound) after every search at a lower
+            weight, and a last time when the deadline or limits stop a search
+
+    Raises:
+        SearchExhausted: If the deadline or limits stop the first search before it finds a path
+    """
+    if deadline is not None:
+        limits = SearchLimits(deadline) if limits is None else limits.until(deadline)
+    if isinstance(graph, CompactGraph):
+        source, goals = graph.to_indices(origin, destinations)
+        for goal, path, count, bound in _ara_star(graph.coords, graph, source, goals, weight, weight_step,
+                                                  heuristic_fn, limits):
+            yield graph.to_result(goal, path, count) + (bound,)
+    else:
+        yield from _ara_star(node, graph, origin, destinations, weight, weight_step, heuristic_fn, limits)
+
+
+def _ara_result(parent, goal, goal_g, lower, count):
+    # The best path so far, bounded by its cost over the lower bound on the lowest cost
+    if goal_g == 0:
+        bound = 1.0
+    else:
+        bound = max(1.0, goal_g / lower) if lower > 0 else math.inf
+    return goal, reconstruct_path(parent, goal), count, bound
+
+
+def _ara_star(node, graph, origin, destinations, weight, weight_step, heuristic_fn, limits):
+    if not destinations:
+        yield None, [], 0, 1.0
+        return
+    h = GoalDistance(node, destinations) if heuristic_fn is None else heuristic_fn
+    destinations = set(destinations)
+
+    best_g = {origin: 0}
+    parent = {origin: None}
+    # OPEN holds the nodes to expand in this search, INCONS the nodes whose cost improved
+    # after they had been expanded in it: they wait for the next search
+    open_set = {origin}
+    incons = set()
+    queue = [(weight * h(origin), 0, origin)]
+    goal, goal_g = (origin, 0) if origin in destinations else (None, math.inf)
+    lower = 0  # Lower bound on the lowest path cost
+    count = 0
+    check_at = first_check(limits)  # Expansion count at which the limits are polled next
+
+    while True:
+        # Improve the path: expand nodes in order of g + weight * h for as long as one of
+        # them could still lead to a cheaper destination than the best one reached
+        closed = set()
+        while queue and queue[0][0] < goal_g:
+            _, g, current = heapq.heappop(queue)
+            if current not in open_set or g != best_g[current]:
+                continue  # Stale entry
+            open_set.remove(current)
+            closed.add(current)
+            count += 1
+            if count >= check_at:
+                try:
+                    check_at = limits.poll(count)
+                except SearchExhausted:
+                    if goal is None:
+                        raise
+                    # Out of time or budget: the best path so far is the answer
+                    yield _ara_result(parent, goal, goal_g, lower, count - 1)
+                    return
+
+            for neighbor, cost in graph.get(current, []):
+                g_new = g + cost
+                if g_new < best_g.get(neighbor, math.inf):
+                    best_g[neighbor] = g_new
+                    parent[neighbor] = current
+                    if neighbor in destinations and g_new < goal_g:
+                        goal, goal_g = neighbor, g_new
+                    if neighbor in closed:
+                        incons.add(neighbor)
+                    else:
+                        open_set.add(neighbor)
+                        heapq.heappush(queue, (g_new + weight * h(neighbor), g_new, neighbor))
+
+        if goal is None:
+            # The search ran out of nodes: no destination is reachable
+            yield None, [], count, 1.0
+            return
+
+        # The path costs at most weight times the lowest cost, and every cheaper path runs
+        # through a node left in OPEN or INCONS, whose lowest g + h is a lower bound too
+        waiting = open_set | incons
+        lower = max(lower, goal_g / weight, min((best_g[n] + h(n) for n in waiting), default=goal_g))
+        best = _ara_result(parent, goal, goal_g, lower, count)
+        yield best
+        bound = best[3]
+        if bound <= 1 or weight <= 1:
+            return
+
+        # Lower the weight (no further than the bound reached) and search again from
+        # OPEN and INCONS, with every key recomputed for the new weight
+        weight = max(1.0, min(weight - weight_step, bound))
+        open_set = waiting
+        incons = set()
+        queue = [(best_g[n] + weight * h(n), best_g[n], n) for n in open_set]
+        heapq.heapify(queue)
@@ -1,52 +1,79 @@
-def dfs_search(graph, origin, destinations):
-    """
-    Implements Depth-First Search to find a path from origin to any destination.
-    
-    Args:
-        graph (dict): Adjacency list representation where each key maps to list of (neighbor, cost) tuples
-        origin (str): Starting node ID
-        destinations (list): List of possible goal node IDs
-    
-    Returns:
-        tuple: (destination_reached, path, nodes_expanded) where:
-            - destination_reached: First destination found (or None if no path exists)
-            - path: List of nodes in the solution path
-            - nodes_expanded: Number of nodes visited during search
-    """
-    # Initialize stack with (node, path) pairs - path tracks the route to current node
-    stack = [(origin, [origin])]
-    
-    # Set to track visited nodes and avoid cycles
-    visited = set()
-    
-    # Counter for performance measurement
-    nodes_created = 0
-
-    while stack:
-        # Pop most recently added node (LIFO order)
-        current_node, path_so_far = stack.pop()
-        nodes_created += 1
-
-        # Check if we've reached any destination
-        if current_node in destinations:
-            return current_node, path_so_far, nodes_created
-
-        # Mark current node as visited
-        visited.add(current_node)
-
-        if current_node in graph:
-            # Get and sort neighbors for consistent tie-breaking
-            neighbors = graph[current_node]
-            neighbors_sorted = sorted(neighbors, key=lambda x: int(x[0]))
-            
-            # Process neighbors in reverse order
-            # (so they're explored in ascending order due to LIFO stack behavior)
-            for (node, _) in reversed(neighbors_sorted):
-                if node not in visited:
-                    # Create new path by appending neighbor
-                    new_path = path_so_far + [node]
-                    # Add to stack for later exploration
-                    stack.append((node, new_path))
-
-    # No path found to any destination
-    return None, [], nodes_created
+from compact_graph import CompactGraph
+from frontier import LifoFrontier
+from limits import first_check
+from path_utils import link_path
+
+def dfs_search(graph, origin, destinations, probe=None, limits=None):
+    """
+    Implements Depth-First Search to find a path from origin to any destination.
+    
+    Args:
+        graph (dict or CompactGraph): Adjacency list representation where each key maps to list of (neighbor, cost) tuples
+        origin (str): Starting node ID
+        destinations (list): List of possible goal node IDs
+        probe (SearchProbe): Optional instrumentation collecting counters for this run
+        limits (SearchLimits): Optional deadline, expansion budget and cancellation token
+    
+    Returns:
+        tuple: (destination_reached, path, nodes_expanded) where:
+            - destination_reached: First destination found (or None if no path exists)
+            - path: List of nodes in the solution path
+            - nodes_expanded: Number of nodes visited during search
+
+    Raises:
+        SearchExhausted: If the limits stop the search before it finds a destination
+    """
+    # Compact graphs are searched over dense node indices and translated back to IDs
+    if isinstance(graph, CompactGraph):
+        source, goals = graph.to_indices(origin, destinations)
+        return graph.to_result(*_dfs_search(graph, source, goals, probe, limits))
+    return _dfs_search(graph, origin, destinations, probe, limits)
+
+
+def _dfs_search(graph, origin, destinations, probe, limits):
+    frontier = LifoFrontier
+    if probe is not None:
+        graph, frontier = probe.graph(graph), probe.frontier(frontier)
+
+    # Initialize stack with path links - each link is a (node, previous_link) pair, so a push
+    # only allocates one small cell instead of copying the whole path
+    stack = frontier()
+    stack.push((origin, None))
+    
+    # Set to track visited nodes and avoid cycles
+    visited = set()
+    
+    # Counter for performance measurement
+    nodes_created = 0
+    check_at = first_check(limits)  # Expansion count at which the limits are polled next
+
+    while stack:
+        # Pop most recently added node (LIFO order)
+        link = stack.pop()
+        current_node = link[0]
+        nodes_created += 1
+        if nodes_created >= check_at:
+            check_at = limits.poll(nodes_created)  # Raises SearchExhausted once a limit is reached
+
+        # Check if we've reached any destination
+        if current_node in destinations:
+            return current_node, link_path(link), nodes_created
+
+        # Mark current node as visited
+        visited.add(current_node)
+
+        if current_node in graph:
+            # Neighbors come in the canonical (ascending ID) order of the loaded graph
+            neighbors = graph[current_node]
+            if type(neighbors) is not list:
+                neighbors = list(neighbors)  # CompactGraph rows are iterators
+
+            # Process neighbors in reverse order
+            # (so they're explored in ascending order due to LIFO stack behavior)
+            for (node, _) in reversed(neighbors):
+                if node not in visited:
+                    # Add to stack for later exploration, linked to the path that reached it
+                    stack.push((node, link))
+
+    # No path found to any destination
+    return None, [], nodes_created
@@ -0,0 +1,163 @@
+"""
+Many-to-many distance matrices: lowest path costs from every origin to every target.
+
+Usage:
+    python distance_matrix.py <graph.txt> -o <matrix.npy> [--origins FILE] [--targets FILE]
+                              [--workers N] [--compact]
+
+Origins and targets files list node IDs separated by whitespace or semicolons; they
+default to the graph file's origin and destinations. The matrix is saved with
+numpy.save, one row per origin and one column per target, with inf where a target
+cannot be reached.
+"""
+import argparse
+import math
+import multiprocessing
+import re
+import sys
+import time
+from compact_graph import CompactGraph
+from graph_cache import fresh_cache
+from Parse_file import parse_file
+from ucs import shortest_distances
+
+# Graph and target columns of the current process, inherited by forked workers or
+# installed once per worker by the pool initializer (as in parallel.py)
+_state = {}
+
+
+def distance_row(graph, origin, columns, width):
+    """
+    Fills one matrix row from a ucs.shortest_distances search from origin that stops once
+    every target is settled (or the reachable part of the graph is exhausted).
+
+    Args:
+        graph (dict or CompactGraph): Adjacency list representation {node: [(neighbor, cost)]}
+        origin: Starting node, keyed like the graph
+        columns (dict): Target node -> list of the matrix columns it fills
+        width (int): Number of columns
+
+    Returns:
+        list: Lowest cost to each column's target (inf if unreachable)
+    """
+    row = [math.inf] * width
+    dist = shortest_distances(graph, origin, columns)
+    for target, target_columns in columns.items():
+        cost = dist.get(target)
+        if cost is not None:
+            for column in target_columns:
+                row[column] = cost
+    return row
+
+
+def _init_worker(graph, columns, width):
+    """Installs the graph and target columns that this process computes rows for."""
+    _state["graph"] = graph
+    _state["columns"] = columns
+    _state["width"] = width
+
+
+def _row(item):
+    """Worker task: computes the row of one numbered origin."""
+    i, origin = item
+    return i, distance_row(_state["graph"], origin, _state["columns"], _state["width"])
+
+
+def distance_matrix(graph, origins, targets, workers=1, chunksize=8):
+    """
+    Computes the lowest path cost from every origin to every target, with one
+    single-source Dijkstra per origin instead of one search per pair.
+
+    Args:
+        graph (dict or CompactGraph): Graph as returned by parse_file
+        origins (list): Origin node IDs (matrix rows)
+        targets (list): Target node IDs (matrix columns)
+        workers (int): Worker processes; 1 computes every row in this process and
+            None uses one per CPU
+        chunksize (int): Origins handed to a worker at a time
+
+    Returns:
+        numpy.ndarray: float64 matrix of shape (len(origins), len(targets)), inf where
+        a target cannot be reached from an origin
+
+    Raises:
+        KeyError: If an origin is not a node of the graph
+    """
+    import numpy as np
+
+    # Searches run over dense node indices on compact graphs; targets that are not in
+    # the graph keep their inf column
+    if isinstance(graph, CompactGraph):
+        index = graph.index
+        sources = [index[origin] for origin in origins]
+        keys = [index.get(target) for target in targets]
+    else:
+        for origin in origins:
+            if origin not in graph:
+                raise KeyError(origin)
+        sources = list(origins)
+        keys = list(targets)
+
+    columns = {}
+    for column, key in enumerate(keys):
+        if key is not None:
+            columns.setdefault(key, []).append(column)
+
+    matrix = np.full((len(sources), len(keys)), np.inf)
+    if workers == 1:
+        for i, source in enumerate(sources):
+            matrix[i] = distance_row(graph, source, columns, len(keys))
+        return matrix
+
+    if "fork" in multiprocessing.get_all_start_methods():
+        # Workers share the parent's graph pages through fork instead of unpickling a copy
+        _init_worker(graph, columns, len(keys))
+        context = multiprocessing.get_context("fork")
+        initializer, initargs = None, ()
+    else:
+        context = multiprocessing.get_context()
+        initializer, initargs = _init_worker, (graph, columns, len(keys))
+
+    with context.Pool(workers, initializer, initargs) as pool:
+        for i, row in pool.imap_unordered(_row, enumerate(sources), chunksize):
+            matrix[i] = row
+    return matrix
+
+
+def read_ids(filename):
+    """Reads node IDs separated by whitespace or semicolons from a file."""
+    with open(filename) as f:
+        return [node_id for node_id in re.split(r'[\s;]+', f.read()) if node_id]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compute a many-to-many distance matrix")
+    parser.add_argument("filename", help="graph file (text or compiled)")
+    parser.add_argument("-o", "--output", required=True, help="output .npy file")
+    parser.add_argument("--origins", help="file of origin IDs (default: the graph file's origin)")
+    parser.add_argument("--targets", help="file of target IDs (default: the graph file's destinations)")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes (0 for one per CPU)")
+    parser.add_argument("--compact", action="store_true")
+    args = parser.parse_args()
+
+    import numpy as np
+
+    compact = args.compact or fresh_cache(args.filename) is not None
+    graph, _, origin, destinations = parse_file(args.filename, compact=compact)
+    origins = read_ids(args.origins) if args.origins else [origin]
+    targets = read_ids(args.targets) if args.targets else destinations
+
+    start = time.perf_counter()
+    try:
+        matrix = distance_matrix(graph, origins, targets, args.workers or None)
+    except KeyError as e:
+        sys.exit(f"Unknown origin node {e}")
+    seconds = time.perf_counter() - start
+
+    np.save(args.output, matrix)
+    print(f"{len(origins)} x {len(targets)} matrix in {seconds:.2f}s, "
+          f"{np.isinf(matrix).sum()} unreachable pairs, saved to {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
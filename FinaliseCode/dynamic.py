@@ -0,0 +1,333 @@
+"""
+Shortest paths on a graph whose edge costs change between queries.
+
+A DynamicGraph is a mutable copy of a parse_file graph. An IncrementalSearch answers
+CUS1 queries (lowest cost path from an origin to the cheapest destination) on it with
+Lifelong Planning A* (LPA*): after edge costs change, the next search() repairs only the
+part of the previous search tree whose costs the changes affect, instead of searching
+again from scratch.
+
+Example:
+    dynamic = DynamicGraph(graph)
+    search = IncrementalSearch(dynamic, origin, destinations)
+    goal, path, expanded = search.search()
+    dynamic.set_cost("4", "7", 12.5)
+    dynamic.remove_edge("7", "9")
+    goal, path, expanded = search.search()  # same result as a fresh ucs_search
+"""
+import heapq
+import math
+import weakref
+from compact_graph import CompactGraph, id_order
+from path_utils import reconstruct_path, path_precedes
+
+INF = math.inf
+
+# Stands for the virtual goal node that every destination leads to at no cost, so the
+# cheapest destination is found as the shortest path to a single goal
+_GOAL = None
+
+# Search costs are (path cost, edge count) pairs, see IncrementalSearch
+_ZERO = (0, 0)
+_UNREACHED = (INF, INF)
+
+
+def _extend(reach, cost):
+    """Returns the cost pair of a path with cost reach followed by an edge of the given cost."""
+    return reach[0] + cost, reach[1] + 1
+
+
+def _canonical(neighbors):
+    """Returns a {neighbor: cost} dict in the canonical neighbour order."""
+    if len(neighbors) < 2:
+        return neighbors
+    return dict(sorted(neighbors.items(), key=lambda edge: id_order(edge[0])))
+
+
+class DynamicGraph:
+    """
+    Mutable adjacency list with predecessor lists, for searches that are kept up to date.
+
+    It has the read-only mapping interface of the parse_file dict graph (get, [], in, len,
+    iteration), with neighbours kept in the canonical order of compact_graph.id_order, so
+    every search function can also run on it directly.
+
+    Args:
+        graph (dict or CompactGraph): Graph as returned by parse_file; it is copied, and
+            a CompactGraph is keyed by node ID like the dict form
+
+    Raises:
+        ValueError: If the graph has an edge with a negative cost
+
+    Attributes:
+        successors (dict): node -> {neighbor: cost}
+        predecessors (dict): node -> {predecessor: cost}
+        version (int): Number of edge changes made so far
+    """
+
+    def __init__(self, graph):
+        self.successors = {}
+        self.predecessors = {}
+        self.version = 0
+        self._searches = weakref.WeakSet()
+        if isinstance(graph, CompactGraph):
+            ids = graph.ids
+            edges = ((ids[start], ((ids[end], cost) for end, cost in graph[start])) for start in graph)
+        else:
+            edges = graph.items()
+        for start, neighbors in edges:
+            row = self.successors.setdefault(start, {})
+            for end, cost in neighbors:
+                if cost < 0:
+                    raise ValueError(f"negative edge cost {cost} for ({start},{end})")
+                # Of parallel edges only the cheapest can be on a lowest cost path
+                if cost < row.get(end, INF):
+                    row[end] = cost
+                    self.predecessors.setdefault(end, {})[start] = cost
+        # Loaded graphs are in the canonical order already, which makes this linear
+        for start, row in self.successors.items():
+            self.successors[start] = _canonical(row)
+
+    def _store(self, start, end, cost):
+        neighbors = self.successors.setdefault(start, {})
+        added = end not in neighbors
+        neighbors[end] = cost
+        if added:
+            # A new edge goes to the end of the dict: restore the canonical order
+            self.successors[start] = _canonical(neighbors)
+        self.predecessors.setdefault(end, {})[start] = cost
+
+    def cost(self, start, end):
+        """Returns the cost of the edge from start to end (inf if there is none)."""
+        return self.successors.get(start, {}).get(end, INF)
+
+    def set_cost(self, start, end, cost):
+        """
+        Sets the cost of the edge from start to end, adding the edge if it is missing.
+
+        Raises:
+            ValueError: If cost is negative (lowest cost searches need non-negative costs)
+        """
+        if cost < 0:
+            raise ValueError(f"negative edge cost {cost} for ({start},{end})")
+        old_cost = self.cost(start, end)
+        self._store(start, end, cost)
+        self._changed(start, end, old_cost, cost)
+
+    def remove_edge(self, start, end):
+        """
+        Deletes the edge from start to end.
+
+        Raises:
+            KeyError: If there is no such edge
+        """
+        old_cost = self.successors.get(start, {}).pop(end)
+        del self.predecessors[end][start]
+        self._changed(start, end, old_cost, INF)
+
+    def _changed(self, start, end, old_cost, new_cost):
+        # Every search on this graph repairs its state as the change is made, so changes
+        # need not be recorded for it
+        self.version += 1
+        for search in self._searches:
+            search._edge_changed(start, end, old_cost, new_cost)
+
+    # Read-only mapping interface of the dict adjacency list
+
+    def __len__(self):
+        return len(self.successors)
+
+    def __iter__(self):
+        return iter(self.successors)
+
+    def __contains__(self, node):
+        return node in self.successors
+
+    def __getitem__(self, node):
+        return list(self.successors[node].items())
+
+    def get(self, node, default=None):
+        neighbors = self.successors.get(node)
+        return default if neighbors is None else list(neighbors.items())
+
+    def items(self):
+        return ((node, list(neighbors.items())) for node, neighbors in self.successors.items())
+
+
+class IncrementalSearch:
+    """
+    Lifelong Planning A* from a fixed origin to the cheapest of a fixed set of destinations.
+
+    Each node keeps g, its cost as of the last time it was expanded, and rhs, the lowest
+    g(predecessor) + edge cost over its predecessors. Nodes where the two differ are
+    inconsistent and wait in the open heap, keyed by min(g, rhs). The first search()
+    expands nodes in the same order as Dijkstra's algorithm; an edge change afterwards
+    only makes the edge's end node inconsistent, and the next search() expands just the
+    nodes whose cost the change affects.
+
+    Costs are kept as (path cost, edge count) pairs compared in that order. LPA* relies
+    on every edge adding to the cost: with plain costs, nodes on a cycle of zero cost
+    edges would keep supporting each other's stale g after the edges into the cycle got
+    dearer.
+
+    Without a heuristic the searches stay exact whatever costs the edges are given (the
+    straight-line heuristic would stop being admissible once an edge costs less than its
+    length). Results, including the choice between equal cost destinations and paths,
+    are those of ucs_search on the current graph; nodes_expanded counts the expansions
+    of that search() call only.
+
+    Args:
+        graph (DynamicGraph): Graph to search; the search follows its edge changes
+        origin (str): Starting node ID
+        destinations (list): List of possible goal node IDs
+    """
+
+    def __init__(self, graph, origin, destinations):
+        self.graph = graph
+        self.origin = origin
+        self.destinations = set(destinations)
+        self.g = {}
+        self.rhs = {origin: _ZERO}
+        self.open_key = {origin: _ZERO}  # Key of every inconsistent node in the heap
+        self.heap = [(_ZERO, 0, origin)]
+        graph._searches.add(self)
+
+    def _key(self, node):
+        return min(self.g.get(node, _UNREACHED), self.rhs.get(node, _UNREACHED))
+
+    def _update(self, node):
+        # (Re)queues node if it is inconsistent; entries with a different key than the
+        # node's current one are stale and skipped when popped
+        key = self._key(node)
+        if self.g.get(node, _UNREACHED) != self.rhs.get(node, _UNREACHED):
+            if self.open_key.get(node) != key:
+                self.open_key[node] = key
+                # Entries are (key, tie, node): the virtual goal sorts after real nodes
+                # of equal key and is never compared with them
+                heapq.heappush(self.heap, (key, 1 if node is _GOAL else 0, node))
+        else:
+            self.open_key.pop(node, None)
+
+    def _lowest_rhs(self, node):
+        # Recomputes rhs(node) from all its predecessors
+        g = self.g
+        if node is _GOAL:
+            return min((g.get(d, _UNREACHED) for d in self.destinations), default=_UNREACHED)
+        costs = self.graph.predecessors.get(node, {})
+        return min((_extend(g.get(p, _UNREACHED), cost) for p, cost in costs.items()), default=_UNREACHED)
+
+    def _edge_changed(self, start, end, old_cost, new_cost):
+        if end == self.origin:
+            return
+        rhs = self.rhs
+        via_start = self.g.get(start, _UNREACHED)
+        if new_cost < old_cost:
+            # A cheaper edge can only lower rhs(end)
+            if _extend(via_start, new_cost) < rhs.get(end, _UNREACHED):
+                rhs[end] = _extend(via_start, new_cost)
+                self._update(end)
+        elif _extend(via_start, old_cost) == rhs.get(end, _UNREACHED) < _UNREACHED:
+            # end may have been reached through this edge: look for its next best predecessor
+            rhs[end] = self._lowest_rhs(end)
+            self._update(end)
+
+    def _settle(self):
+        # Expands inconsistent nodes in key order until the virtual goal is consistent
+        # and every node whose path cost could tie with it has been expanded, so equal
+        # cost destinations and paths are all known
+        g, rhs, heap, open_key = self.g, self.rhs, self.heap, self.open_key
+        successors, destinations = self.graph.successors, self.destinations
+        nodes_created = 0
+        while heap:
+            key, _, node = heap[0]
+            if open_key.get(node) != key:
+                heapq.heappop(heap)
+                continue  # Stale entry, the node was requeued or became consistent
+            if key[0] > self._key(_GOAL)[0] and g.get(_GOAL, _UNREACHED) == rhs.get(_GOAL, _UNREACHED):
+                break
+            heapq.heappop(heap)
+            del open_key[node]
+            nodes_created += 1
+            neighbors = () if node is _GOAL else successors.get(node, {}).items()
+            old_g = g.get(node, _UNREACHED)
+            new_g = rhs.get(node, _UNREACHED)
+
+            if new_g < old_g:
+                # Overconsistent: the node's cost dropped, which can lower its successors'
+                g[node] = new_g
+                for neighbor, cost in neighbors:
+                    if neighbor != self.origin and _extend(new_g, cost) < rhs.get(neighbor, _UNREACHED):
+                        rhs[neighbor] = _extend(new_g, cost)
+                        self._update(neighbor)
+                if node in destinations and new_g < rhs.get(_GOAL, _UNREACHED):
+                    rhs[_GOAL] = new_g
+                    self._update(_GOAL)
+            else:
+                # Underconsistent: the node's cost rose, so successors that were reached
+                # through it have to look for other predecessors, and it is requeued
+                g[node] = _UNREACHED
+                for neighbor, cost in neighbors:
+                    if neighbor != self.origin and _extend(old_g, cost) == rhs.get(neighbor, _UNREACHED):
+                        rhs[neighbor] = self._lowest_rhs(neighbor)
+                        self._update(neighbor)
+                if node in destinations and old_g == rhs.get(_GOAL, _UNREACHED):
+                    rhs[_GOAL] = self._lowest_rhs(_GOAL)
+                    self._update(_GOAL)
+                self._update(node)
+        return nodes_created
+
+    def search(self):
+        """
+        Brings the search up to date with the graph and returns its lowest cost path.
+
+        Returns:
+            tuple: (goal_node, path, nodes_expanded) as returned by ucs_search, where
+            nodes_expanded counts the nodes this call expanded
+        """
+        nodes_created = self._settle()
+        best = self.g.get(_GOAL, _UNREACHED)[0]
+        if best == INF:
+            return None, [], nodes_created
+        goal, path = self._path([d for d in self.destinations if self.g.get(d, _UNREACHED)[0] == best])
+        return goal, path, nodes_created
+
+    def cost(self):
+        """Returns the cost of the current lowest cost path (inf if no destination is reachable)."""
+        self._settle()
+        return self.g.get(_GOAL, _UNREACHED)[0]
+
+    def _path(self, goals):
+        # ucs_search returns the first lowest cost destination it pops, and breaks ties
+        # between equal cost paths by keeping, of the nodes popped before a node, the one
+        # giving the lexicographically smallest path. Mark the nodes on some lowest cost
+        # path to those goals, walking backwards over the edges that are tight
+        # (g(start) + cost == g(end)), then replay ucs_search over the tight edges between
+        # marked nodes only, which pops them in the same order. Each node is popped once,
+        # so the path cannot revisit a node even where zero cost edges form a cycle.
+        g, graph, origin = self.g, self.graph, self.origin
+        on_path = set(goals)
+        stack = list(goals)
+        while stack:
+            node = stack.pop()
+            for previous, cost in graph.predecessors.get(node, {}).items():
+                if previous not in on_path and g.get(previous, _UNREACHED)[0] + cost == g[node][0]:
+                    on_path.add(previous)
+                    stack.append(previous)
+
+        parent = {origin: None}
+        popped = set()
+        heap = [(0, origin)]
+        while True:
+            cost_to, node = heapq.heappop(heap)
+            if node in popped:
+                continue
+            popped.add(node)
+            if node in self.destinations:
+                return node, reconstruct_path(parent, node)
+            for neighbor, cost in graph.successors.get(node, {}).items():
+                if neighbor in on_path and neighbor not in popped and cost_to + cost == g[neighbor][0]:
+                    if neighbor not in parent:
+                        parent[neighbor] = node
+                        heapq.heappush(heap, (g[neighbor][0], neighbor))
+                    elif path_precedes(parent, node, parent[neighbor], neighbor):
+                        parent[neighbor] = node
@@ -0,0 +1,146 @@
+"""
+Frontier (open set) implementations for the searches.
+
+ucs_search, astar, cus2 and gbfs take a frontier class and use it through three
+operations: push(entry), pop() and len(). Entries are tuples ordered by their priority
+fields, with the node as the last field, e.g. (cost, node) or (f, g, node). BFS and DFS
+use the FIFO and LIFO frontiers below through the same operations.
+"""
+import heapq
+from collections import deque
+from functools import partial
+
+
+class FifoFrontier(deque):
+    """First-in first-out frontier (BFS): a deque whose push and pop are append and popleft."""
+    push = deque.append
+    pop = deque.popleft
+
+
+class LifoFrontier(list):
+    """Last-in first-out frontier (DFS): a list whose push and pop are append and pop."""
+    push = list.append
+
+
+class LazyHeapFrontier(list):
+    """
+    Binary heap (heapq) with lazy deletion: pushing a cheaper entry for a node leaves the
+    old one in place, and the search skips such stale entries when they are popped.
+
+    push and pop are heapq's C functions bound to this list, so the frontier costs
+    no more than calling heapq directly. This is the default.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.push = partial(heapq.heappush, self)
+        self.pop = partial(heapq.heappop, self)
+
+
+class IndexedHeapFrontier:
+    """
+    Binary heap with a node -> position index, supporting decrease-key.
+
+    Pushing an entry for a node already in the heap replaces that node's entry if the
+    new one is smaller (and is ignored otherwise), so the heap holds at most one entry
+    per open node and never returns stale entries. Pops come out in the same order as
+    from a LazyHeapFrontier with its stale entries skipped.
+    """
+
+    def __init__(self):
+        self.heap = []
+        self.position = {}  # Node -> index of its entry in heap
+
+    def __len__(self):
+        return len(self.heap)
+
+    def push(self, entry):
+        node = entry[-1]
+        i = self.position.get(node)
+        if i is None:
+            self.heap.append(entry)
+            self._sift_up(len(self.heap) - 1)
+        elif entry < self.heap[i]:
+            self.heap[i] = entry  # Decrease-key: the entry can only move up
+            self._sift_up(i)
+
+    def pop(self):
+        heap = self.heap
+        top = heap[0]
+        del self.position[top[-1]]
+        last = heap.pop()
+        if heap:
+            heap[0] = last
+            self._sift_down(0)
+        return top
+
+    def _sift_up(self, i):
+        heap, position = self.heap, self.position
+        entry = heap[i]
+        while i > 0:
+            parent = (i - 1) >> 1
+            if not entry < heap[parent]:
+                break
+            heap[i] = heap[parent]
+            position[heap[i][-1]] = i
+            i = parent
+        heap[i] = entry
+        position[entry[-1]] = i
+
+    def _sift_down(self, i):
+        heap, position = self.heap, self.position
+        size = len(heap)
+        entry = heap[i]
+        while True:
+            child = 2 * i + 1
+            if child >= size:
+                break
+            if child + 1 < size and heap[child + 1] < heap[child]:
+                child += 1
+            if not heap[child] < entry:
+                break
+            heap[i] = heap[child]
+            position[heap[i][-1]] = i
+            i = child
+        heap[i] = entry
+        position[entry[-1]] = i
+
+
+class CountingFrontier:
+    """
+    Wraps a frontier class to count pushes and pops and record the peak frontier size.
+
+    An instance is itself a frontier factory: pass CountingFrontier(IndexedHeapFrontier)
+    as a search's frontier argument, then read the counters after the search.
+    """
+
+    def __init__(self, frontier_class):
+        self.frontier_class = frontier_class
+        self.pushes = self.pops = self.peak = 0
+
+    def __call__(self):
+        return _CountedFrontier(self, self.frontier_class())
+
+
+class _CountedFrontier:
+    """Frontier that forwards to another one and updates a CountingFrontier's counters."""
+
+    def __init__(self, counter, inner):
+        self.counter = counter
+        self.inner = inner
+
+    def __len__(self):
+        return len(self.inner)
+
+    def push(self, entry):
+        self.inner.push(entry)
+        self.counter.pushes += 1
+        self.counter.peak = max(self.counter.peak, len(self.inner))
+
+    def pop(self):
+        self.counter.pops += 1
+        return self.inner.pop()
+
+
+# Frontier classes by name
+FRONTIERS = {"lazy": LazyHeapFrontier, "indexed": IndexedHeapFrontier}
@@ -1,59 +1,101 @@
-import heapq
-import math
-from heuristicFunction import heuristic
-
-def gbfs(node, graph, origin, destinations):
-    """
-    Implements Greedy Best-First Search to find a path from origin to any destination.
-    Uses straight-line distance heuristic to guide the search.
-    
-    Args:
-        node (dict): Dictionary mapping node IDs to (x,y) coordinates
-        graph (dict): Adjacency list representation {node: [(neighbor, cost)]}
-        origin (str): Starting node ID
-        destinations (list): List of possible goal node IDs
-    
-    Returns:
-        tuple: (destination_reached, path, nodes_expanded) where:
-            - destination_reached: First destination found (or None if no path exists)
-            - path: List of nodes in the solution path
-            - nodes_expanded: Number of nodes visited during search
-    """
-    # Initialize set to track visited nodes and avoid cycles
-    visited = set()
-    nodes_created = 0  # Count of nodes expanded
-    
-    # Priority queue stores tuples: (heuristic_value, node_id, path_to_node)
-    queue = []
-
-    # Calculate initial heuristic value (distance to closest destination)
-    initial_h = min(heuristic(node[origin], node[g]) for g in destinations)
-    heapq.heappush(queue, (initial_h, origin, [origin]))
-
-    while queue:
-        # Get node with lowest heuristic value from priority queue
-        curr_priority, current, path = heapq.heappop(queue)
-        
-        # Skip if already visited (better path was found)
-        if current in visited:
-            continue
-
-        # Mark node as visited and increment expansion counter
-        visited.add(current)
-        nodes_created += 1
-
-        # Check if we've reached one of the destinations
-        if current in destinations:
-            return current, path, nodes_created
-
-        # Process neighbors in sorted order for consistent tie-breaking
-        neighbors = sorted(graph.get(current, []), key=lambda x: x[0])
-        for neighbor, _ in neighbors:
-            if neighbor not in visited:
-                # Calculate heuristic value for neighbor (distance to closest goal)
-                new_h = min(heuristic(node[neighbor], node[g]) for g in destinations)
-                # Add to queue with heuristic as priority
-                heapq.heappush(queue, (new_h, neighbor, path + [neighbor]))
-
-    # Return None if no path is found to any destination
-    return None, [], nodes_created
+from heuristicFunction import GoalDistance
+from compact_graph import CompactGraph
+from frontier import LazyHeapFrontier
+from limits import first_check
+from path_utils import reconstruct_path, path_precedes
+
+def gbfs(node, graph, origin, destinations, heuristic_fn=None, frontier=None, probe=None, limits=None):
+    """
+    Implements Greedy Best-First Search to find a path from origin to any destination.
+    Uses straight-line distance heuristic to guide the search.
+    
+    Args:
+        node (dict): Dictionary mapping node IDs to (x,y) coordinates (ignored for a CompactGraph,
+            which carries its own coordinates)
+        graph (dict or CompactGraph): Adjacency list representation {node: [(neighbor, cost)]}
+        origin (str): Starting node ID
+        destinations (list): List of possible goal node IDs
+        heuristic_fn (callable): Optional heuristic provider mapping a node to its estimated
+            distance to the closest destination (node IDs, or dense indices for a CompactGraph).
+            Defaults to a fresh GoalDistance table; pass an IndexedGoalDistance when there are
+            many destinations, or a table from a HeuristicCache to reuse it across queries.
+        frontier (callable): Frontier class for the open set (frontier.LazyHeapFrontier by
+            default); every node is queued once, so decrease-key never applies here
+        probe (SearchProbe): Optional instrumentation collecting counters for this run
+        limits (SearchLimits): Optional deadline, expansion budget and cancellation token
+    
+    Returns:
+        tuple: (destination_reached, path, nodes_expanded) where:
+            - destination_reached: First destination found (or None if no path exists)
+            - path: List of nodes in the solution path
+            - nodes_expanded: Number of nodes visited during search
+
+    Raises:
+        SearchExhausted: If the limits stop the search before it finds a destination
+    """
+    # Compact graphs are searched over dense node indices and translated back to IDs
+    if isinstance(graph, CompactGraph):
+        source, goals = graph.to_indices(origin, destinations)
+        return graph.to_result(*_gbfs(graph.coords, graph, source, goals, heuristic_fn, frontier, probe, limits))
+    return _gbfs(node, graph, origin, destinations, heuristic_fn, frontier, probe, limits)
+
+
+def _gbfs(node, graph, origin, destinations, heuristic_fn, frontier, probe, limits):
+    # Heuristic table: each node's distance to the closest goal is computed once
+    h = GoalDistance(node, destinations) if heuristic_fn is None else heuristic_fn
+    destinations = set(destinations)
+    frontier = frontier or LazyHeapFrontier
+    if probe is not None:
+        graph, frontier, h = probe.graph(graph), probe.frontier(frontier), probe.heuristic(h)
+
+    # Initialize set to track visited nodes and avoid cycles
+    visited = set()
+    nodes_created = 0  # Count of nodes expanded
+    check_at = first_check(limits)  # Expansion count at which the limits are polled next
+    
+    # Priority queue stores tuples: (heuristic_value, node_id)
+    queue = frontier()
+
+    # Parent pointers for path reconstruction; a node is queued once, when first reached
+    parent = {origin: None}
+
+    # Calculate initial heuristic value (distance to closest destination)
+    initial_h = h(origin)
+    queue.push((initial_h, origin))
+
+    while queue:
+        # Get node with lowest heuristic value from priority queue
+        curr_priority, current = queue.pop()
+        
+        # Skip if already visited (better path was found)
+        if current in visited:
+            continue
+
+        # Mark node as visited and increment expansion counter
+        visited.add(current)
+        nodes_created += 1
+        if nodes_created >= check_at:
+            check_at = limits.poll(nodes_created)  # Raises SearchExhausted once a limit is reached
+
+        # Check if we've reached one of the destinations
+        if current in destinations:
+            return current, reconstruct_path(parent, current), nodes_created
+
+        # Neighbors come in the canonical order of the loaded graph; the order does not
+        # affect the result, since queue entries and parent ties are ordered explicitly
+        neighbors = graph.get(current, [])
+        for neighbor, _ in neighbors:
+            if neighbor not in visited:
+                if neighbor not in parent:
+                    parent[neighbor] = current
+                    # Calculate heuristic value for neighbor (distance to closest goal)
+                    new_h = h(neighbor)
+                    # Add to queue with heuristic as priority
+                    queue.push((new_h, neighbor))
+                elif path_precedes(parent, current, parent[neighbor], neighbor):
+                    # Already queued with the same priority: keep the lexicographically
+                    # smaller path, as comparing path lists in the queue entries used to
+                    parent[neighbor] = current
+
+    # Return None if no path is found to any destination
+    return None, [], nodes_created
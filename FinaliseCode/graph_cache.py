@@ -0,0 +1,219 @@
+"""
+Binary graph cache: a compiled, memory-mappable form of a graph text file.
+
+Usage:
+    python graph_cache.py <graph.txt> [-o <graph.txt.csr>]
+
+parse_file(compact=True) and search.py load the compiled file instead of parsing the
+text whenever it is at least as new as the source, or when given the compiled file
+directly. Loading maps the file and wraps its sections in memoryviews, so the CSR
+arrays are used in place without being copied or decoded.
+"""
+import argparse
+import bisect
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+from compact_graph import CompactGraph, OFFSET_TYPE, TARGET_TYPE, FLOAT_TYPE
+
+MAGIC = b'CSRG'
+VERSION = 2  # 2: rows in the canonical neighbour order of compact_graph.id_order
+CACHE_SUFFIX = '.csr'
+
+# magic, version, byte order (0 little, 1 big), node count, edge count, ID blob size, metadata size
+HEADER = struct.Struct('=4sHHQQQQ')
+BYTE_ORDER = 0 if sys.byteorder == 'little' else 1
+
+
+class IdTable:
+    """
+    Node ID sequence backed by a UTF-8 blob and an offset array; IDs are decoded on access.
+    """
+
+    def __init__(self, offsets, blob):
+        self.offsets = offsets
+        self.blob = blob
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return str(self.blob[self.offsets[i]:self.offsets[i + 1]], 'utf-8')
+
+
+class IdIndex:
+    """
+    Read-only ID -> dense index mapping over a sorted IdTable, found by binary search,
+    so loading a cached graph does not have to build a dict of every node ID.
+    """
+
+    def __init__(self, ids):
+        self.ids = ids
+
+    def get(self, node_id, default=None):
+        i = bisect.bisect_left(self.ids, node_id)
+        if i < len(self.ids) and self.ids[i] == node_id:
+            return i
+        return default
+
+    def __getitem__(self, node_id):
+        i = self.get(node_id)
+        if i is None:
+            raise KeyError(node_id)
+        return i
+
+    def __contains__(self, node_id):
+        return self.get(node_id) is not None
+
+    def __len__(self):
+        return len(self.ids)
+
+
+def cache_path(filename):
+    """Returns the default compiled cache path for a graph text file."""
+    return filename + CACHE_SUFFIX
+
+
+def is_compiled(filename):
+    """Checks whether a file is a compiled graph (rather than the text format)."""
+    with open(filename, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def is_current(filename):
+    """Checks whether a compiled graph was written in this version's format for this platform."""
+    with open(filename, 'rb') as f:
+        header = f.read(HEADER.size)
+    if len(header) < HEADER.size:
+        return False
+    magic, version, byte_order = HEADER.unpack(header)[:3]
+    return magic == MAGIC and version == VERSION and byte_order == BYTE_ORDER
+
+
+def fresh_cache(filename):
+    """
+    Finds a compiled graph to use in place of parsing a file.
+
+    Returns:
+        str: filename itself if it is a compiled graph, its cache if that exists, is at
+        least as new as the text file and in the current format, otherwise None
+    """
+    if is_compiled(filename):
+        return filename
+    cached = cache_path(filename)
+    if (os.path.exists(cached) and os.path.getmtime(cached) >= os.path.getmtime(filename)
+            and is_current(cached)):
+        return cached
+    return None
+
+
+def _padding(size):
+    return -size % 8  # Keep every section 8-byte aligned
+
+
+def write_graph(filename, graph, origin, destinations):
+    """
+    Writes a CompactGraph plus the file's origin and destinations in the binary format.
+
+    Args:
+        filename (str): Output path
+        graph (CompactGraph): Graph to store
+        origin (str): Origin node ID from the source file
+        destinations (list): Destination node IDs from the source file
+    """
+    ids = [node_id.encode('utf-8') for node_id in graph.ids]
+    id_offsets = array(OFFSET_TYPE, [0])
+    for encoded in ids:
+        id_offsets.append(id_offsets[-1] + len(encoded))
+    meta = json.dumps({"origin": origin, "destinations": destinations}).encode('utf-8')
+
+    sections = [
+        array(OFFSET_TYPE, graph.offsets).tobytes(),
+        array(TARGET_TYPE, graph.targets).tobytes(),
+        array(FLOAT_TYPE, graph.weights).tobytes(),
+        array(FLOAT_TYPE, graph.coords.xy).tobytes(),
+        id_offsets.tobytes(),
+        b''.join(ids),
+        meta,
+    ]
+    with open(filename, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, BYTE_ORDER, len(graph), graph.num_edges, id_offsets[-1], len(meta)))
+        f.write(bytes(_padding(HEADER.size)))
+        for section in sections:
+            f.write(section)
+            f.write(bytes(_padding(len(section))))
+
+
+def load_graph(filename, stats=None):
+    """
+    Memory-maps a compiled graph.
+
+    Args:
+        filename (str): Path of a file written by write_graph
+        stats (dict): Optional dict that receives the same statistics as parse_file
+
+    Returns:
+        tuple: (graph, node, origin, destinations) as returned by parse_file(compact=True)
+
+    Raises:
+        ValueError: If the file is not a compiled graph for this version and byte order
+    """
+    start_time = time.perf_counter()
+    with open(filename, 'rb') as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    magic, version, byte_order, n, m, id_bytes, meta_bytes = HEADER.unpack_from(buffer)
+    if magic != MAGIC or version != VERSION or byte_order != BYTE_ORDER:
+        raise ValueError(f"{filename}: not a compiled graph for this version and platform")
+
+    view = memoryview(buffer)
+    position = HEADER.size + _padding(HEADER.size)
+
+    def section(size, typecode=None):
+        # Slice the next section out of the mapping (no copy) and step past its padding
+        nonlocal position
+        part = view[position:position + size]
+        position += size + _padding(size)
+        return part.cast(typecode) if typecode else part
+
+    offsets = section(8 * (n + 1), OFFSET_TYPE)
+    targets = section(4 * m, TARGET_TYPE)
+    weights = section(8 * m, FLOAT_TYPE)
+    xy = section(16 * n, FLOAT_TYPE)
+    id_offsets = section(8 * (n + 1), OFFSET_TYPE)
+    ids = IdTable(id_offsets, section(id_bytes))
+    meta = json.loads(bytes(section(meta_bytes)))
+
+    graph = CompactGraph(ids, offsets, targets, weights, xy, index=IdIndex(ids))
+
+    if stats is not None:
+        seconds = time.perf_counter() - start_time
+        byte_count = len(buffer)
+        stats.update(bytes=byte_count, lines=0, nodes=n, edges=m, seconds=seconds,
+                     throughput=byte_count / 1e6 / seconds if seconds else float('inf'))
+
+    return graph, graph.coords, meta["origin"], meta["destinations"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile a graph text file into the binary cache format")
+    parser.add_argument("filename", help="graph text file")
+    parser.add_argument("-o", "--output", help=f"output path (default: <filename>{CACHE_SUFFIX})")
+    args = parser.parse_args()
+
+    from Parse_file import parse_file
+
+    stats = {}
+    graph, _, origin, destinations = parse_file(args.filename, compact=True, stats=stats, use_cache=False)
+    output = args.output or cache_path(args.filename)
+    write_graph(output, graph, origin, destinations)
+    print(f"Compiled {stats['nodes']} nodes and {stats['edges']} edges into {output} "
+          f"({os.path.getsize(output) / 1e6:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
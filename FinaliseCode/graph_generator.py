@@ -0,0 +1,179 @@
+"""
+Synthetic graph generator writing the Nodes:/Edges:/Origin:/Destinations: text format.
+
+Usage:
+    python graph_generator.py <kind> --edges N -o <graph.txt> [--seed S] [--destinations K]
+
+Kinds:
+    grid       4-neighbour grid, edges in both directions
+    geometric  random geometric graph: points in a square, linked to all points within
+               a radius chosen for about 8 neighbours each
+    scalefree  Barabasi-Albert preferential attachment (3 links per new node, both
+               directions), with random coordinates
+    road       jittered grid with some local roads missing and fast highways every
+               few rows and columns
+
+Node IDs are 1..n. Edge costs are never below the straight-line distance between their
+end points (as written to the file), so the straight-line heuristic stays admissible.
+Nodes and edges are streamed to the file, so multi-million edge graphs can be written
+without holding them in memory (only the node coordinates are kept).
+"""
+import argparse
+import math
+import random
+
+KINDS = ("grid", "geometric", "scalefree", "road")
+
+
+def _round(value):
+    """Rounds a coordinate to the 3 decimals written to the file."""
+    return round(value, 3)
+
+
+def _cost(coords, a, b, factor):
+    """Edge cost: straight-line distance times factor, rounded up to the 6 decimals written."""
+    (ax, ay), (bx, by) = coords[a], coords[b]
+    return math.ceil(math.hypot(ax - bx, ay - by) * factor * 1e6 + 1) / 1e6
+
+
+def grid(edges, rng):
+    """4-neighbour square grid with about `edges` directed edges and costs in [1, 2) per unit."""
+    side = max(2, round(math.sqrt(edges / 4)))
+    coords = [(float(i % side), float(i // side)) for i in range(side * side)]
+
+    def edge_list():
+        for i in range(side * side):
+            row, col = divmod(i, side)
+            for j in ((i + 1) if col + 1 < side else None, (i + side) if row + 1 < side else None):
+                if j is not None:
+                    cost = _cost(coords, i, j, rng.uniform(1.0, 2.0))
+                    yield i, j, cost
+                    yield j, i, cost
+
+    return coords, edge_list()
+
+
+def geometric(edges, rng):
+    """Random geometric graph with about `edges` directed edges (8 neighbours per node on average)."""
+    degree = 8
+    n = max(2, edges // degree)
+    coords = [(_round(rng.uniform(0, 1000)), _round(rng.uniform(0, 1000))) for _ in range(n)]
+    # Radius whose disc holds `degree` points on average at this density
+    radius = math.sqrt(degree * 1000 * 1000 / (math.pi * n))
+
+    # Bucket points into radius-sized cells, so neighbours are found in the 3x3 cells around
+    cells = {}
+    for i, (x, y) in enumerate(coords):
+        cells.setdefault((int(x // radius), int(y // radius)), []).append(i)
+
+    def edge_list():
+        for i, (x, y) in enumerate(coords):
+            cx, cy = int(x // radius), int(y // radius)
+            for dx in (-1, 0, 1):
+                for dy in (-1, 0, 1):
+                    for j in cells.get((cx + dx, cy + dy), ()):
+                        if j != i and math.hypot(x - coords[j][0], y - coords[j][1]) <= radius:
+                            yield i, j, _cost(coords, i, j, rng.uniform(1.0, 1.5))
+
+    return coords, edge_list()
+
+
+def scalefree(edges, rng):
+    """Barabasi-Albert graph with about `edges` directed edges (3 undirected links per node)."""
+    links = 3
+    n = max(links + 1, edges // (2 * links))
+    coords = [(_round(rng.uniform(0, 1000)), _round(rng.uniform(0, 1000))) for _ in range(n)]
+
+    def edge_list():
+        # Every link end is appended to `ends`, so sampling from it picks nodes in
+        # proportion to their degree
+        ends = list(range(links))
+        for i in range(links, n):
+            targets = set()
+            while len(targets) < links:
+                targets.add(rng.choice(ends))
+            for j in targets:
+                cost = _cost(coords, i, j, rng.uniform(1.0, 1.5))
+                yield i, j, cost
+                yield j, i, cost
+                ends.append(j)
+            ends.extend([i] * links)
+
+    return coords, edge_list()
+
+
+def road(edges, rng):
+    """
+    Road-like network with about `edges` directed edges: a jittered grid where 10% of local
+    roads are missing, local roads are slow (1.2-2x distance) and every 10th row and column
+    is a highway costing exactly its length.
+    """
+    side = max(2, round(math.sqrt(edges / 3.6)))
+    coords = [(_round(i % side + rng.uniform(-0.3, 0.3)), _round(i // side + rng.uniform(-0.3, 0.3)))
+              for i in range(side * side)]
+
+    def edge_list():
+        for i in range(side * side):
+            row, col = divmod(i, side)
+            for j, highway in (((i + 1) if col + 1 < side else None, row % 10 == 0),
+                               ((i + side) if row + 1 < side else None, col % 10 == 0)):
+                if j is None or (not highway and rng.random() < 0.1):
+                    continue
+                cost = _cost(coords, i, j, 1.0 if highway else rng.uniform(1.2, 2.0))
+                yield i, j, cost
+                yield j, i, cost
+
+    return coords, edge_list()
+
+
+GENERATORS = {"grid": grid, "geometric": geometric, "scalefree": scalefree, "road": road}
+
+
+def generate(filename, kind, edges, seed=0, destinations=1):
+    """
+    Writes a synthetic graph file.
+
+    The origin is a random node and the destinations random other nodes.
+
+    Args:
+        filename (str): Output path
+        kind (str): One of KINDS
+        edges (int): Approximate number of directed edges
+        seed (int): Random seed; the same arguments always give the same file
+        destinations (int): Number of destination nodes
+
+    Returns:
+        dict: Summary with the kind, seed, node and edge counts, origin and destinations
+    """
+    rng = random.Random(seed)
+    coords, edge_list = GENERATORS[kind](edges, rng)
+    n = len(coords)
+    edge_count = 0
+    with open(filename, 'w') as f:
+        f.write("Nodes:\n")
+        f.writelines(f"{i + 1}: ({x:.3f},{y:.3f})\n" for i, (x, y) in enumerate(coords))
+        f.write("Edges:\n")
+        for a, b, cost in edge_list:
+            f.write(f"({a + 1},{b + 1}): {cost:.6f}\n")
+            edge_count += 1
+        picks = rng.sample(range(1, n + 1), min(n, destinations + 1))
+        origin, goals = str(picks[0]), [str(p) for p in picks[1:]]
+        f.write(f"Origin:\n{origin}\nDestinations:\n{'; '.join(goals)}\n")
+    return {"kind": kind, "seed": seed, "nodes": n, "edges": edge_count, "origin": origin, "destinations": goals}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic graph file")
+    parser.add_argument("kind", choices=KINDS)
+    parser.add_argument("--edges", type=int, required=True, help="approximate number of directed edges")
+    parser.add_argument("-o", "--output", required=True)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--destinations", type=int, default=1)
+    args = parser.parse_args()
+
+    summary = generate(args.output, args.kind, args.edges, args.seed, args.destinations)
+    print(f"Wrote {summary['nodes']} nodes and {summary['edges']} edges to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
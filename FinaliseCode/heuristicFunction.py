@@ -1,4 +1,130 @@
-import math
-
-def heuristic(coord1, coord2):
-    return math.hypot(coord1[0] - coord2[0], coord1[1] - coord2[1])
\ No newline at end of file
+import math
+from collections import OrderedDict
+from compact_graph import Coordinates
+from spatial_index import KDTree
+
+def heuristic(coord1, coord2):
+    return math.hypot(coord1[0] - coord2[0], coord1[1] - coord2[1])
+
+
+class GoalDistance:
+    """
+    Heuristic table: straight-line distance from a node to the closest destination.
+
+    Each node's value is computed once, on first use, and then reused for every later
+    push of that node, instead of taking min() over all destinations on each push.
+    Instances are callable, so they can be passed as a search's heuristic_fn.
+
+    Args:
+        node (dict or Coordinates): Node coordinates, keyed the same way as the graph
+        destinations (list): Goal nodes, keyed the same way as the graph
+    """
+
+    def __init__(self, node, destinations):
+        self.node = node
+        self.goals = [node[goal] for goal in destinations]
+        self.table = {}  # Node -> cached distance to the closest goal
+
+    def __call__(self, n):
+        h = self.table.get(n)
+        if h is None:
+            x, y = self.node[n]
+            h = self.table[n] = self.nearest(x, y)
+        return h
+
+    def nearest(self, x, y):
+        """Distance from (x, y) to the closest goal, by scanning every goal."""
+        return min(math.hypot(x - gx, y - gy) for gx, gy in self.goals)
+
+    def precompute(self):
+        """
+        Fills the table for every node at once with NumPy, one vectorised pass per goal.
+
+        Worth it when most of the graph will be touched, or when the table is kept in a
+        HeuristicCache for many queries.
+
+        Returns:
+            GoalDistance: self, for chaining
+        """
+        import numpy as np
+
+        if isinstance(self.node, Coordinates):
+            keys = range(len(self.node))
+            coords = np.frombuffer(self.node.xy, dtype=np.float64).reshape(-1, 2)
+        else:
+            keys = list(self.node)
+            coords = np.array([self.node[k] for k in keys], dtype=np.float64).reshape(-1, 2)
+
+        best = np.full(len(coords), np.inf)
+        for gx, gy in self.goals:
+            np.minimum(best, np.hypot(coords[:, 0] - gx, coords[:, 1] - gy), out=best)
+        self.table.update(zip(keys, best.tolist()))
+        return self
+
+
+class IndexedGoalDistance(GoalDistance):
+    """
+    GoalDistance that finds the closest goal through a k-d tree over the goal coordinates,
+    so each new node costs O(log destinations) instead of a scan over every destination.
+
+    Returns exactly the same values as GoalDistance; use it when there are many destinations.
+    """
+
+    def __init__(self, node, destinations):
+        super().__init__(node, destinations)
+        self.tree = KDTree(self.goals)
+
+    def nearest(self, x, y):
+        return self.tree.nearest_distance(x, y)
+
+    def precompute(self):
+        """Fills the table for every node with one tree query each."""
+        nodes = range(len(self.node)) if isinstance(self.node, Coordinates) else self.node
+        for n in nodes:
+            self(n)
+        return self
+
+
+class HeuristicCache:
+    """
+    Keeps GoalDistance tables for recently used destination sets of one graph, so
+    repeated queries with the same destinations reuse the distances already computed.
+
+    Args:
+        node (dict or Coordinates): Node coordinates of the graph being queried
+        maxsize (int): Number of destination sets to keep (least recently used are dropped)
+        eager (bool): Precompute new tables for all nodes instead of lazily
+        index_threshold (int): Destination count from which tables look up the closest goal
+            in a k-d tree (IndexedGoalDistance) instead of scanning all goals; None disables it
+        landmarks (Landmarks): Build ALT landmark tables (landmarks.LandmarkDistance) instead
+            of straight-line ones
+    """
+
+    def __init__(self, node, maxsize=32, eager=False, index_threshold=64, landmarks=None):
+        self.node = node
+        self.landmarks = landmarks
+        self.maxsize = maxsize
+        self.eager = eager
+        self.index_threshold = index_threshold
+        self.tables = OrderedDict()  # frozenset(destinations) -> GoalDistance
+
+    def get(self, destinations):
+        """Returns the heuristic table for a destination set, creating it if needed."""
+        key = frozenset(destinations)
+        table = self.tables.get(key)
+        if table is not None:
+            self.tables.move_to_end(key)
+            return table
+
+        if self.landmarks is not None:
+            table = self.landmarks.heuristic(key)
+        elif self.index_threshold is not None and len(key) >= self.index_threshold:
+            table = IndexedGoalDistance(self.node, key)
+        else:
+            table = GoalDistance(self.node, key)
+        if self.eager:
+            table.precompute()
+        self.tables[key] = table
+        if len(self.tables) > self.maxsize:
+            self.tables.popitem(last=False)
+        return table
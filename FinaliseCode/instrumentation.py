@@ -0,0 +1,102 @@
+from frontier import CountingFrontier
+
+
+class SearchProbe:
+    """
+    Optional instrumentation for one run of a search function.
+
+    Pass a probe as a search's `probe` argument. The search then reads its graph through a
+    ProbedGraph, calls its heuristic through a counting wrapper and uses a CountingFrontier,
+    so the counters below are updated without any instrumentation code in the search loops:
+    a search run without a probe executes exactly the uninstrumented code.
+
+    Args:
+        on_expand (callable): Optional callback, called with each node whose neighbours
+            the search reads (every expansion except the one that reaches the goal)
+
+    Attributes:
+        expansions (int): Nodes whose neighbours were read
+        relaxations (int): Edges examined while expanding them
+        heuristic_calls (int): Calls to the heuristic (heuristic searches only)
+        counter (CountingFrontier): Frontier pushes, pops and peak size
+    """
+
+    def __init__(self, on_expand=None):
+        self.on_expand = on_expand
+        self.expansions = 0
+        self.relaxations = 0
+        self.heuristic_calls = 0
+        self.counter = None
+
+    def graph(self, graph):
+        """Wraps a graph so reading a node's neighbours counts an expansion and its edges."""
+        return ProbedGraph(self, graph)
+
+    def frontier(self, frontier_class):
+        """Returns a frontier factory that counts operations on frontier_class instances."""
+        self.counter = CountingFrontier(frontier_class)
+        return self.counter
+
+    def heuristic(self, h):
+        """Wraps a heuristic to count its calls."""
+        def counted(n):
+            self.heuristic_calls += 1
+            return h(n)
+        return counted
+
+    def to_dict(self, nodes_expanded):
+        """
+        Summarises the counters of a finished search.
+
+        Args:
+            nodes_expanded (int): Node count returned by the search, used to tell live pops
+                from stale ones (entries for nodes that had already been expanded)
+
+        Returns:
+            dict: pushes, pops, stale_pops, expansions, relaxations, heuristic_calls and
+            peak_frontier
+        """
+        counter = self.counter
+        pops = counter.pops if counter else 0
+        return {
+            "pushes": counter.pushes if counter else 0,
+            "pops": pops,
+            "stale_pops": max(0, pops - nodes_expanded),
+            "expansions": self.expansions,
+            "relaxations": self.relaxations,
+            "heuristic_calls": self.heuristic_calls,
+            "peak_frontier": counter.peak if counter else 0,
+        }
+
+
+class ProbedGraph:
+    """
+    Read-only view of a graph (dict or CompactGraph) that reports neighbour reads to a
+    SearchProbe. Supports the accesses the searches make: get, [], in and len.
+    """
+
+    def __init__(self, probe, graph):
+        self.probe = probe
+        self.graph = graph
+
+    def __contains__(self, node):
+        return node in self.graph
+
+    def __len__(self):
+        return len(self.graph)
+
+    def __getitem__(self, node):
+        return self._expand(node, self.graph[node])
+
+    def get(self, node, default=None):
+        edges = self.graph.get(node)
+        return default if edges is None else self._expand(node, edges)
+
+    def _expand(self, node, edges):
+        probe = self.probe
+        probe.expansions += 1
+        if probe.on_expand is not None:
+            probe.on_expand(node)
+        edges = list(edges)
+        probe.relaxations += len(edges)
+        return edges
@@ -0,0 +1,142 @@
+import math
+import random
+from array import array
+from bidirectional import reverse_graph
+from compact_graph import CompactGraph, FLOAT_TYPE
+from ucs import shortest_distances
+
+
+class Landmarks:
+    """
+    Landmark distance tables for ALT (A*, Landmarks, Triangle inequality) heuristics.
+
+    For every landmark L the tables hold d(L, v) and d(v, L) for every node v, one float
+    array per landmark and direction (inf where v is unreachable). By the triangle
+    inequality, d(v, t) >= d(L, t) - d(L, v) and d(v, t) >= d(v, L) - d(t, L), which gives
+    a lower bound on the remaining cost that follows the edge costs rather than the
+    straight-line geometry.
+
+    Attributes:
+        landmarks (list): Landmark nodes, keyed like the graph
+        position (dict): Node -> array position (None for a CompactGraph, whose dense
+            indices are the positions)
+        from_landmark (list): One array per landmark of d(L, v) by position
+        to_landmark (list): One array per landmark of d(v, L) by position
+    """
+
+    def __init__(self, landmarks, position, from_landmark, to_landmark):
+        self.landmarks = landmarks
+        self.position = position
+        self.from_landmark = from_landmark
+        self.to_landmark = to_landmark
+
+    @classmethod
+    def build(cls, graph, count=8, seed=0):
+        """
+        Picks landmarks and computes their distance tables.
+
+        Landmarks are chosen by farthest selection: the first is a random node, and each
+        next one is the node farthest from all landmarks chosen so far (preferring nodes
+        none of them can reach), which spreads them around the edge of the graph where
+        the bounds are tightest. Each landmark costs two full Dijkstra runs.
+
+        Args:
+            graph (dict or CompactGraph): Adjacency list representation {node: [(neighbor, cost)]}
+            count (int): Number of landmarks (fewer if the graph has fewer nodes)
+            seed (int): Seed for choosing the first landmark
+
+        Returns:
+            Landmarks: Tables keyed like the graph (dense indices for a CompactGraph)
+        """
+        reverse = reverse_graph(graph)
+        if isinstance(graph, CompactGraph):
+            nodes = range(len(graph))
+            position = None
+        else:
+            nodes = list(reverse)  # Includes nodes that only appear as edge targets
+            position = {v: i for i, v in enumerate(nodes)}
+
+        def table(dist):
+            # Spread a {node: distance} dict over a float array indexed by position
+            values = array(FLOAT_TYPE, [math.inf]) * len(nodes)
+            for v, d in dist.items():
+                values[v if position is None else position[v]] = d
+            return values
+
+        landmarks = []
+        from_landmark = []
+        to_landmark = []
+        closest = [math.inf] * len(nodes)  # Distance from the nearest chosen landmark
+        candidate = random.Random(seed).choice(nodes) if nodes else None
+
+        while candidate is not None and len(landmarks) < count:
+            landmarks.append(candidate)
+            from_landmark.append(table(shortest_distances(graph, candidate)))
+            to_landmark.append(table(shortest_distances(reverse, candidate)))
+
+            for i, d in enumerate(from_landmark[-1]):
+                if d < closest[i]:
+                    closest[i] = d
+            farthest = max(range(len(nodes)), key=closest.__getitem__)
+            candidate = nodes[farthest] if closest[farthest] > 0 else None
+
+        return cls(landmarks, position, from_landmark, to_landmark)
+
+    def heuristic(self, destinations):
+        """Returns the ALT heuristic table for a destination set (see LandmarkDistance)."""
+        return LandmarkDistance(self, destinations)
+
+
+class LandmarkDistance:
+    """
+    ALT heuristic table: lower bound on the cost from a node to the closest destination.
+
+    Drop-in replacement for heuristicFunction.GoalDistance as a search's heuristic_fn.
+    The bound for each destination is the largest triangle inequality bound over all
+    landmarks, and the heuristic is the smallest bound over all destinations; both steps
+    keep it consistent, so astar still returns optimal paths. Values are computed once
+    per node on first use.
+
+    Args:
+        landmarks (Landmarks): Landmark tables for the graph being searched
+        destinations (list): Goal nodes, keyed the same way as the graph
+    """
+
+    def __init__(self, landmarks, destinations):
+        self.landmarks = landmarks
+        position = landmarks.position
+        # (d(L, t), d(t, L)) for every landmark L, per destination t in the graph
+        self.goals = []
+        for goal in destinations:
+            p = goal if position is None else position.get(goal)
+            if p is not None:
+                self.goals.append([(f[p], t[p]) for f, t in zip(landmarks.from_landmark, landmarks.to_landmark)])
+        self.table = {}  # Node -> cached lower bound
+
+    def __call__(self, n):
+        h = self.table.get(n)
+        if h is None:
+            landmarks = self.landmarks
+            p = n if landmarks.position is None else landmarks.position[n]
+            to_n = [f[p] for f in landmarks.from_landmark]   # d(L, n) per landmark
+            n_to = [t[p] for t in landmarks.to_landmark]     # d(n, L) per landmark
+            h = math.inf
+            for goal in self.goals:
+                bound = 0.0
+                for (landmark_to_goal, goal_to_landmark), landmark_to_n, n_to_landmark in zip(goal, to_n, n_to):
+                    # Unreachable pairs give inf - inf = nan, which never compares greater
+                    if landmark_to_goal - landmark_to_n > bound:
+                        bound = landmark_to_goal - landmark_to_n
+                    if n_to_landmark - goal_to_landmark > bound:
+                        bound = n_to_landmark - goal_to_landmark
+                if bound < h:
+                    h = bound
+            self.table[n] = h
+        return h
+
+    def precompute(self):
+        """Fills the table for every node of the graph."""
+        position = self.landmarks.position
+        for n in (range(len(self.landmarks.from_landmark[0])) if position is None else position):
+            self(n)
+        return self
@@ -0,0 +1,177 @@
+"""
+Limits on a single search: a wall-clock deadline, a maximum number of node expansions
+and a cooperative cancellation token.
+
+Every search in this folder takes an optional SearchLimits. Searches count expansions
+anyway, so the only cost in their loop is comparing that count with the next count at
+which to poll the limits:
+
+    check_at = first_check(limits)
+    while queue:
+        ...
+        nodes_created += 1
+        if nodes_created >= check_at:
+            check_at = limits.poll(nodes_created)  # Raises SearchExhausted
+
+poll() reads the clock and the token only every CHECK_INTERVAL expansions, and stops
+exactly at max_expansions. A search stopped by its limits raises SearchExhausted instead
+of returning a result, so it is never mistaken for one that proved there is no path;
+search.run_search turns it into an Exhausted result.
+"""
+import signal
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# Expansions between two readings of the clock and the cancellation token: a few hundred
+# microseconds of searching, against about a microsecond for the reading
+CHECK_INTERVAL = 128
+
+# Poll point of a search without limits: never reached
+NEVER = sys.maxsize
+
+# Reasons a search is stopped for
+DEADLINE = "deadline"
+EXPANSIONS = "expansions"
+CANCELLED = "cancelled"
+
+
+class SearchExhausted(Exception):
+    """
+    Raised by a search that hit one of its limits before finding a destination or proving
+    that none can be reached.
+
+    Attributes:
+        reason (str): DEADLINE, EXPANSIONS or CANCELLED
+        nodes_expanded (int): Nodes the search expanded before it stopped
+    """
+
+    def __init__(self, reason, nodes_expanded):
+        super().__init__(f"search stopped by its {reason} limit after {nodes_expanded} expansions"
+                         if reason != CANCELLED else f"search cancelled after {nodes_expanded} expansions")
+        self.reason = reason
+        self.nodes_expanded = nodes_expanded
+
+    @property
+    def result(self):
+        """The Exhausted result standing for this search."""
+        return Exhausted(self.reason, self.nodes_expanded)
+
+
+class Exhausted(tuple):
+    """
+    Result of a search stopped by its limits: (None, [], nodes_expanded) like a search
+    that found no path, so code unpacking results keeps working, but told apart from one
+    by its type and its reason.
+    """
+
+    def __new__(cls, reason, nodes_expanded):
+        result = super().__new__(cls, (None, [], nodes_expanded))
+        result.reason = reason
+        return result
+
+    def __reduce__(self):
+        # Rebuilt from its reason and count when a worker process sends it back
+        return Exhausted, (self.reason, self[2])
+
+    def __repr__(self):
+        return f"Exhausted({self.reason!r}, {self[2]})"
+
+
+class CancelToken:
+    """
+    Cooperative cancellation: cancel() from any thread (or a signal handler) stops every
+    search polling this token at its next poll.
+
+    Anything with an is_set() method can stand in for a token, such as a
+    multiprocessing.Event shared with worker processes.
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        """Asks the searches polling this token to stop."""
+        self._event.set()
+
+    def is_set(self):
+        """Returns whether cancel() was called."""
+        return self._event.is_set()
+
+    cancelled = property(is_set)
+
+
+@contextmanager
+def cancel_on_interrupt(cancel):
+    """
+    While active, Ctrl-C cancels the token instead of raising KeyboardInterrupt.
+
+    Meant to wrap searches that poll the token only: code that does not (reading input,
+    preprocessing) keeps Ctrl-C's default behaviour outside. Does nothing without a token
+    or off the main thread, where signal handlers cannot be installed.
+    """
+    if cancel is None or threading.current_thread() is not threading.main_thread():
+        yield
+        return
+    interrupt = signal.signal(signal.SIGINT, lambda signum, frame: cancel.cancel())
+    try:
+        yield
+    finally:
+        signal.signal(signal.SIGINT, interrupt)
+
+
+class SearchLimits:
+    """
+    Limits of one search; any of them may be left out.
+
+    Args:
+        deadline (float): time.monotonic() value after which the search stops
+        max_expansions (int): Most nodes the search may expand
+        cancel (CancelToken): Token that stops the search once cancelled
+    """
+
+    __slots__ = ("deadline", "max_expansions", "cancel")
+
+    def __init__(self, deadline=None, max_expansions=None, cancel=None):
+        self.deadline = deadline
+        self.max_expansions = max_expansions
+        self.cancel = cancel
+
+    @classmethod
+    def within(cls, seconds=None, max_expansions=None, cancel=None):
+        """Returns limits whose deadline is the given number of seconds from now."""
+        return cls(None if seconds is None else time.monotonic() + seconds, max_expansions, cancel)
+
+    def until(self, deadline):
+        """Returns these limits with their deadline moved to deadline, if that is earlier."""
+        if self.deadline is not None and self.deadline <= deadline:
+            return self
+        return SearchLimits(deadline, self.max_expansions, self.cancel)
+
+    def poll(self, count):
+        """
+        Checks the limits before the search's count-th expansion.
+
+        Returns:
+            int: The expansion count at which to poll next
+
+        Raises:
+            SearchExhausted: If a limit is reached; the current node is not expanded
+        """
+        max_expansions = self.max_expansions
+        if max_expansions is not None and count > max_expansions:
+            raise SearchExhausted(EXPANSIONS, max_expansions)
+        if self.cancel is not None and self.cancel.is_set():
+            raise SearchExhausted(CANCELLED, count - 1)
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            raise SearchExhausted(DEADLINE, count - 1)
+        next_check = count + CHECK_INTERVAL
+        if max_expansions is not None and next_check > max_expansions + 1:
+            next_check = max_expansions + 1
+        return next_check
+
+
+def first_check(limits):
+    """Returns the expansion count at which a search first polls its limits (NEVER without any)."""
+    return NEVER if limits is None else 1
@@ -0,0 +1,408 @@
+"""
+Memory-bounded optimal searches: IDA* and SMA*.
+
+astar keeps every node it has reached (frontier entries, costs and parent pointers), so
+its memory grows with the part of the graph it explores. These searches find the same
+lowest path cost with the same straight-line heuristic while holding much less:
+
+- ida_star repeats depth-first searches bounded by f = g + h, raising the bound after each
+  one so that the next expands about twice as many nodes (as in IDA*_CR). Since the
+  bound can then overshoot the lowest path cost, the iteration that first reaches a
+  destination keeps going as a branch and bound search for cheaper paths. It stores only
+  the current path, so memory is linear in the path's depth, at the price of
+  re-expanding nodes in every iteration and of following every route to a node
+  separately, which is exponential on graphs with many alternative routes such as
+  grids. A transposition table of bounded size cuts off the dearer routes.
+- sma_star is A* over the search tree that stores at most max_nodes nodes. When memory
+  is full it drops the leaf with the highest f (the shallowest of those), remembering
+  the dropped f in its parent, which regenerates the leaf if it becomes promising again.
+
+Both compute the heuristic afresh for every node instead of caching it in a table that
+would grow with the search.
+"""
+import heapq
+import itertools
+import math
+from compact_graph import CompactGraph
+from heuristicFunction import GoalDistance, IndexedGoalDistance
+from limits import first_check
+
+INF = math.inf
+
+# Default node budget of sma_star
+MAX_NODES = 100000
+
+# Histogram buckets of the f values beyond an ida_star bound
+BUCKETS = 100
+
+
+def _goal_distance(node, destinations):
+    """Straight-line distance to the closest destination, computed on every call."""
+    table = (IndexedGoalDistance if len(destinations) >= 64 else GoalDistance)(node, destinations)
+    return lambda n: table.nearest(*node[n])
+
+
+def ida_star(node, graph, origin, destinations, heuristic_fn=None, table_size=0, limits=None):
+    """
+    Iterative Deepening A*: lowest cost path with memory linear in the path depth.
+
+    Args:
+        node (dict): Dictionary of node coordinates {node_id: (x, y)} (ignored for a CompactGraph,
+            which carries its own coordinates)
+        graph (dict or CompactGraph): Adjacency list representation of the graph {node_id: [(neighbor_id, cost)]}
+        origin (str): Starting node ID
+        destinations (list): List of goal node IDs
+        heuristic_fn (callable): Optional admissible heuristic mapping a node to its estimated
+            distance to the closest destination; defaults to the straight-line distance
+        table_size (int): Nodes to remember per iteration in a transposition table, with
+            the lowest cost they were expanded at, so that dearer routes to them are cut
+            off. This bounds the memory at path depth plus table_size, and is what keeps
+            the search practical on graphs with many alternative routes; 0 keeps memory
+            linear in the path depth
+        limits (SearchLimits): Optional deadline, expansion budget and cancellation token
+
+    Returns:
+        tuple: (reached_destination, path, nodes_expanded), where nodes_expanded counts
+        every expansion of every iteration
+
+    Raises:
+        SearchExhausted: If the limits stop the search before it proves a path optimal
+    """
+    if isinstance(graph, CompactGraph):
+        source, goals = graph.to_indices(origin, destinations)
+        return graph.to_result(*_ida_star(graph.coords, graph, source, goals, heuristic_fn, table_size, limits))
+    return _ida_star(node, graph, origin, destinations, heuristic_fn, table_size, limits)
+
+
+def _ida_star(node, graph, origin, destinations, heuristic_fn, table_size, limits):
+    if not destinations:
+        return None, [], 0
+    h = _goal_distance(node, destinations) if heuristic_fn is None else heuristic_fn
+    goals = set(destinations)
+    count = 1
+    if origin in goals:
+        return origin, [origin], count
+    check_at = first_check(limits)  # Expansion count at which the limits are polled next
+    bound = h(origin)
+    best_cost, best_path = INF, None
+
+    while True:
+        # Depth-first search of the nodes with f <= bound. The current path, its costs and
+        # an iterator over each path node's remaining edges are all the state there is,
+        # besides a fixed histogram of the f values beyond the bound
+        path, costs, edges = [origin], [0], [iter(graph.get(origin, ()))]
+        on_path = {origin}
+        seen = {origin: 0}  # Transposition table: node -> lowest cost expanded at
+        pruned = [0] * BUCKETS
+        width = max(bound, 1e-9) / BUCKETS  # Buckets of 1% of the bound above it
+        lowest_pruned, highest_pruned = INF, bound
+        expanded = 0
+        while edges:
+            step = next(edges[-1], None)
+            if step is None:
+                edges.pop()
+                costs.pop()
+                on_path.discard(path.pop())
+                continue
+            neighbor, cost = step
+            if neighbor in on_path:
+                continue  # A cycle never lies on a lowest cost path
+            g = costs[-1] + cost
+            if g >= best_cost:
+                continue  # Cannot improve on the path already found
+            f = g + h(neighbor)
+            if f > bound:
+                lowest_pruned = min(lowest_pruned, f)
+                highest_pruned = max(highest_pruned, f)
+                pruned[min(int((f - bound) / width), BUCKETS - 1)] += 1
+                continue
+            if table_size:
+                seen_g = seen.get(neighbor, INF)
+                if seen_g <= g:
+                    continue  # Searched from there already this iteration, at no higher cost
+                if seen_g < INF or len(seen) < table_size:
+                    seen[neighbor] = g
+            count += 1
+            if count >= check_at:
+                check_at = limits.poll(count)  # Raises SearchExhausted once a limit is reached
+            expanded += 1
+            if neighbor in goals:
+                # The bound may be above the lowest path cost: keep searching this
+                # iteration for cheaper paths (depth-first branch and bound)
+                best_cost, best_path = g, path + [neighbor]
+                continue
+            path.append(neighbor)
+            costs.append(g)
+            on_path.add(neighbor)
+            edges.append(iter(graph.get(neighbor, ())))
+
+        if best_path is not None:
+            # Every path with f <= bound was searched, and the cheapest one found lies
+            # within the bound, so no cheaper path exists
+            return best_path[-1], best_path, count
+        if lowest_pruned == INF:
+            return None, [], count  # Every path was searched without reaching a destination
+
+        # Raise the bound past enough of the pruned f values for the next iteration to
+        # expand about twice as many nodes, rather than to the smallest one only, which on
+        # real-valued costs adds a handful of nodes per iteration
+        next_bound, total = highest_pruned, 0
+        for i, bucket in enumerate(pruned):
+            total += bucket
+            if total > expanded:
+                next_bound = bound + (i + 1) * width
+                break
+        bound = max(lowest_pruned, min(next_bound, highest_pruned))
+
+
+class _Node:
+    """A node of the SMA* search tree."""
+    __slots__ = ("state", "g", "depth", "parent", "children", "own_f", "f", "degree", "cursor",
+                 "forgotten", "pass_bound", "open", "alive", "stamp")
+
+    def __init__(self, state, g, depth, parent, own_f, degree):
+        self.state = state
+        self.g = g
+        self.depth = depth
+        self.parent = parent
+        self.children = []
+        self.own_f = own_f        # max(parent's f, g + h) when generated
+        self.f = own_f            # Backed-up lower bound on solutions through this node
+        self.degree = degree
+        self.cursor = 0           # Next edge to generate a child from
+        self.forgotten = INF      # Lowest f of the dropped children
+        self.pass_bound = -INF    # Lower bound on the children not generated in this pass
+        self.open = True          # Can still generate a child (or is a destination)
+        self.alive = True         # In memory
+        self.stamp = 0            # Sequence number of its current heap entries
+
+
+def sma_star(node, graph, origin, destinations, heuristic_fn=None, max_nodes=MAX_NODES, limits=None):
+    """
+    Simplified Memory-bounded A*: lowest cost path storing at most max_nodes search nodes.
+
+    With an admissible heuristic the path found is a lowest cost path among those of at
+    most max_nodes nodes; with a budget at least as large as the number of nodes A*
+    reaches, it expands nodes like A* and never has to drop one.
+
+    Args:
+        node (dict): Dictionary of node coordinates {node_id: (x, y)} (ignored for a CompactGraph,
+            which carries its own coordinates)
+        graph (dict or CompactGraph): Adjacency list representation of the graph {node_id: [(neighbor_id, cost)]}
+        origin (str): Starting node ID
+        destinations (list): List of goal node IDs
+        heuristic_fn (callable): Optional admissible heuristic mapping a node to its estimated
+            distance to the closest destination; defaults to the straight-line distance
+        max_nodes (int): Most search tree nodes kept in memory at once
+        limits (SearchLimits): Optional deadline, expansion budget and cancellation token
+
+    Returns:
+        tuple: (reached_destination, path, nodes_expanded), where nodes_expanded counts
+        the times a node started generating its children (again after some were
+        dropped); no destination is returned when no path of at most max_nodes nodes
+        reaches one
+
+    Raises:
+        ValueError: If max_nodes is below 2
+        SearchExhausted: If the limits stop the search before it finds a destination
+    """
+    if max_nodes < 2:
+        raise ValueError(f"max_nodes must be at least 2, not {max_nodes}")
+    if isinstance(graph, CompactGraph):
+        source, goals = graph.to_indices(origin, destinations)
+        return graph.to_result(*_SMAStar(graph.coords, graph, goals, heuristic_fn, max_nodes).run(source, limits))
+    return _SMAStar(node, graph, destinations, heuristic_fn, max_nodes).run(origin, limits)
+
+
+class _SMAStar:
+    """
+    State of one SMA* search.
+
+    Every node in memory is in `memory`, keyed by its graph node, so a graph node is
+    held at most once: a new path to it is dropped if it is no cheaper than the one in
+    memory, and replaces that one (with its whole subtree) otherwise. Nodes that can
+    still generate children are kept in a heap by (f, -depth) and leaves in a heap by
+    (-f, depth), both with lazy deletion of stale entries.
+    """
+
+    def __init__(self, node, graph, destinations, heuristic_fn, max_nodes):
+        self.graph = graph
+        self.goals = set(destinations)
+        self.h = _goal_distance(node, destinations) if heuristic_fn is None and destinations else heuristic_fn
+        self.max_nodes = max_nodes
+        self.memory = {}
+        self.open_heap = []
+        self.leaf_heap = []
+        self.stamps = itertools.count(1)
+
+    # Successors of a graph node by position in its edge row
+
+    def _degree(self, state):
+        graph = self.graph
+        if isinstance(graph, CompactGraph):
+            return graph.offsets[state + 1] - graph.offsets[state]
+        return len(graph.get(state) or ())
+
+    def _edge(self, state, k):
+        graph = self.graph
+        if isinstance(graph, CompactGraph):
+            i = graph.offsets[state] + k
+            return graph.targets[i], graph.weights[i]
+        return graph[state][k]
+
+    def run(self, origin, limits):
+        if not self.goals:
+            return None, [], 0
+        self._add(origin, 0, 0, None, self.h(origin))
+        count = 0
+        check_at = first_check(limits)  # Expansion count at which the limits are polled next
+        while True:
+            best = self._best()
+            if best is None or best.f == INF:
+                break  # Nothing left, or only paths that do not fit in memory
+            if best.cursor == 0 or best.cursor == best.degree or best.state in self.goals:
+                count += 1  # Starts a pass over its edges
+                if count >= check_at:
+                    check_at = limits.poll(count)  # Raises SearchExhausted once a limit is reached
+            if best.state in self.goals:
+                return best.state, self._path(best), count
+
+            child = self._generate(best)
+            if child is not None:
+                self._update(child)
+            self._update(best)
+            while len(self.memory) > self.max_nodes and self._drop_worst():
+                pass
+            if len(self.open_heap) + len(self.leaf_heap) > 2 * len(self.memory) + 64:
+                self._compact_heaps()
+        return None, [], count
+
+    def _add(self, state, g, depth, parent, own_f):
+        child = _Node(state, g, depth, parent, own_f, self._degree(state))
+        self.memory[state] = child
+        if parent is not None:
+            parent.children.append(child)
+        self._push(child)
+        return child
+
+    def _push(self, n):
+        # New heap entries for a node whose f or status changed; older ones become stale
+        n.stamp = next(self.stamps)
+        if n.open:
+            heapq.heappush(self.open_heap, (n.f, -n.depth, n.stamp, n))
+        if not n.children:
+            heapq.heappush(self.leaf_heap, (-n.f, n.depth, n.stamp, n))
+
+    def _best(self):
+        # Lowest f node that can generate a child, the deepest of those
+        heap = self.open_heap
+        while heap:
+            n = heap[0][3]
+            if n.alive and n.open and n.stamp == heap[0][2]:
+                return n
+            heapq.heappop(heap)
+        return None
+
+    def _generate(self, best):
+        # Generates best's next child, if it has one that is not dominated by a node in memory
+        if best.cursor == best.degree:
+            # Every edge was tried: start again for the children dropped since, which
+            # cannot be below the lowest f they were dropped with
+            best.pass_bound, best.forgotten, best.cursor = best.forgotten, INF, 0
+        while best.cursor < best.degree:
+            state, cost = self._edge(best.state, best.cursor)
+            best.cursor += 1
+            g = best.g + cost
+            other = self.memory.get(state)
+            if other is not None:
+                if other.g <= g:
+                    continue  # Reached at least as cheaply already (this covers cycles)
+                pruned_parent = other.parent
+                self._prune(other)
+            depth = best.depth + 1
+            own_f = max(best.f, g + self.h(state))
+            if depth >= self.max_nodes - 1 and state not in self.goals:
+                own_f = INF  # Its children could not be held along with the path to them
+            child = self._add(state, g, depth, best, own_f)
+            if other is not None:
+                self._update(pruned_parent)
+            return child
+        return None
+
+    def _bound(self, n):
+        # Lowest f over the node's children in memory, dropped children and children
+        # still to be generated in this pass
+        f = n.forgotten
+        if n.cursor < n.degree:
+            f = min(f, max(n.own_f, n.pass_bound))
+        if n.state in self.goals:
+            f = min(f, n.own_f)
+        for child in n.children:
+            if child.f < f:
+                f = child.f
+        return f
+
+    def _update(self, n):
+        # Refreshes a node whose children or edge cursor changed, then backs its f up
+        # through its ancestors for as long as their f changes
+        force = True
+        while n is not None:
+            # A node with nothing left to generate and no children gets f = inf: it stays in
+            # memory as a leaf, so that later paths to its graph node are known to be
+            # dominated, until memory runs short (it is then the first leaf dropped)
+            is_open = n.cursor < n.degree or n.forgotten < INF or n.state in self.goals
+            f = self._bound(n)
+            if not force and f == n.f:
+                break
+            n.f, n.open = f, is_open
+            self._push(n)
+            n, force = n.parent, False
+
+    def _discard(self, n):
+        n.alive = False
+        del self.memory[n.state]
+        if n.parent is not None:
+            n.parent.children.remove(n)
+            n.parent = None  # Stale heap entries may still hold the node: keep it from its tree
+
+    def _prune(self, n):
+        # Removes a node and its subtree, superseded by a cheaper path to the node (the
+        # caller refreshes the parent)
+        n.parent.children.remove(n)
+        stack = [n]
+        while stack:
+            m = stack.pop()
+            m.alive = False
+            del self.memory[m.state]
+            stack.extend(m.children)
+            m.children, m.parent = [], None
+
+    def _drop_worst(self):
+        # Drops the highest f leaf (the shallowest of those), remembering its f in its parent
+        heap = self.leaf_heap
+        while heap:
+            _, _, stamp, n = heapq.heappop(heap)
+            if n.alive and not n.children and n.stamp == stamp and n.parent is not None:
+                parent = n.parent
+                parent.forgotten = min(parent.forgotten, n.f)
+                self._discard(n)
+                self._update(parent)
+                return True
+        return False
+
+    def _compact_heaps(self):
+        # Rebuilds both heaps from the nodes in memory, dropping their stale entries
+        nodes = self.memory.values()
+        self.open_heap = [(n.f, -n.depth, n.stamp, n) for n in nodes if n.open]
+        self.leaf_heap = [(-n.f, n.depth, n.stamp, n) for n in nodes if not n.children]
+        heapq.heapify(self.open_heap)
+        heapq.heapify(self.leaf_heap)
+
+    @staticmethod
+    def _path(n):
+        path = []
+        while n is not None:
+            path.append(n.state)
+            n = n.parent
+        path.reverse()
+        return path
@@ -0,0 +1,96 @@
+import multiprocessing
+import time
+from compact_graph import CompactGraph
+from heuristicFunction import HeuristicCache
+from search import answer_query, batch_hierarchy, emit_profile, print_result, report_error
+from workspace import SearchWorkspace
+
+# Graph, coordinates and heuristic tables of the current process. Workers either inherit
+# them from the parent through fork (copy-on-write, nothing is pickled) or receive them
+# once through the pool initializer.
+_state = {}
+
+
+def _init_worker(graph, node, hierarchy=None, heuristics=None, cache=None, max_nodes=None, time_limit=None,
+                 max_expansions=None):
+    """Installs the graph that this process answers queries against."""
+    _state["graph"] = graph
+    _state["node"] = node
+    _state["heuristics"] = HeuristicCache(node) if heuristics is None else heuristics
+    _state["workspace"] = SearchWorkspace(graph) if isinstance(graph, CompactGraph) else None
+    _state["hierarchy"] = hierarchy
+    _state["cache"] = cache
+    _state["max_nodes"] = max_nodes
+    _state["time_limit"] = time_limit
+    _state["max_expansions"] = max_expansions
+
+
+def _answer(item):
+    """
+    Worker task: answers one numbered query line.
+
+    Returns:
+        tuple: (line_number, line, answer, error, profile) where answer is the answer_query
+        result, error is a description of why the query failed (None on success) and
+        profile the query's profile (None unless profiling)
+    """
+    line_number, line, profiling = item
+    profile = {} if profiling else None
+    _state["hierarchy"] = batch_hierarchy(_state["graph"], _state["hierarchy"], line)
+    try:
+        answer = answer_query(_state["graph"], _state["node"], _state["heuristics"], line,
+                              _state["hierarchy"], _state["workspace"], profile, _state["cache"], _state["max_nodes"],
+                              _state["time_limit"], _state["max_expansions"])
+    except (ValueError, KeyError) as e:
+        return line_number, line, None, repr(e), None
+    return line_number, line, answer, None, profile
+
+
+def run_batch_parallel(graph, node, lines, workers=None, chunksize=64, hierarchy=None, heuristics=None,
+                       profile=False, cache=None, max_nodes=None, time_limit=None, max_expansions=None):
+    """
+    Answers a stream of queries on a pool of worker processes, printing results in query order.
+
+    Args:
+        graph, node: Graph and node coordinates as returned by parse_file
+        lines (iterable): Query lines, see search.parse_query
+        workers (int): Number of worker processes (None for one per CPU)
+        chunksize (int): Queries handed to a worker at a time
+        hierarchy (ContractionHierarchy): Optional preprocessed graph for CH queries (each
+            worker builds one on its first CH query if omitted)
+        heuristics (HeuristicCache): Heuristic tables to start from (a new straight-line
+            cache if omitted); each worker then fills its own copy
+        profile (bool): Write a JSON profile of every answered query on stderr (its search
+            counters and timings come from the worker, the output time from this process)
+        cache (QueryCache): Optional empty query cache; each worker fills its own copy, so
+            no statistics are reported
+        max_nodes (int): Node budget of SMASTAR and IDASTAR queries (see search.run_search)
+        time_limit (float): Seconds each query may take once a worker reads it (see
+            search.answer_query)
+        max_expansions (int): Most nodes each query's search may expand; workers take no
+            cancellation token, Ctrl-C interrupts the pool instead
+    """
+    if "fork" in multiprocessing.get_all_start_methods():
+        # Install the graph in this process before the pool forks, so every worker
+        # shares the parsed pages instead of receiving a pickled copy
+        _init_worker(graph, node, hierarchy, heuristics, cache, max_nodes, time_limit, max_expansions)
+        context = multiprocessing.get_context("fork")
+        initializer, initargs = None, ()
+    else:
+        # Without fork, ship the graph once per worker rather than once per task
+        context = multiprocessing.get_context()
+        initializer, initargs = _init_worker, (graph, node, hierarchy, heuristics, cache, max_nodes, time_limit,
+                                            max_expansions)
+
+    with context.Pool(workers, initializer, initargs) as pool:
+        # imap yields results in submission order even though workers finish out of order
+        items = ((line_number, line, profile) for line_number, line in enumerate(lines, 1))
+        for line_number, line, answer, error, query_profile in pool.imap(_answer, items, chunksize):
+            if error is not None:
+                report_error(line_number, line, error)
+            elif answer is not None:
+                method, result = answer
+                start = time.perf_counter()
+                print_result(method, result)
+                if profile:
+                    emit_profile(query_profile, time.perf_counter() - start)
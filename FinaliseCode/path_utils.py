@@ -0,0 +1,65 @@
+def reconstruct_path(parent, goal):
+    """
+    Rebuilds the path to goal by following parent pointers back to the origin.
+
+    Args:
+        parent (dict): Maps each reached node to the node it was reached from (None for the origin)
+        goal: Node the path ends at
+
+    Returns:
+        list: Nodes in order from origin to goal
+    """
+    path = []
+    while goal is not None:
+        path.append(goal)
+        goal = parent[goal]
+    path.reverse()  # Convert from goal->origin to origin->goal
+    return path
+
+
+def path_precedes(parent, candidate, incumbent, node):
+    """
+    Checks whether reaching node through candidate gives a smaller path than through incumbent.
+
+    The heap searches used to store whole paths in their queue entries, so equal-priority
+    entries for the same node were ordered by comparing the path lists. Searches that keep
+    parent pointers call this on such ties to pick the same parent the path list comparison
+    would have picked.
+
+    Both paths share their prefix up to the lowest common ancestor, so the comparison is
+    decided by the two nodes that follow it. Walking up from both ends in lockstep finds
+    that ancestor in time proportional to its distance, not to the full path depth.
+    """
+    if candidate == incumbent:
+        return False
+    # For every ancestor seen so far, the node that follows it on that side's path
+    after_candidate = {candidate: node}
+    after_incumbent = {incumbent: node}
+    a, b = candidate, incumbent
+    while True:
+        if a in after_incumbent:
+            return after_candidate[a] < after_incumbent[a]
+        if b in after_candidate:
+            return after_candidate[b] < after_incumbent[b]
+        # Step both walks one node towards the origin (which has no parent)
+        if parent[a] is not None:
+            after_candidate[parent[a]] = a
+            a = parent[a]
+        if parent[b] is not None:
+            after_incumbent[parent[b]] = b
+            b = parent[b]
+
+
+def link_path(link):
+    """
+    Rebuilds a path from a linked chain of (node, previous_link) cells.
+
+    Searches that may reach the same node along several live paths at once (such as DFS)
+    push one cell per entry instead of a copied path list, so each push costs O(1).
+    """
+    path = []
+    while link is not None:
+        path.append(link[0])
+        link = link[1]
+    path.reverse()
+    return path
@@ -0,0 +1,202 @@
+import sys
+from collections import OrderedDict
+from compact_graph import CompactGraph
+from limits import EXPANSIONS, Exhausted, SearchExhausted
+from path_utils import reconstruct_path
+from ucs import ucs_tree
+
+# Approximate bytes of a cached result besides its path list: key tuple, frozenset and
+# OrderedDict entry
+_ENTRY_OVERHEAD = 400
+
+
+def graph_version(graph):
+    """Edit count of a graph: DynamicGraph.version, 0 for graphs that are never edited."""
+    return getattr(graph, "version", 0)
+
+
+class ShortestPathTree:
+    """
+    Lowest cost paths from one origin to every node it reaches, as found by ucs_tree.
+
+    Answers CUS1 queries from that origin to any destination set without searching,
+    with the same goal, path and nodes_expanded as ucs_search.
+
+    Args:
+        graph (dict or CompactGraph): Graph the tree was grown on
+        origin (str): Origin node ID
+        limits (SearchLimits): Optional limits on growing the tree
+
+    Raises:
+        SearchExhausted: If the limits stop ucs_tree before the tree is complete
+    """
+
+    def __init__(self, graph, origin, limits=None):
+        self.graph = graph
+        source = graph.index[origin] if isinstance(graph, CompactGraph) else origin
+        self.cost, self.parent, self.rank = ucs_tree(graph, source, limits)
+
+    def result(self, destinations):
+        """
+        Returns the ucs_search result for a destination set.
+
+        Returns:
+            tuple: (goal_node, path, nodes_expanded)
+        """
+        graph, rank = self.graph, self.rank
+        if isinstance(graph, CompactGraph):
+            index = graph.index
+            destinations = [index[d] for d in destinations if d in index]
+        reached = [d for d in destinations if d in rank]
+        if not reached:
+            # ucs_search pops every reachable node before giving up
+            return None, [], len(rank)
+        goal = min(reached, key=rank.__getitem__)
+        result = goal, reconstruct_path(self.parent, goal), rank[goal] + 1
+        return graph.to_result(*result) if isinstance(graph, CompactGraph) else result
+
+    def nbytes(self):
+        """Approximate memory held by the tree."""
+        return sys.getsizeof(self.cost) + sys.getsizeof(self.parent) + sys.getsizeof(self.rank)
+
+
+def _within_budget(result, limits):
+    """Returns a cached result, or the Exhausted result of a search whose budget it exceeds."""
+    if limits is not None and limits.max_expansions is not None and result[2] > limits.max_expansions:
+        return Exhausted(EXPANSIONS, limits.max_expansions)
+    return result
+
+
+class QueryCache:
+    """
+    Least recently used cache of search results for one graph.
+
+    Results are keyed by (method, origin, frozenset(destinations), graph version), and
+    the cache is bounded both in entries and in (approximate) bytes. Once queries of the
+    tree methods from some origin have missed tree_after times, the whole shortest path
+    tree from that origin is grown and cached too, and answers every later such query.
+    Trees are only grown for queries without a deadline or expansion budget, since
+    growing one searches the whole graph.
+
+    Passing a different graph (such as a reloaded one) or a DynamicGraph whose version
+    changed empties the cache. Graphs edited in place any other way must be followed by
+    a call to invalidate().
+
+    Args:
+        maxsize (int): Maximum number of cached results and trees
+        max_bytes (int): Maximum approximate memory of cached results and trees
+        tree_after (int): Misses from an origin after which its tree is grown; None never
+            grows trees
+        tree_methods (tuple): Methods answered from shortest path trees. Answers for CUS1
+            are exactly those of ucs_search. ASTAR may be added: its answers are then
+            lowest cost paths too, but with CUS1's tie-breaks and expansion counts
+
+    Attributes:
+        hits, misses, evictions, tree_hits, invalidations (int): Statistics, see stats()
+    """
+
+    def __init__(self, maxsize=1024, max_bytes=64 * 2**20, tree_after=2, tree_methods=("CUS1",)):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.tree_after = tree_after
+        self.tree_methods = tree_methods
+        self.entries = OrderedDict()  # key -> (result or ShortestPathTree, nbytes)
+        self.nbytes = 0
+        self.origin_misses = OrderedDict()  # Origin -> tree method misses so far
+        self.graph = None
+        self.version = None
+        self.hits = self.misses = self.evictions = self.tree_hits = self.invalidations = 0
+
+    def invalidate(self):
+        """Drops every cached result and tree."""
+        if self.entries:
+            self.invalidations += 1
+        self.entries.clear()
+        self.origin_misses.clear()
+        self.nbytes = 0
+
+    def search(self, method, graph, origin, destinations, run, limits=None):
+        """
+        Returns the result of a query, running it only if it is not cached.
+
+        Args:
+            method (str): Upper-case method name
+            graph (dict, CompactGraph or DynamicGraph): Graph the query runs on
+            origin (str): Starting node ID
+            destinations (list): List of goal node IDs
+            run (callable): Called without arguments to run the search on a miss
+            limits (SearchLimits): The limits run searches with; a cached answer that took
+                more than their max_expansions is answered as exhausted, like the search
+
+        Returns:
+            tuple: (goal, path, nodes_created), or whatever run returns (Exhausted results
+            are returned but not cached)
+        """
+        version = graph_version(graph)
+        if graph is not self.graph or version != self.version:
+            self.invalidate()
+            self.graph, self.version = graph, version
+
+        key = (method, origin, frozenset(destinations), version)
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return _within_budget(entry[0], limits)
+
+        tree_key = ("TREE", origin, version)
+        tree_method = method in self.tree_methods
+        tree = self.entries.get(tree_key) if tree_method else None
+        if tree is not None:
+            self.entries.move_to_end(tree_key)
+            self.tree_hits += 1
+            result = tree[0].result(destinations)
+        else:
+            self.misses += 1
+            result = run()
+            # A search stopped by its limits says nothing about the query: nothing is kept
+            if result is None or isinstance(result, Exhausted):
+                return result
+            if tree_method and self.tree_after is not None and (
+                    limits is None or (limits.deadline is None and limits.max_expansions is None)):
+                self._count_origin(graph, origin, tree_key, limits)
+        if result is not None:
+            self._store(key, result, sys.getsizeof(result[1]) + _ENTRY_OVERHEAD)
+        return _within_budget(result, limits)
+
+    def _count_origin(self, graph, origin, tree_key, limits):
+        # Grows the origin's tree once it has missed often enough to be worth a full search
+        misses = self.origin_misses.pop(origin, 0) + 1
+        if misses < self.tree_after:
+            self.origin_misses[origin] = misses
+            if len(self.origin_misses) > self.maxsize:
+                self.origin_misses.popitem(last=False)
+            return
+        try:
+            tree = ShortestPathTree(graph, origin, limits)
+        except SearchExhausted:
+            return  # Cancelled: the query's own result still stands
+        self._store(tree_key, tree, tree.nbytes())
+
+    def _store(self, key, value, nbytes):
+        if nbytes > self.max_bytes:
+            return
+        self.entries[key] = (value, nbytes)
+        self.nbytes += nbytes
+        while len(self.entries) > self.maxsize or self.nbytes > self.max_bytes:
+            _, (_, dropped) = self.entries.popitem(last=False)
+            self.nbytes -= dropped
+            self.evictions += 1
+
+    def stats(self):
+        """
+        Returns:
+            dict: hits (answered from a cached result), tree_hits (answered from a cached
+            shortest path tree), misses (searched), evictions, invalidations, entries and
+            bytes (approximate memory in use)
+        """
+        return {
+            "hits": self.hits, "tree_hits": self.tree_hits, "misses": self.misses,
+            "evictions": self.evictions, "invalidations": self.invalidations,
+            "entries": len(self.entries), "bytes": self.nbytes,
+        }
@@ -1,51 +1,509 @@
-import sys
-from collections import deque
-import heapq
-import numpy as np
-from ucs import ucs_search
-from Astar import astar
-from bfs import bfs_search
-from dfs import dfs_search
-from gbfs import gbfs
-from cus2 import cus2
-
-
-
-from Parse_file import parse_file
-
-def main():
-    if len(sys.argv) != 3:
-        print("Usage: python search_program.py <filename> <method>")
-        sys.exit(1)
-
-    filename = sys.argv[1]
-    method = sys.argv[2].upper()
-
-    graph, node, origin, destinations  = parse_file(filename)
-
-    if method == "DFS":
-        goal, path, nodes_created = dfs_search(graph, origin, destinations)
-    elif method == "BFS":
-        goal, path, nodes_created = bfs_search(graph, origin, destinations)
-    elif method == "ASTAR":
-        goal, path, nodes_created = astar(node, graph, origin, destinations)  # A* needs a similar update
-    elif method == "GBFS":
-         goal, path, nodes_created = gbfs(node, graph, origin, destinations)
-    elif method == "CUS1":
-        goal, path, nodes_created = ucs_search(graph, origin, destinations)
-    elif method == "CUS2":
-        goal, path, nodes_created = cus2(node, graph, origin, destinations)
-    else:
-        print(f"Method '{method}' not implemented. Please choose 'DFS', 'BFS', 'GBFS', 'A*', 'CUS1' or 'CUS2'.")
-        sys.exit(1)
-
-    if goal:
-        print(f"{method}")
-        print(f"{goal} {nodes_created}")
-        print(" ".join(path))
-    else:
-        print(f"NoGoalFound {nodes_created}")
-        print("NoPath")
-
-if __name__ == "__main__":
-    main()
+import sys
+import argparse
+import json
+import math
+import time
+from functools import partial
+from compact_graph import CompactGraph
+from graph_cache import fresh_cache
+from limits import CancelToken, Exhausted, SearchExhausted, SearchLimits, cancel_on_interrupt
+from workspace import SearchWorkspace
+from Parse_file import parse_file
+
+# Methods guided by the distance-to-closest-destination heuristic
+HEURISTIC_METHODS = ("ASTAR", "GBFS", "CUS2", "ARASTAR")
+
+# Anytime methods: when their limits stop them after a first path was found, they return
+# the best path so far, and every result carries its suboptimality bound as a fourth element
+ANYTIME_METHODS = ("ARASTAR",)
+
+# Methods that accept a SearchProbe; profiles of the others carry timings only
+INSTRUMENTED_METHODS = ("DFS", "BFS", "ASTAR", "GBFS", "CUS1", "CUS2")
+
+METHOD_NAMES = ("'DFS', 'BFS', 'LEVELBFS', 'GBFS', 'A*', 'CUS1', 'CUS2', 'ARASTAR', 'BIUCS', 'BIASTAR', "
+                "'CH', 'IDASTAR' or 'SMASTAR'")
+
+
+# The method registry: one function per method, called by run_search with all of its
+# arguments. Each imports its algorithm's module when first called, so a query loads
+# only the code of the method it runs.
+
+def _dfs(graph, node, origin, destinations, heuristic_fn, hierarchy, workspace, probe, max_nodes, limits):
+    from dfs import dfs_search
+    return dfs_search(graph, origin, destinations, probe=probe, limits=limits)
+
+
+def _bfs(graph, node, origin, destinations, heuristic_fn, hierarchy, workspace, probe, max_nodes, limits):
+    from bfs import bfs_search
+    return bfs_search(graph, origin, destinations, workspace, probe=probe, limits=limits)
+
+
+def _levelbfs(graph, node, origin, destinations, heuristic_fn, hierarchy, workspace, probe, max_nodes, limits):
+    try:
+        from bfs_levels import level_bfs
+    except ImportError:
+        raise ValueError("LEVELBFS needs numpy, which is not installed") from None
+    return level_bfs(graph, origin, destinations, limits=limits)
+
+
+def _astar(graph, node, origin, destinations, heuristic_fn, hierarchy, workspace, probe, max_nodes, limits):
+    from Astar import astar
+    return astar(node, graph, origin, destinations, heuristic_fn, workspace, probe=probe, limits=limits)
+
+
+def _gbfs(graph, node, origin, destinations, heuristic_fn, hierarchy, workspace, probe, max_nodes, limits):
+    from gbfs import gbfs
+    return gbfs(node, graph, origin, destinations, heuristic_fn, probe=probe, limits=limits)
+
+
+def _cus1(graph, node, origin, destinations, heuristic_fn, hierarchy, workspace, probe, max_nodes, limits):
+    from ucs import ucs_search
+    return ucs_search(graph, origin, destinations, workspace, probe=probe, limits=limits)
+
+
+def _cus2(graph, node, origin, destinations, heuristic_fn, hierarchy, workspace, probe, max_nodes, limits):
+    from cus2 import cus2
+    return cus2(node, graph, origin, destinations, heuristic_fn=heuristic_fn, probe=probe, limits=limits)
+
+
+def _arastar(graph, node, origin, destinations, heuristic_fn, hierarchy, workspace, probe, max_nodes, limits):
+    from cus2 import ara_star
+    return ara_star(node, graph, origin, destinations, heuristic_fn=heuristic_fn, limits=limits)
+
+
+def _biucs(graph, node, origin, destinations, heuristic_fn, hierarchy, workspace, probe, max_nodes, limits):
+    from bidirectional import bidirectional_ucs
+    return bidirectional_ucs(graph, origin, destinations, limits=limits)
+
+
+def _biastar(graph, node, origin, destinations, heuristic_fn, hierarchy, workspace, probe, max_nodes, limits):
+    from bidirectional import bidirectional_astar
+    return bidirectional_astar(node, graph, origin, destinations, limits=limits)
+
+
+def _idastar(graph, node, origin, destinations, heuristic_fn, hierarchy, workspace, probe, max_nodes, limits):
+    from memory_bounded import ida_star
+    return ida_star(node, graph, origin, destinations, table_size=max_nodes or 0, limits=limits)
+
+
+def _smastar(graph, node, origin, destinations, heuristic_fn, hierarchy, workspace, probe, max_nodes, limits):
+    from memory_bounded import MAX_NODES, sma_star
+    return sma_star(node, graph, origin, destinations, max_nodes=max_nodes or MAX_NODES, limits=limits)
+
+
+def _ch(graph, node, origin, destinations, heuristic_fn, hierarchy, workspace, probe, max_nodes, limits):
+    from contraction import ch_search
+    return ch_search(graph, origin, destinations, hierarchy, limits)
+
+
+# Search methods by upper-case name
+METHODS = {
+    "DFS": _dfs, "BFS": _bfs, "LEVELBFS": _levelbfs, "ASTAR": _astar, "GBFS": _gbfs, "CUS1": _cus1, "CUS2": _cus2,
+    "ARASTAR": _arastar, "BIUCS": _biucs, "BIASTAR": _biastar, "CH": _ch, "IDASTAR": _idastar, "SMASTAR": _smastar,
+}
+
+
+def run_search(method, graph, node, origin, destinations, heuristic_fn=None, hierarchy=None, workspace=None,
+               probe=None, max_nodes=None, limits=None):
+    """
+    Runs one query with the named search method.
+
+    Args:
+        method (str): Upper-case method name (DFS, BFS, ASTAR, GBFS, CUS1, CUS2, the
+            bidirectional BIUCS and BIASTAR, CH, LEVELBFS: BFS expanding whole levels as
+            NumPy arrays, with the same results as BFS, best on --compact graphs, the
+            memory-bounded IDASTAR and SMASTAR, which always use the straight-line heuristic,
+            or ARASTAR: CUS2 repeated at lower weights until its limits stop it, see
+            ANYTIME_METHODS)
+        graph, node: Graph and node coordinates as returned by parse_file
+        origin (str): Starting node ID
+        destinations (list): List of goal node IDs
+        heuristic_fn (callable): Optional heuristic table for the HEURISTIC_METHODS
+        hierarchy (ContractionHierarchy): Preprocessed graph for CH (built per query if omitted)
+        workspace (SearchWorkspace): Optional reusable search state for BFS, ASTAR and CUS1
+            on a CompactGraph
+        probe (SearchProbe): Optional instrumentation for the INSTRUMENTED_METHODS
+        max_nodes (int): Node budget of SMASTAR (memory_bounded.MAX_NODES if omitted), and
+            transposition table size of IDASTAR (none if omitted)
+        limits (SearchLimits): Optional deadline, expansion budget and cancellation token
+
+    Returns:
+        tuple: (goal, path, nodes_created), plus the path's suboptimality bound for the
+        ANYTIME_METHODS; a limits.Exhausted result if the limits stopped the search first;
+        or None if the method is not implemented
+
+    Raises:
+        ValueError: If the method cannot run here (LEVELBFS without numpy)
+    """
+    search = METHODS.get(method)
+    if search is None:
+        return None
+    try:
+        return search(graph, node, origin, destinations, heuristic_fn, hierarchy, workspace, probe, max_nodes, limits)
+    except SearchExhausted as e:
+        return e.result
+
+
+def print_result(method, result):
+    """
+    Prints a run_search result in the standard output format. Results of ANYTIME_METHODS
+    are followed by a "Bound <b>" line, and a search stopped by its limits prints
+    "BudgetExhausted <nodes_expanded>" and the limit that stopped it (deadline,
+    expansions or cancelled) instead of NoGoalFound and NoPath.
+    """
+    goal, path, nodes_created = result[:3]
+    if isinstance(result, Exhausted):
+        print(f"BudgetExhausted {nodes_created}")
+        print(result.reason)
+        return
+    if goal:
+        print(f"{method}")
+        print(f"{goal} {nodes_created}")
+        print(" ".join(path))
+    else:
+        print(f"NoGoalFound {nodes_created}")
+        print("NoPath")
+    if len(result) > 3:
+        print(f"Bound {result[3]:.6g}")
+
+
+def make_probe(method):
+    """Returns a new SearchProbe for one of the INSTRUMENTED_METHODS, None for the others."""
+    if method not in INSTRUMENTED_METHODS:
+        return None
+    from instrumentation import SearchProbe
+    return SearchProbe()
+
+
+def make_profile(method, origin, destinations, result, probe, parse_seconds, search_seconds):
+    """
+    Builds the profile of one answered query.
+
+    Args:
+        method, origin, destinations: The query
+        result (tuple): Result returned by run_search
+        probe (SearchProbe): Probe the search ran with, or None for uninstrumented methods
+        parse_seconds (float): Time spent reading the query (the graph file for a single query)
+        search_seconds (float): Time spent in the search
+
+    Returns:
+        dict: JSON-serialisable profile; emit_profile adds the output time
+    """
+    goal, _, nodes_created = result[:3]
+    profile = {
+        "method": method,
+        "origin": origin,
+        "destinations": list(destinations),
+        "goal": goal,
+        "nodes_expanded": nodes_created,
+        # A probe that never got a frontier belongs to a query answered from a cache
+        "counters": probe.to_dict(nodes_created) if probe is not None and probe.counter is not None else None,
+        "seconds": {"parse": parse_seconds, "search": search_seconds},
+    }
+    if isinstance(result, Exhausted):
+        profile["exhausted"] = result.reason
+    elif len(result) > 3:
+        # JSON has no infinity: a path found without a known lower bound has none
+        profile["bound"] = result[3] if result[3] < math.inf else None
+    return profile
+
+
+def emit_profile(profile, output_seconds):
+    """Writes a query profile as one JSON line on stderr, keeping stdout in the standard format."""
+    profile["seconds"]["output"] = output_seconds
+    print(json.dumps(profile), file=sys.stderr)
+
+
+def parse_query(line):
+    """
+    Parses one batch query line: "<method> <origin> <destination>[; <destination>...]".
+
+    Returns:
+        tuple: (method, origin, destinations), or None for blank and comment (#) lines
+
+    Raises:
+        ValueError: If the line does not have a method, an origin and a destination
+    """
+    line = line.strip()
+    if not line or line.startswith("#"):
+        return None
+    fields = line.split(None, 2)
+    if len(fields) < 3:
+        raise ValueError(f"expected METHOD ORIGIN DEST[;DEST...], got {len(fields)} field(s)")
+    method, origin, dest_part = fields
+    destinations = [d.strip() for d in dest_part.split(';') if d.strip()]
+    if not destinations:
+        raise ValueError("expected METHOD ORIGIN DEST[;DEST...], got no destination")
+    return method.upper(), origin, destinations
+
+
+def batch_hierarchy(graph, hierarchy, line):
+    """
+    Returns the contraction hierarchy for a batch query line: the given one, or for the
+    first CH query of a batch without one, a hierarchy built for the graph, which the
+    caller keeps for the later lines instead of preprocessing the graph per query.
+    """
+    if hierarchy is not None:
+        return hierarchy
+    try:
+        query = parse_query(line)
+    except ValueError:
+        return None  # answer_query reports the line
+    if query is None or query[0] != "CH":
+        return None
+    from contraction import build_hierarchy
+    return build_hierarchy(graph)
+
+
+def heuristic_for(graph, heuristics, origin, destinations):
+    """Returns the table from a HeuristicCache for a query's destinations."""
+    # Compact graphs key their heuristic tables by dense node index
+    goals = graph.to_indices(origin, destinations)[1] if isinstance(graph, CompactGraph) else destinations
+    return heuristics.get(goals)
+
+
+def answer_query(graph, node, heuristics, line, hierarchy=None, workspace=None, profile=None, cache=None,
+                 max_nodes=None, time_limit=None, max_expansions=None, cancel=None):
+    """
+    Parses and answers one batch query line.
+
+    Args:
+        graph, node: Graph and node coordinates as returned by parse_file
+        heuristics (HeuristicCache): Heuristic tables shared between queries on this graph
+        line (str): Query line, see parse_query
+        hierarchy (ContractionHierarchy): Optional preprocessed graph for CH queries
+        workspace (SearchWorkspace): Optional reusable search state for a CompactGraph
+        profile (dict): If given, the query's profile (see make_profile) is stored in it
+        cache (QueryCache): Optional cache of earlier results, consulted before searching
+        max_nodes (int): Node budget of SMASTAR and IDASTAR queries (see run_search)
+        time_limit (float): Seconds the query may take, counted from the moment the line
+            is read (no limit if omitted)
+        max_expansions (int): Most nodes the search may expand (no limit if omitted)
+        cancel (CancelToken): Optional token that stops the search once cancelled
+
+    Returns:
+        tuple: (method, result) with the run_search result, or None for blank and comment lines
+
+    Raises:
+        ValueError, KeyError: If the line is malformed, names an unknown method or node
+    """
+    start = time.perf_counter()
+    limits = None
+    if time_limit is not None or max_expansions is not None or cancel is not None:
+        limits = SearchLimits.within(time_limit, max_expansions, cancel)
+    query = parse_query(line)
+    if query is None:
+        return None
+    method, origin, destinations = query
+    parsed = time.perf_counter()
+
+    heuristic_fn = heuristic_for(graph, heuristics, origin, destinations) if method in HEURISTIC_METHODS else None
+
+    probe = make_probe(method) if profile is not None else None
+    search = partial(run_search, method, graph, node, origin, destinations, heuristic_fn, hierarchy, workspace, probe,
+                     max_nodes, limits)
+    # What an anytime method finds within a deadline or budget depends on the machine's
+    # load, so such results are not cached (the cache keeps no Exhausted results either)
+    if cache is None or (method in ANYTIME_METHODS and (time_limit is not None or max_expansions is not None)):
+        result = search()
+    else:
+        result = cache.search(method, graph, origin, destinations, search, limits)
+    if result is None:
+        raise ValueError(f"method '{method}' not implemented")
+    if profile is not None:
+        profile.update(make_profile(method, origin, destinations, result, probe,
+                                    parsed - start, time.perf_counter() - parsed))
+    return method, result
+
+
+def report_error(line_number, line, error):
+    """Reports a batch query that could not be answered on stderr."""
+    print(f"Query {line_number}: invalid query {line.strip()!r} ({error})", file=sys.stderr)
+
+
+def run_batch(graph, node, lines, hierarchy=None, heuristics=None, profile=False, cache=None, max_nodes=None,
+              time_limit=None, max_expansions=None, cancel=None):
+    """
+    Answers a stream of queries against one loaded graph, printing each result in turn.
+
+    Heuristic tables are kept in a HeuristicCache, so queries that repeat a destination
+    set reuse the distances computed for earlier ones. On a CompactGraph the searches also
+    share one SearchWorkspace instead of allocating their bookkeeping per query.
+
+    Args:
+        graph, node: Graph and node coordinates as returned by parse_file
+        lines (iterable): Query lines, see parse_query
+        hierarchy (ContractionHierarchy): Optional preprocessed graph for CH queries (built
+            on the first CH query if omitted)
+        heuristics (HeuristicCache): Heuristic tables to use (a new straight-line cache if omitted)
+        profile (bool): Write a JSON profile of every answered query on stderr
+        cache (QueryCache): Optional cache of query results, whose statistics are reported
+            on stderr at the end
+        max_nodes (int): Node budget of SMASTAR and IDASTAR queries (see run_search)
+        time_limit (float): Seconds each query may take (see answer_query)
+        max_expansions (int): Most nodes each query's search may expand
+        cancel (CancelToken): Optional token that stops the current search once cancelled,
+            and the batch with it; Ctrl-C cancels it while a query is answered
+    """
+    if heuristics is None:
+        from heuristicFunction import HeuristicCache
+        heuristics = HeuristicCache(node)
+    workspace = SearchWorkspace(graph) if isinstance(graph, CompactGraph) else None
+    for line_number, line in enumerate(lines, 1):
+        if cancel is not None and cancel.is_set():
+            break
+        query_profile = {} if profile else None
+        hierarchy = batch_hierarchy(graph, hierarchy, line)
+        try:
+            with cancel_on_interrupt(cancel):
+                answer = answer_query(graph, node, heuristics, line, hierarchy, workspace, query_profile, cache,
+                                      max_nodes, time_limit, max_expansions, cancel)
+        except (ValueError, KeyError) as e:
+            report_error(line_number, line, repr(e))
+            continue
+        if answer is not None:
+            method, result = answer
+            start = time.perf_counter()
+            print_result(method, result)
+            if profile:
+                emit_profile(query_profile, time.perf_counter() - start)
+    if cache is not None:
+        report_cache(cache)
+
+
+def report_cache(cache):
+    """Reports query cache statistics on stderr."""
+    stats = cache.stats()
+    print(f"Cache: {stats['hits']} hits, {stats['tree_hits']} tree hits, {stats['misses']} misses, "
+          f"{stats['evictions']} evictions, {stats['entries']} entries ({stats['bytes'] / 2**20:.1f} MB)",
+          file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        usage="python search_program.py <filename> <method> [--compact] [--ch FILE] [--landmarks K] [--profile]\n"
+              "                                [--max-nodes N] [--deadline-ms MS] [--max-expansions N]\n"
+              "       python search_program.py <filename> --batch <queries|-> [--workers N] [--compact]\n"
+              "                                     [--ch FILE] [--landmarks K] [--profile]\n"
+              "                                     [--cache N] [--cache-mb MB] [--max-nodes N]\n"
+              "                                     [--deadline-ms MS] [--max-expansions N]")
+    parser.add_argument("filename")
+    parser.add_argument("method", nargs="?")
+    parser.add_argument("--batch", metavar="QUERIES",
+                        help="answer '<method> <origin> <dest>[; <dest>...]' lines from a file ('-' for stdin)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="worker processes for --batch (0 for one per CPU)")
+    parser.add_argument("--ch", metavar="FILE",
+                        help="contraction hierarchy for CH queries, built and saved there if missing "
+                             "(without it every CH query preprocesses the graph first)")
+    parser.add_argument("--landmarks", type=int, metavar="K",
+                        help="guide ASTAR, GBFS and CUS2 with ALT bounds from K landmarks "
+                             "instead of straight-line distance")
+    parser.add_argument("--cache", type=int, metavar="N",
+                        help="keep the results of up to N batch queries, and shortest path trees for "
+                             "repeated CUS1 origins, reporting hit statistics on stderr")
+    parser.add_argument("--cache-mb", type=float, default=64, metavar="MB",
+                        help="memory bound of the --cache (default 64)")
+    parser.add_argument("--max-nodes", type=int, metavar="N",
+                        help="search nodes SMASTAR may keep in memory (default 100000), and "
+                             "IDASTAR remembers per iteration (default none: memory linear in path depth)")
+    parser.add_argument("--deadline-ms", type=float, metavar="MS",
+                        help="stop each search after MS milliseconds, printing BudgetExhausted "
+                             "(ARASTAR prints its best path so far and its suboptimality bound)")
+    parser.add_argument("--max-expansions", type=int, metavar="N",
+                        help="stop each search after it expanded N nodes, printing BudgetExhausted")
+    parser.add_argument("--parse-stats", action="store_true",
+                        help="report parse time and throughput on stderr")
+    parser.add_argument("--profile", action="store_true",
+                        help="write a JSON profile of each query (frontier and expansion counters, "
+                             "parse/search/output seconds) on stderr")
+    # --compact loads the graph into integer-indexed CSR arrays instead of dicts; it is
+    # implied when the file is a compiled graph or has an up-to-date compiled cache
+    parser.add_argument("--compact", action="store_true")
+    args = parser.parse_args()
+
+    if (args.method is None) == (args.batch is None):
+        parser.print_usage()
+        sys.exit(1)
+
+    compact = args.compact or fresh_cache(args.filename) is not None
+    stats = {} if args.parse_stats else None
+    start = time.perf_counter()
+    graph, node, origin, destinations  = parse_file(args.filename, compact=compact, stats=stats)
+    parse_seconds = time.perf_counter() - start
+    if stats is not None:
+        print(f"Read {stats['bytes'] / 1e6:.1f} MB ({stats['nodes']} nodes, {stats['edges']} edges) "
+              f"in {stats['seconds']:.3f}s, {stats['throughput']:.1f} MB/s", file=sys.stderr)
+
+    # Optional components are imported only when their flags are given
+    hierarchy = None
+    if args.ch:
+        from contraction import load_hierarchy
+        try:
+            hierarchy = load_hierarchy(graph, args.ch)
+        except ValueError as e:
+            parser.error(str(e))
+    heuristics = None
+    if args.landmarks:
+        from heuristicFunction import HeuristicCache
+        from landmarks import Landmarks
+        heuristics = HeuristicCache(node, landmarks=Landmarks.build(graph, args.landmarks))
+
+    time_limit = None if args.deadline_ms is None else args.deadline_ms / 1000
+    # Ctrl-C during a search cancels it, which then prints BudgetExhausted, and stops a
+    # sequential batch after it; parallel workers are interrupted instead, and so is
+    # anything else (parsing, preprocessing, waiting for queries)
+    cancel = CancelToken()
+
+    # Batch mode: the graph is parsed once and every query line is answered against it
+    if args.batch is not None:
+        if args.workers == 1:
+            run = partial(run_batch, cancel=cancel)
+        else:
+            from parallel import run_batch_parallel
+            run = partial(run_batch_parallel, workers=args.workers or None)
+        cache = None
+        if args.cache:
+            from result_cache import QueryCache
+            cache = QueryCache(args.cache, int(args.cache_mb * 2**20))
+        run = partial(run, hierarchy=hierarchy, heuristics=heuristics, profile=args.profile, cache=cache,
+                      max_nodes=args.max_nodes, time_limit=time_limit, max_expansions=args.max_expansions)
+
+        if args.batch == "-":
+            run(graph, node, sys.stdin)
+        else:
+            with open(args.batch) as queries:
+                run(graph, node, queries)
+        return
+
+    method = args.method.upper()
+    heuristic_fn = None
+    if heuristics is not None and method in HEURISTIC_METHODS:
+        heuristic_fn = heuristic_for(graph, heuristics, origin, destinations)
+    if method == "CH" and hierarchy is None:
+        # Preprocess before the search, where Ctrl-C still interrupts it
+        from contraction import build_hierarchy
+        hierarchy = build_hierarchy(graph)
+    probe = make_probe(method) if args.profile else None
+    start = time.perf_counter()
+    limits = SearchLimits.within(time_limit, args.max_expansions, cancel)
+    try:
+        with cancel_on_interrupt(cancel):
+            result = run_search(method, graph, node, origin, destinations, heuristic_fn, hierarchy, probe=probe,
+                                max_nodes=args.max_nodes, limits=limits)
+    except ValueError as e:
+        parser.error(str(e))
+    search_seconds = time.perf_counter() - start
+    if result is None:
+        print(f"Method '{method}' not implemented. Please choose {METHOD_NAMES}.")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    print_result(method, result)
+    if args.profile:
+        sys.stdout.flush()
+        profile = make_profile(method, origin, destinations, result, probe, parse_seconds, search_seconds)
+        emit_profile(profile, time.perf_counter() - start)
+
+if __name__ == "__main__":
+    main()
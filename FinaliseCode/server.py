@@ -0,0 +1,342 @@
+"""
+Long-running query server: graphs are parsed once at startup and searched on request.
+
+Usage:
+    python server.py <graph.txt> [<name>=<graph.txt> ...] [--port 8765] [--host 127.0.0.1]
+                     [--unix PATH] [--workers N] [--compact] [--ch [<name>=]<file.ch> ...]
+
+Clients send one JSON request per line, for example
+    {"id": 7, "graph": "grid", "method": "CUS1", "origin": "1", "destinations": ["42", "99"]}
+and get one JSON response per line, in the order the requests were sent:
+    {"id": 7, "method": "CUS1", "goal": "42", "path": ["1", ...], "nodes_expanded": 311,
+     "seconds": {"search": 0.0021, "total": 0.0025}}
+"graph" names a graph given on the command line (by default its file name without the
+extension) and may be left out when only one is loaded; "id" is optional and echoed
+back. A request that cannot be answered gets {"id": ..., "error": "..."} instead.
+
+A request may set "deadline_ms", the milliseconds its search may take from the request
+being read, and "max_expansions", the most nodes it may expand. A search stopped by
+either gets "goal": null and "exhausted": "deadline" or "expansions", which a client
+can tell apart from a search that found no path. An ARASTAR search stopped after its
+first path is answered with its best path so far instead, and every ARASTAR response has
+a "bound": the path costs at most bound times the lowest cost (null if unknown).
+
+Requests may be pipelined: a client can send any number of lines without waiting, and
+they are searched concurrently on the worker processes while the event loop keeps
+reading and writing. "search" is the time spent in the search and "total" the time
+from reading the request to its response being ready.
+
+CH requests search the contraction hierarchy given for their graph with --ch, which is
+loaded at startup (and built and saved first if the file is missing or out of date). A
+graph without one has its hierarchy built by each worker on its first CH request.
+"""
+import argparse
+import asyncio
+import concurrent.futures
+import json
+import math
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from compact_graph import CompactGraph
+from graph_cache import fresh_cache
+from heuristicFunction import HeuristicCache
+from limits import Exhausted, SearchLimits
+from Parse_file import parse_file
+from search import HEURISTIC_METHODS, heuristic_for, run_search
+from workspace import SearchWorkspace
+
+# Requests a connection may have in flight before the server stops reading from it
+MAX_PENDING = 1024
+
+# Graphs of the current process by name, each with its coordinates, heuristic tables,
+# search workspace and contraction hierarchy (None until needed). Workers inherit them from the server through fork or receive them
+# once through the pool initializer, as in parallel.py.
+_state = {}
+
+# Heuristic tables of each worker thread, when searches run on threads: a HeuristicCache
+# is not thread safe, so the threads do not share the ones in _state
+_local = threading.local()
+
+
+def load_graphs(specs, compact=False):
+    """
+    Parses the graphs named on the command line.
+
+    Args:
+        specs (list): "<file>" or "<name>=<file>" strings; a bare file is named after its
+            file name without the extension
+        compact (bool): Load text files as CompactGraphs (always done for compiled files
+            and files with an up-to-date compiled cache)
+
+    Returns:
+        dict: name -> (graph, node)
+    """
+    graphs = {}
+    for spec in specs:
+        name, _, filename = spec.rpartition("=")
+        filename = filename or spec
+        name = name or os.path.splitext(os.path.basename(filename))[0]
+        graph, node, _, _ = parse_file(filename, compact=compact or fresh_cache(filename) is not None)
+        graphs[name] = (graph, node)
+    return graphs
+
+
+def load_hierarchies(specs, graphs):
+    """
+    Loads the contraction hierarchies named on the command line.
+
+    Args:
+        specs (list): "<file>" or "<name>=<file>" strings; a bare file belongs to the
+            only graph loaded
+        graphs (dict): name -> (graph, node), as returned by load_graphs
+
+    Returns:
+        dict: name -> ContractionHierarchy
+
+    Raises:
+        ValueError: If a spec names no loaded graph, or a file is not a hierarchy file
+    """
+    from contraction import load_hierarchy
+    hierarchies = {}
+    for spec in specs:
+        name, _, filename = spec.rpartition("=")
+        if not name and len(graphs) == 1:
+            name = next(iter(graphs))
+        if name not in graphs:
+            raise ValueError(f"--ch {spec}: unknown graph {name!r}")
+        hierarchies[name] = load_hierarchy(graphs[name][0], filename)
+    return hierarchies
+
+
+def _init_worker(graphs, threads=False, hierarchies=None):
+    """
+    Installs the graphs (and their hierarchies) that this process answers requests for.
+    With threads, the graphs get no workspace or heuristic tables, which are not thread
+    safe: each thread keeps its own tables instead, and searches without a workspace.
+    """
+    hierarchies = hierarchies or {}
+    for name, (graph, node) in graphs.items():
+        heuristics = None if threads else HeuristicCache(node)
+        workspace = SearchWorkspace(graph) if not threads and isinstance(graph, CompactGraph) else None
+        _state[name] = (graph, node, heuristics, workspace, hierarchies.get(name))
+
+
+def _thread_heuristics(name, node):
+    """Returns the calling thread's heuristic tables for a graph."""
+    caches = getattr(_local, "heuristics", None)
+    if caches is None:
+        caches = _local.heuristics = {}
+    heuristics = caches.get(name)
+    if heuristics is None:
+        heuristics = caches[name] = HeuristicCache(node)
+    return heuristics
+
+
+def _hierarchy(name):
+    """Returns the contraction hierarchy of a graph, building it on first use in this process."""
+    graph, node, heuristics, workspace, hierarchy = _state[name]
+    if hierarchy is None:
+        from contraction import build_hierarchy
+        hierarchy = build_hierarchy(graph)
+        _state[name] = (graph, node, heuristics, workspace, hierarchy)
+    return hierarchy
+
+
+def _search(name, method, origin, destinations, deadline=None, max_expansions=None):
+    """
+    Worker task: runs one search, stopping it at the deadline (a time.monotonic() value)
+    or after max_expansions expansions if either is given.
+
+    Returns:
+        tuple: (run_search result, seconds spent searching)
+
+    Raises:
+        ValueError, KeyError: If the method is unknown or a node is not in the graph
+    """
+    graph, node, heuristics, workspace, _ = _state[name]
+    start = time.perf_counter()
+    if heuristics is None and method in HEURISTIC_METHODS:
+        heuristics = _thread_heuristics(name, node)
+    heuristic_fn = heuristic_for(graph, heuristics, origin, destinations) if method in HEURISTIC_METHODS else None
+    hierarchy = _hierarchy(name) if method == "CH" else None
+    limits = None
+    if deadline is not None or max_expansions is not None:
+        limits = SearchLimits(deadline, max_expansions)
+    result = run_search(method, graph, node, origin, destinations, heuristic_fn, hierarchy, workspace,
+                        limits=limits)
+    if result is None:
+        raise ValueError(f"method '{method}' not implemented")
+    return result, time.perf_counter() - start
+
+
+def parse_request(line, names):
+    """
+    Validates one request line.
+
+    Args:
+        line (bytes or str): JSON request
+        names (collection): Names of the loaded graphs
+
+    Returns:
+        tuple: (request_id, graph_name, method, origin, destinations, deadline_ms,
+        max_expansions), where the limits are None if the request sets none
+
+    Raises:
+        ValueError: If the line is not a valid request
+    """
+    request = json.loads(line)
+    if not isinstance(request, dict):
+        raise ValueError("request must be a JSON object")
+    request_id = request.get("id")
+    name = request.get("graph")
+    if name is None and len(names) == 1:
+        name = next(iter(names))
+    if name not in names:
+        raise ValueError(f"unknown graph {name!r}")
+    method, origin, destinations = request.get("method"), request.get("origin"), request.get("destinations")
+    if not isinstance(method, str) or not isinstance(origin, str):
+        raise ValueError("method and origin must be strings")
+    if isinstance(destinations, str):
+        destinations = [d.strip() for d in destinations.split(";") if d.strip()]
+    if not isinstance(destinations, list) or not all(isinstance(d, str) for d in destinations):
+        raise ValueError("destinations must be a list of node IDs")
+    deadline_ms = request.get("deadline_ms")
+    if deadline_ms is not None and (isinstance(deadline_ms, bool) or not isinstance(deadline_ms, (int, float))):
+        raise ValueError("deadline_ms must be a number")
+    max_expansions = request.get("max_expansions")
+    if max_expansions is not None and (isinstance(max_expansions, bool) or not isinstance(max_expansions, int)
+                                       or max_expansions < 0):
+        raise ValueError("max_expansions must be a non-negative integer")
+    return request_id, name, method.upper(), origin, destinations, deadline_ms, max_expansions
+
+
+class SearchServer:
+    """
+    Answers line-delimited JSON search requests over asyncio streams.
+
+    Args:
+        graphs (dict): name -> (graph, node), as returned by load_graphs
+        workers (int): Worker processes for the searches (None for one per CPU); 0 runs
+            them on threads of the server process, which keeps the event loop responsive
+            but does not search in parallel
+        hierarchies (dict): Optional name -> ContractionHierarchy for CH requests, as
+            returned by load_hierarchies
+    """
+
+    def __init__(self, graphs, workers=None, hierarchies=None):
+        self.names = frozenset(graphs)
+        if workers == 0:
+            _init_worker(graphs, threads=True, hierarchies=hierarchies)
+            self.executor = concurrent.futures.ThreadPoolExecutor()
+        elif "fork" in multiprocessing.get_all_start_methods():
+            # Install the graphs before the pool forks, so workers share the parsed pages
+            _init_worker(graphs, hierarchies=hierarchies)
+            self.executor = concurrent.futures.ProcessPoolExecutor(
+                workers, mp_context=multiprocessing.get_context("fork"))
+        else:
+            self.executor = concurrent.futures.ProcessPoolExecutor(
+                workers, initializer=_init_worker, initargs=(graphs, False, hierarchies))
+        # Start the workers now: processes forked later would inherit the sockets of the
+        # connections open at the time and keep them from closing
+        self.executor.submit(int).result()
+
+    async def answer(self, line):
+        """Answers one request line, returning the response object."""
+        start = time.perf_counter()
+        request_id = None
+        try:
+            request_id, name, method, origin, destinations, deadline_ms, max_expansions = parse_request(
+                line, self.names)
+            # The monotonic clock is shared by all processes, so the worker can check it
+            deadline = None if deadline_ms is None else time.monotonic() + deadline_ms / 1000
+            loop = asyncio.get_running_loop()
+            result, seconds = await loop.run_in_executor(
+                self.executor, _search, name, method, origin, destinations, deadline, max_expansions)
+        except (ValueError, KeyError) as e:
+            return {"id": request_id, "error": repr(e)}
+        goal, path, nodes_created = result[:3]
+        response = {
+            "id": request_id, "method": method, "goal": goal, "path": path, "nodes_expanded": nodes_created,
+            "seconds": {"search": seconds, "total": time.perf_counter() - start},
+        }
+        if isinstance(result, Exhausted):
+            response["exhausted"] = result.reason
+        elif len(result) > 3:
+            response["bound"] = result[3] if result[3] < math.inf else None
+        return response
+
+    async def handle(self, reader, writer):
+        """Serves one connection: reads requests as they arrive and writes responses in order."""
+        pending = asyncio.Queue(MAX_PENDING)
+
+        async def respond():
+            # Responses are written in request order, each as soon as it and all the
+            # ones before it are done
+            while True:
+                task = await pending.get()
+                if task is None:
+                    break
+                writer.write(json.dumps(await task).encode() + b"\n")
+                await writer.drain()
+
+        responder = asyncio.create_task(respond())
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if line.strip():
+                    await pending.put(asyncio.create_task(self.answer(line)))
+            await pending.put(None)
+            await responder
+        except ConnectionError:
+            responder.cancel()
+        finally:
+            writer.close()
+
+    async def serve(self, host="127.0.0.1", port=8765, unix=None):
+        """Accepts connections on a TCP port, or on a Unix socket if unix is a path, until cancelled."""
+        if unix is not None:
+            server = await asyncio.start_unix_server(self.handle, unix)
+        else:
+            server = await asyncio.start_server(self.handle, host, port)
+        addresses = ", ".join(str(sock.getsockname()) for sock in server.sockets)
+        print(f"Serving {', '.join(sorted(self.names))} on {addresses}", file=sys.stderr)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.executor.shutdown(cancel_futures=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve search requests over line-delimited JSON")
+    parser.add_argument("graphs", nargs="+", metavar="[NAME=]FILE", help="graph files to load")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", metavar="PATH", help="listen on a Unix socket instead of TCP")
+    parser.add_argument("--workers", type=int,
+                        help="search worker processes (default one per CPU, 0 for threads in the server)")
+    parser.add_argument("--compact", action="store_true")
+    parser.add_argument("--ch", action="append", default=[], metavar="[NAME=]FILE",
+                        help="contraction hierarchy for a graph's CH requests, built and saved there "
+                             "if missing (without it each worker builds one on its first CH request)")
+    args = parser.parse_args()
+
+    graphs = load_graphs(args.graphs, args.compact)
+    try:
+        hierarchies = load_hierarchies(args.ch, graphs)
+    except ValueError as e:
+        parser.error(str(e))
+    server = SearchServer(graphs, args.workers, hierarchies)
+    try:
+        asyncio.run(server.serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
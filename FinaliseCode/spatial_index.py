@@ -0,0 +1,67 @@
+import math
+from array import array
+
+
+class KDTree:
+    """
+    Static 2-d tree over a set of points, answering nearest-point distance queries.
+
+    The tree is stored implicitly: the points of a subtree occupy a slice [lo, hi) of
+    the coordinate arrays, its splitting point sits at the middle of the slice, and the
+    two halves of the slice are its left and right subtrees. Levels alternate between
+    splitting on x and on y.
+
+    Args:
+        points (iterable): (x, y) coordinate pairs
+    """
+
+    def __init__(self, points):
+        points = list(points)
+        # Arrange points so every slice's middle element is the median on that level's axis
+        stack = [(0, len(points), 0)]
+        while stack:
+            lo, hi, axis = stack.pop()
+            if hi - lo <= 1:
+                continue
+            points[lo:hi] = sorted(points[lo:hi], key=lambda p: p[axis])
+            mid = (lo + hi) // 2
+            stack.append((lo, mid, 1 - axis))
+            stack.append((mid + 1, hi, 1 - axis))
+
+        self.xs = array('d', (p[0] for p in points))
+        self.ys = array('d', (p[1] for p in points))
+
+    def __len__(self):
+        return len(self.xs)
+
+    def nearest_distance(self, x, y):
+        """
+        Returns the Euclidean distance from (x, y) to the closest point in the tree.
+
+        The value equals min(math.hypot(x - px, y - py)) over all points exactly, since
+        subtrees are only skipped when they cannot hold anything strictly closer.
+        """
+        xs, ys = self.xs, self.ys
+        best = math.inf
+        # Stack of (lo, hi, axis, bound): bound is a lower limit on any distance in the slice
+        stack = [(0, len(xs), 0, 0.0)]
+        while stack:
+            lo, hi, axis, bound = stack.pop()
+            if lo >= hi or bound >= best:
+                continue
+            mid = (lo + hi) // 2
+            px, py = xs[mid], ys[mid]
+            d = math.hypot(x - px, y - py)
+            if d < best:
+                best = d
+
+            diff = x - px if axis == 0 else y - py
+            # Visit the side containing the query first; the other side can only help if
+            # the splitting line is closer than the best distance found so far
+            if diff < 0:
+                stack.append((mid + 1, hi, 1 - axis, abs(diff)))
+                stack.append((lo, mid, 1 - axis, bound))
+            else:
+                stack.append((lo, mid, 1 - axis, abs(diff)))
+                stack.append((mid + 1, hi, 1 - axis, bound))
+        return best
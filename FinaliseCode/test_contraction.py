@@ -0,0 +1,41 @@
+"""
+Tests for Contraction Hierarchy queries (contraction.py) against ucs_search.
+
+Run with: python -m pytest -q
+"""
+import random
+from contraction import ch_search
+from ucs import ucs_search
+
+
+def _cost(graph, path):
+    """Cost of a path, taking the cheapest of parallel edges."""
+    return sum(min(cost for end, cost in graph[start] if end == nxt) for start, nxt in zip(path, path[1:]))
+
+
+def test_zero_cost_route_stops_at_first_destination():
+    graph = {"1": [("2", 1)], "2": [("3", 0)], "3": [("2", 0), ("4", 0)], "4": []}
+    goal, path, _ = ch_search(graph, "1", ["2", "4"])
+    assert (goal, path) == ("2", ["1", "2"])
+    assert (goal, path) == ucs_search(graph, "1", ["2", "4"])[:2]
+
+
+def test_simple_lowest_cost_paths_with_zero_costs_and_self_loops():
+    rng = random.Random(0)
+    for _ in range(500):
+        ids = [str(i) for i in range(1, rng.randint(2, 9) + 1)]
+        graph = {node: [] for node in ids}
+        for _ in range(rng.randint(1, 25)):
+            # Self-loops and parallel edges allowed
+            graph[rng.choice(ids)].append((rng.choice(ids), rng.choice([0, 0, 1, 2])))
+        origin = rng.choice(ids)
+        destinations = rng.sample(ids, 2)
+        goal, path, _ = ch_search(graph, origin, destinations)
+        expected_goal, expected_path, _ = ucs_search(graph, origin, destinations)
+        if expected_goal is None:
+            assert goal is None
+            continue
+        assert path[0] == origin and path[-1] == goal
+        assert len(set(path)) == len(path)
+        assert not set(path[:-1]) & set(destinations)
+        assert _cost(graph, path) == _cost(graph, expected_path)
@@ -0,0 +1,49 @@
+"""
+Tests for incremental re-planning (dynamic.py) against fresh ucs_search runs.
+
+Run with: python -m pytest -q
+"""
+import random
+from dynamic import DynamicGraph, IncrementalSearch
+from ucs import ucs_search
+
+
+def test_zero_cost_cycle():
+    graph = {"1": [("2", 1)], "2": [("3", 0)], "3": [("2", 0), ("9", 1)], "9": []}
+    goal, path, _ = IncrementalSearch(DynamicGraph(graph), "1", ["9"]).search()
+    assert (goal, path) == ("9", ["1", "2", "3", "9"])
+    assert (goal, path) == ucs_search(graph, "1", ["9"])[:2]
+
+
+def test_zero_cost_cycle_after_cost_increase():
+    # 1 and 2 reach each other at no cost: once the edge into the cycle gets dearer,
+    # neither may keep the other's old cost
+    dynamic = DynamicGraph({"1": [("2", 0)], "2": [("1", 0), ("3", 1)], "3": [("2", 0)]})
+    search = IncrementalSearch(dynamic, "3", ["2", "1"])
+    assert search.search()[:2] == ("2", ["3", "2"])
+    dynamic.set_cost("3", "2", 1)
+    dynamic.set_cost("1", "3", 0)
+    assert search.cost() == 1
+    assert search.search()[:2] == ucs_search(dynamic, "3", ["2", "1"])[:2]
+
+
+def test_matches_ucs_after_random_changes():
+    rng = random.Random(0)
+    for _ in range(300):
+        ids = [str(i) for i in range(1, rng.randint(2, 9) + 1)]
+        graph = {node: [] for node in ids}
+        for _ in range(rng.randint(1, 25)):
+            start, end = rng.sample(ids, 2)
+            if end not in dict(graph[start]):
+                graph[start].append((end, rng.choice([0, 0, 1, 2])))
+        dynamic = DynamicGraph(graph)
+        origin = rng.choice(ids)
+        destinations = rng.sample(ids, min(2, len(ids)))
+        search = IncrementalSearch(dynamic, origin, destinations)
+        for _ in range(5):
+            assert search.search()[:2] == ucs_search(dynamic, origin, destinations)[:2]
+            start, end = rng.sample(ids, 2)
+            if end in dynamic.successors.get(start, {}) and rng.random() < 0.2:
+                dynamic.remove_edge(start, end)
+            else:
+                dynamic.set_cost(start, end, rng.choice([0, 0, 1, 3]))
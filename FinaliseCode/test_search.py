@@ -0,0 +1,192 @@
+"""
+Tests that every search method gives its recorded result on every TestCase graph.
+
+The results of the methods that existed before the canonical adjacency order are those
+they gave when every expansion still sorted its neighbours, so the tests also check that
+sorting once at load time changed no output. Each graph is searched both as the dict
+adjacency list and as a CompactGraph.
+
+Run with: python -m pytest -q
+"""
+import importlib.util
+import os
+import sys
+import pytest
+from Parse_file import parse_file
+from search import METHODS, run_search
+
+TEST_CASES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "TestCase")
+
+# file -> method -> (goal, path, nodes_expanded[, bound]) with the path space-separated
+EXPECTED = {
+    "DenseGraph.txt": {
+        "DFS": ("6", "1 2 3 4 5 6", 6),
+        "BFS": ("6", "1 6", 6),
+        "ASTAR": ("6", "1 6", 6),
+        "GBFS": ("6", "1 6", 2),
+        "CUS1": ("6", "1 6", 6),
+        "CUS2": ("6", "1 6", 5),
+        "BIUCS": ("6", "1 6", 2),
+        "BIASTAR": ("6", "1 6", 2),
+        "CH": ("6", "1 6", 6),
+        "ARASTAR": ("6", "1 6", 4, 1.0),
+        "IDASTAR": ("6", "1 6", 12),
+        "SMASTAR": ("6", "1 6", 6),
+    },
+    "DisconnectedGraph.txt": {
+        "DFS": (None, "", 3),
+        "BFS": (None, "", 3),
+        "ASTAR": (None, "", 3),
+        "GBFS": (None, "", 3),
+        "CUS1": (None, "", 3),
+        "CUS2": (None, "", 3),
+        "BIUCS": (None, "", 5),
+        "BIASTAR": (None, "", 5),
+        "CH": (None, "", 4),
+        "ARASTAR": (None, "", 3, 1.0),
+        "IDASTAR": (None, "", 4),
+        "SMASTAR": (None, "", 2),
+    },
+    "MultiplePaths.txt": {
+        "DFS": ("6", "1 2 4 6", 4),
+        "BFS": ("6", "1 2 4 6", 6),
+        "ASTAR": ("6", "1 2 4 6", 5),
+        "GBFS": ("6", "1 3 4 6", 4),
+        "CUS1": ("6", "1 2 4 6", 6),
+        "CUS2": ("6", "1 2 4 6", 5),
+        "BIUCS": ("6", "1 2 4 6", 4),
+        "BIASTAR": ("6", "1 2 4 6", 4),
+        "CH": ("6", "1 2 5 6", 6),
+        "ARASTAR": ("6", "1 2 5 6", 4, 1.0),
+        "IDASTAR": ("6", "1 2 4 6", 9),
+        "SMASTAR": ("6", "1 2 4 6", 5),
+    },
+    "NegativeEdge.txt": {
+        "DFS": ("4", "1 2 3 4", 4),
+        "BFS": ("4", "1 2 4", 4),
+        "ASTAR": ("4", "1 2 3 4", 4),
+        "GBFS": ("4", "1 2 4", 3),
+        "CUS1": ("4", "1 2 3 4", 4),
+        "CUS2": ("4", "1 2 3 4", 4),
+        "BIUCS": ("4", "1 2 4", 2),
+        "BIASTAR": ("4", "1 2 4", 2),
+        "CH": ("4", "1 2 4", 4),
+        "ARASTAR": ("4", "1 2 3 4", 3, 1.0),
+        "IDASTAR": ("4", "1 2 3 4", 4),
+        "SMASTAR": ("4", "1 2 3 4", 4),
+    },
+    "PathFinder-test.txt": {
+        "DFS": ("5", "2 1 3 5", 4),
+        "BFS": ("4", "2 1 4", 4),
+        "ASTAR": ("4", "2 1 4", 4),
+        "GBFS": ("5", "2 3 5", 3),
+        "CUS1": ("4", "2 1 4", 4),
+        "CUS2": ("4", "2 1 4", 4),
+        "BIUCS": ("4", "2 1 4", 3),
+        "BIASTAR": ("4", "2 1 4", 4),
+        "CH": ("4", "2 1 4", 7),
+        "ARASTAR": ("5", "2 3 5", 3, 1.0),
+        "IDASTAR": ("4", "2 1 4", 5),
+        "SMASTAR": ("5", "2 3 5", 4),
+    },
+    "largeGraph.txt": {
+        "DFS": ("8", "1 2 3 6 7 8", 6),
+        "BFS": ("5", "1 5", 5),
+        "ASTAR": ("5", "1 2 5", 3),
+        "GBFS": ("5", "1 5", 2),
+        "CUS1": ("5", "1 2 5", 4),
+        "CUS2": ("5", "1 2 5", 3),
+        "BIUCS": ("5", "1 2 5", 5),
+        "BIASTAR": ("5", "1 2 5", 2),
+        "CH": ("5", "1 2 5", 10),
+        "ARASTAR": ("5", "1 2 5", 2, 1.0),
+        "IDASTAR": ("5", "1 2 5", 3),
+        "SMASTAR": ("5", "1 2 5", 3),
+    },
+    "loop.txt": {
+        "DFS": ("3", "1 2 3", 3),
+        "BFS": ("3", "1 2 3", 3),
+        "ASTAR": ("3", "1 2 3", 3),
+        "GBFS": ("3", "1 2 3", 3),
+        "CUS1": ("3", "1 2 3", 3),
+        "CUS2": ("3", "1 2 3", 3),
+        "BIUCS": ("3", "1 2 3", 2),
+        "BIASTAR": ("3", "1 2 3", 2),
+        "CH": ("3", "1 2 3", 4),
+        "ARASTAR": ("3", "1 2 3", 2, 1.0),
+        "IDASTAR": ("3", "1 2 3", 3),
+        "SMASTAR": ("3", "1 2 3", 3),
+    },
+    "minimal2Nodes.txt": {
+        "DFS": ("2", "1 2", 2),
+        "BFS": ("2", "1 2", 2),
+        "ASTAR": ("2", "1 2", 2),
+        "GBFS": ("2", "1 2", 2),
+        "CUS1": ("2", "1 2", 2),
+        "CUS2": ("2", "1 2", 2),
+        "BIUCS": ("2", "1 2", 1),
+        "BIASTAR": ("2", "1 2", 1),
+        "CH": ("2", "1 2", 2),
+        "ARASTAR": ("2", "1 2", 1, 1.0),
+        "IDASTAR": ("2", "1 2", 2),
+        "SMASTAR": ("2", "1 2", 2),
+    },
+    "noPath.txt": {
+        "DFS": (None, "", 2),
+        "BFS": (None, "", 2),
+        "ASTAR": (None, "", 2),
+        "GBFS": (None, "", 2),
+        "CUS1": (None, "", 2),
+        "CUS2": (None, "", 2),
+        "BIUCS": (None, "", 2),
+        "BIASTAR": (None, "", 2),
+        "CH": (None, "", 3),
+        "ARASTAR": (None, "", 2, 1.0),
+        "IDASTAR": (None, "", 2),
+        "SMASTAR": (None, "", 2),
+    },
+    "oneWay.txt": {
+        "DFS": ("4", "1 2 3 4", 4),
+        "BFS": ("4", "1 2 3 4", 4),
+        "ASTAR": ("4", "1 2 3 4", 4),
+        "GBFS": ("4", "1 2 3 4", 4),
+        "CUS1": ("4", "1 2 3 4", 4),
+        "CUS2": ("4", "1 2 3 4", 4),
+        "BIUCS": ("4", "1 2 3 4", 3),
+        "BIASTAR": ("4", "1 2 3 4", 3),
+        "CH": ("4", "1 2 3 4", 4),
+        "ARASTAR": ("4", "1 2 3 4", 3, 1.0),
+        "IDASTAR": ("4", "1 2 3 4", 7),
+        "SMASTAR": ("4", "1 2 3 4", 4),
+    },
+}
+
+# LEVELBFS is BFS over NumPy arrays, with the same results
+for results in EXPECTED.values():
+    results["LEVELBFS"] = results["BFS"]
+
+
+def test_every_method_and_file_has_a_result():
+    assert sorted(os.listdir(TEST_CASES)) == sorted(EXPECTED)
+    for results in EXPECTED.values():
+        assert sorted(results) == sorted(METHODS)
+
+
+@pytest.mark.parametrize("compact", [False, True], ids=["dict", "compact"])
+@pytest.mark.parametrize("method", sorted(METHODS))
+@pytest.mark.parametrize("filename", sorted(EXPECTED))
+def test_result(filename, method, compact):
+    if method == "LEVELBFS" and importlib.util.find_spec("numpy") is None:
+        pytest.skip("LEVELBFS needs numpy")
+    graph, node, origin, destinations = parse_file(os.path.join(TEST_CASES, filename), compact=compact)
+    goal, path, nodes_expanded, *bound = run_search(method, graph, node, origin, destinations)
+    assert (goal, " ".join(path), nodes_expanded, *bound) == EXPECTED[filename][method]
+
+
+def test_levelbfs_without_numpy(monkeypatch):
+    # A None entry in sys.modules makes importing the module raise ImportError
+    monkeypatch.setitem(sys.modules, "numpy", None)
+    monkeypatch.delitem(sys.modules, "bfs_levels", raising=False)
+    graph, node, origin, destinations = parse_file(os.path.join(TEST_CASES, "PathFinder-test.txt"))
+    with pytest.raises(ValueError, match="LEVELBFS needs numpy"):
+        run_search("LEVELBFS", graph, node, origin, destinations)
@@ -1,50 +1,217 @@
-import heapq
-
-def ucs_search(graph, origin, destinations):
-
-     # Initialize the priority queue with a tuple (cumulative_cost, current_node, path_so_far)
-    # Start with the origin node and a cumulative cost of 0.
-    priority_queue = [(0, origin, [origin])]
-    
-    # A set to keep track of visited nodes so we don't process them again
-    visited = set()
-
-    visited_order = []
-    
-    # Counter for the number of nodes expanded during the search
-    nodes_created = 0
-
-    # Continue the search until there are no nodes left in the priority queue
-    while priority_queue:
-        # Pop the node with the smallest cumulative cost from the queue
-        cost, current_node, path_so_far = heapq.heappop(priority_queue)
-        
-        
-        if current_node in visited:
-            continue
-
-
-        visited_order.append(current_node)
-        visited.add(current_node)
-        nodes_created += 1
-
-        # Check if the current node is one of the destination nodes
-        if current_node in destinations:
-            return current_node, path_so_far, nodes_created
-        
-        
-
-        # Loop through all neighbors of the current node from the graph
-        for neighbor, edge_cost in graph.get(current_node, []):
-            # Only consider neighbors that haven't been visited
-            if neighbor not in visited:
-                # Calculate the new cumulative cost to reach this neighbor
-                new_cost = cost + edge_cost
-                # Create a new path by appending the neighbor node to the current path
-                new_path = path_so_far + [neighbor]
-                # Push the new state (cost, neighbor, new_path) to the priority queue
-                heapq.heappush(priority_queue, (new_cost, neighbor, new_path))
-                
-
-    # If the priority queue is exhausted without reaching a destination, return failure
-    return None, [], nodes_created
+import heapq
+from compact_graph import CompactGraph
+from frontier import LazyHeapFrontier
+from limits import first_check
+from path_utils import reconstruct_path, path_precedes
+
+def ucs_search(graph, origin, destinations, workspace=None, frontier=None, probe=None, limits=None):
+    """
+    Uniform Cost Search (CUS1): expands nodes in order of cumulative path cost.
+
+    Args:
+        graph (dict or CompactGraph): Adjacency list representation {node: [(neighbor, cost)]}
+        origin (str): Starting node ID
+        destinations (list): List of possible goal node IDs
+        workspace (SearchWorkspace): Optional reusable search state for a CompactGraph,
+            so the query allocates no per-node bookkeeping (its own heap replaces frontier)
+        frontier (callable): Frontier class for the open set (frontier.LazyHeapFrontier by
+            default; frontier.IndexedHeapFrontier keeps one entry per open node)
+        probe (SearchProbe): Optional instrumentation collecting counters for this run (the
+            workspace is not used then)
+        limits (SearchLimits): Optional deadline, expansion budget and cancellation token
+
+    Returns:
+        tuple: (goal_node, path, nodes_expanded) where:
+            - goal_node: Cheapest destination reached (or None if no path exists)
+            - path: List of nodes in the lowest cost path
+            - nodes_expanded: Number of nodes expanded during search
+
+    Raises:
+        SearchExhausted: If the limits stop the search before it finds a destination
+    """
+    # Compact graphs are searched over dense node indices and translated back to IDs
+    if isinstance(graph, CompactGraph):
+        source, goals = graph.to_indices(origin, destinations)
+        if workspace is not None and probe is None:
+            return graph.to_result(*_ucs_workspace(workspace, graph, source, goals, limits))
+        return graph.to_result(*_ucs_search(graph, source, goals, frontier, probe, limits))
+    return _ucs_search(graph, origin, destinations, frontier, probe, limits)
+
+
+def _ucs_search(graph, origin, destinations, frontier, probe, limits):
+    frontier = frontier or LazyHeapFrontier
+    if probe is not None:
+        graph, frontier = probe.graph(graph), probe.frontier(frontier)
+
+    # Initialize the priority queue with a tuple (cumulative_cost, current_node)
+    # Start with the origin node and a cumulative cost of 0.
+    priority_queue = frontier()
+    priority_queue.push((0, origin))
+
+    # Cheapest known cost and parent pointer for every reached node; the path is only
+    # rebuilt from the parent pointers once a destination is reached
+    best_cost = {origin: 0}
+    parent = {origin: None}
+    
+    # A set to keep track of visited nodes so we don't process them again
+    visited = set()
+    
+    # Counter for the number of nodes expanded during the search
+    nodes_created = 0
+    check_at = first_check(limits)  # Expansion count at which the limits are polled next
+
+    # Continue the search until there are no nodes left in the priority queue
+    while priority_queue:
+        # Pop the node with the smallest cumulative cost from the queue
+        cost, current_node = priority_queue.pop()
+        
+        if current_node in visited:
+            continue
+
+        visited.add(current_node)
+        nodes_created += 1
+        if nodes_created >= check_at:
+            check_at = limits.poll(nodes_created)  # Raises SearchExhausted once a limit is reached
+
+        # Check if the current node is one of the destination nodes
+        if current_node in destinations:
+            return current_node, reconstruct_path(parent, current_node), nodes_created
+
+        # Loop through all neighbors of the current node from the graph
+        for neighbor, edge_cost in graph.get(current_node, []):
+            # Only consider neighbors that haven't been visited
+            if neighbor not in visited:
+                # Calculate the new cumulative cost to reach this neighbor
+                new_cost = cost + edge_cost
+                old_cost = best_cost.get(neighbor)
+                if old_cost is None or new_cost < old_cost:
+                    # Cheaper route: record it and push the new state (cost, neighbor)
+                    best_cost[neighbor] = new_cost
+                    parent[neighbor] = current_node
+                    priority_queue.push((new_cost, neighbor))
+                elif new_cost == old_cost and path_precedes(parent, current_node, parent[neighbor], neighbor):
+                    # Equal cost: keep the lexicographically smaller path, as comparing
+                    # path lists in the queue entries used to
+                    parent[neighbor] = current_node
+
+    # If the priority queue is exhausted without reaching a destination, return failure
+    return None, [], nodes_created
+
+
+def _ucs_workspace(workspace, graph, origin, destinations, limits):
+    # Same search as _ucs_search, with its bookkeeping in the workspace arrays: a node's
+    # cost and parent are valid only when its `reached` stamp is the current generation,
+    # and it has been expanded only when its `closed` stamp is
+    generation = workspace.begin(graph)
+    cost_of, parent, reached, closed = workspace.cost, workspace.parent, workspace.reached, workspace.closed
+    priority_queue = workspace.frontier
+    priority_queue.append((0, origin))
+    cost_of[origin] = 0
+    parent[origin] = -1
+    reached[origin] = generation
+    nodes_created = 0
+    check_at = first_check(limits)  # Expansion count at which the limits are polled next
+
+    while priority_queue:
+        cost, current_node = heapq.heappop(priority_queue)
+        if closed[current_node] == generation:
+            continue
+        closed[current_node] = generation
+        nodes_created += 1
+        if nodes_created >= check_at:
+            check_at = limits.poll(nodes_created)  # Raises SearchExhausted once a limit is reached
+
+        if current_node in destinations:
+            return current_node, workspace.path(current_node), nodes_created
+
+        for neighbor, edge_cost in graph.get(current_node, []):
+            if closed[neighbor] != generation:
+                new_cost = cost + edge_cost
+                if reached[neighbor] != generation or new_cost < cost_of[neighbor]:
+                    cost_of[neighbor] = new_cost
+                    parent[neighbor] = current_node
+                    reached[neighbor] = generation
+                    heapq.heappush(priority_queue, (new_cost, neighbor))
+                elif new_cost == cost_of[neighbor] and path_precedes(workspace.parents, current_node, parent[neighbor], neighbor):
+                    parent[neighbor] = current_node
+
+    return None, [], nodes_created
+
+
+def shortest_distances(graph, source, targets=None):
+    """
+    Single-source Dijkstra over the whole graph, or until every one of the targets is
+    settled, rather than stopping at the first destination like ucs_search.
+
+    Args:
+        graph (dict or CompactGraph): Adjacency list representation {node: [(neighbor, cost)]}
+        source: Starting node, keyed the same way as the graph (a dense index for a CompactGraph)
+        targets (collection): Optional distinct nodes, keyed like the graph, after which
+            the search may stop
+
+    Returns:
+        dict: Lowest path cost from source to every node it can reach; when targets are
+        given, costs are final only for the targets (a target missing from the dict is
+        unreachable)
+    """
+    dist = {source: 0}
+    priority_queue = [(0, source)]
+    remaining = -1 if targets is None else len(targets)  # Never reaches 0 without targets
+    while priority_queue and remaining:
+        cost, current_node = heapq.heappop(priority_queue)
+        if cost > dist[current_node]:
+            continue  # Stale entry, the node was already settled more cheaply
+        if targets is not None and current_node in targets:
+            remaining -= 1
+        for neighbor, edge_cost in graph.get(current_node, []):
+            new_cost = cost + edge_cost
+            old_cost = dist.get(neighbor)
+            if old_cost is None or new_cost < old_cost:
+                dist[neighbor] = new_cost
+                heapq.heappush(priority_queue, (new_cost, neighbor))
+    return dist
+
+
+def ucs_tree(graph, origin, limits=None):
+    """
+    Runs CUS1 from origin over everything it can reach, without stopping at a destination.
+
+    The search pops and ties like ucs_search, so for any destination set the ucs_search
+    result can be read off the tree: the goal is the first destination popped, the
+    nodes expanded are those popped up to it and its path follows the parent pointers.
+
+    Args:
+        graph (dict or CompactGraph): Adjacency list representation {node: [(neighbor, cost)]}
+        origin: Starting node, keyed the same way as the graph (a dense index for a CompactGraph)
+        limits (SearchLimits): Optional deadline, expansion budget and cancellation token
+
+    Returns:
+        tuple: (cost, parent, rank) dicts giving each reached node's lowest path cost,
+        parent pointer (None for the origin) and position in the pop order (0 for the origin)
+
+    Raises:
+        SearchExhausted: If the limits stop the search before it popped every reachable node
+    """
+    priority_queue = [(0, origin)]
+    best_cost = {origin: 0}
+    parent = {origin: None}
+    rank = {}
+    check_at = first_check(limits)  # Expansion count at which the limits are polled next
+    while priority_queue:
+        cost, current_node = heapq.heappop(priority_queue)
+        if current_node in rank:
+            continue
+        rank[current_node] = len(rank)
+        if len(rank) >= check_at:
+            check_at = limits.poll(len(rank))  # Raises SearchExhausted once a limit is reached
+        for neighbor, edge_cost in graph.get(current_node, []):
+            if neighbor not in rank:
+                new_cost = cost + edge_cost
+                old_cost = best_cost.get(neighbor)
+                if old_cost is None or new_cost < old_cost:
+                    best_cost[neighbor] = new_cost
+                    parent[neighbor] = current_node
+                    heapq.heappush(priority_queue, (new_cost, neighbor))
+                elif new_cost == old_cost and path_precedes(parent, current_node, parent[neighbor], neighbor):
+                    parent[neighbor] = current_node
+    return best_cost, parent, rank
@@ -0,0 +1,84 @@
+from compact_graph import _zeros, FLOAT_TYPE, TARGET_TYPE
+
+GENERATION_TYPE = 'q'  # 64-bit generation stamps, which never wrap around in practice
+
+
+class ParentView:
+    """
+    Read-only mapping view of a workspace's parent array, giving None for the origin
+    (stored as -1), so path_utils helpers can walk it like a parent dict.
+    """
+    __slots__ = ('parent',)
+
+    def __init__(self, parent):
+        self.parent = parent
+
+    def __getitem__(self, index):
+        p = self.parent[index]
+        return None if p < 0 else p
+
+
+class SearchWorkspace:
+    """
+    Reusable per-query search state for one CompactGraph.
+
+    Instead of allocating visited sets, cost and parent dicts and a frontier for every
+    query, searches given a workspace keep that state in arrays indexed by dense node
+    index, allocated once. Each slot carries the generation (query number) that wrote
+    it; begin() starts a new generation, so stale entries from earlier queries are
+    ignored without clearing anything and resetting costs O(1).
+
+    A workspace holds the state of one search at a time: use one per thread or process.
+
+    Attributes:
+        graph (CompactGraph): Graph the arrays are sized for
+        generation (int): Stamp of the current query
+        cost (array): Best known path cost per node
+        parent (array): Parent index per node (-1 for the origin)
+        parents (ParentView): parent as a mapping for path_utils.path_precedes
+        reached (array): Generation in which cost and parent were last set
+        closed (array): Generation in which the node was last expanded
+        queue (array): Node index buffer for FIFO searches
+        frontier (list): Heap reused by priority queue searches
+    """
+
+    def __init__(self, graph):
+        n = len(graph)
+        self.graph = graph
+        self.generation = 0
+        self.cost = _zeros(FLOAT_TYPE, n)
+        self.parent = _zeros(TARGET_TYPE, n)
+        self.parents = ParentView(self.parent)
+        self.reached = _zeros(GENERATION_TYPE, n)
+        self.closed = _zeros(GENERATION_TYPE, n)
+        self.queue = _zeros(TARGET_TYPE, n)
+        self.frontier = []
+
+    def begin(self, graph):
+        """
+        Starts a new query, invalidating all state from the previous one.
+
+        Args:
+            graph (CompactGraph): Graph about to be searched, which must be the workspace's
+
+        Returns:
+            int: The new generation stamp
+
+        Raises:
+            ValueError: If the workspace was made for a different graph
+        """
+        if graph is not self.graph:
+            raise ValueError("search workspace belongs to a different graph")
+        self.generation += 1
+        self.frontier.clear()
+        return self.generation
+
+    def path(self, goal):
+        """Rebuilds the path to goal from the parent array."""
+        path = []
+        parent = self.parent
+        while goal >= 0:
+            path.append(goal)
+            goal = parent[goal]
+        path.reverse()
+        return path